@@ -1,6 +1,8 @@
 from fastapi import APIRouter
 
 from .organizations import router as organizations_router
+from .recurring_reservations import router as recurring_reservations_router
+from .reports import router as reports_router
 from .reservations import router as reservations_router
 from .resources import router as resources_router
 
@@ -8,3 +10,5 @@ api_router = APIRouter()
 api_router.include_router(resources_router)
 api_router.include_router(reservations_router)
 api_router.include_router(organizations_router)
+api_router.include_router(recurring_reservations_router)
+api_router.include_router(reports_router)
@@ -0,0 +1,267 @@
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterable, AsyncIterator
+from datetime import datetime
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.conditional import (
+    conditional_json,
+    has_conditions,
+    is_fresh,
+    json_body,
+    not_modified,
+    row_set_validators,
+    validator_headers,
+)
+from app.api.idempotency import MAX_KEY_LENGTH, error_response, idempotent_async, model_response
+from app.api.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from app.api.reservations import STREAM_CHUNK_SIZE
+from app.core.idempotency import StoredResponse
+from app.db.async_database import get_async_db
+from app.models.reservation import Reservation
+from app.schemas.organization import OrganizationCreate, OrganizationOut, OrganizationUpdate
+from app.schemas.reservation import (
+    ReservationBulkCreate,
+    ReservationBulkResult,
+    ReservationCreate,
+    ReservationOut,
+    ReservationUpdate,
+)
+from app.schemas.resource import ResourceCreate, ResourceOut, ResourceUpdate
+from app.schemas.rows import rows_json
+from app.services import (
+    async_organization_service,
+    async_reservation_service,
+    async_resource_service,
+)
+from app.services.reservation_service import naive_utc, rows_validators
+
+# Async twins of the CRUD routes, mounted ahead of the sync routers when DATABASE_URL names
+# an async driver. They serve the same paths and contracts; any route without a twin here
+# falls through to its sync version. Ids use the `int` path convertor so that static sync
+# paths such as /resources/available are not captured by a twin's /{id} route.
+
+reservations_router = APIRouter(prefix="/reservations", tags=["Reservations"])
+resources_router = APIRouter(prefix="/resources", tags=["Resources"])
+organizations_router = APIRouter(prefix="/organizations", tags=["Organizations"])
+
+
+async def _ndjson_lines(rows: AsyncIterable[Reservation]) -> AsyncIterator[bytes]:
+    chunk: list[str] = []
+    async for row in rows:
+        chunk.append(ReservationOut.model_validate(row).model_dump_json())
+        if len(chunk) == STREAM_CHUNK_SIZE:
+            yield ("\n".join(chunk) + "\n").encode()
+            chunk.clear()
+    if chunk:
+        yield ("\n".join(chunk) + "\n").encode()
+
+
+@reservations_router.post("/", response_model=ReservationOut, status_code=201)
+async def create_reservation(
+    data: ReservationCreate,
+    idempotency_key: str | None = Header(default=None, max_length=MAX_KEY_LENGTH),
+    db: AsyncSession = Depends(get_async_db),
+):
+    async def write() -> StoredResponse:
+        try:
+            obj = await async_reservation_service.create_reservation(db, data)
+        except ValueError as e:
+            return error_response(400, str(e))
+        return model_response(ReservationOut, obj, 201)
+
+    return await idempotent_async(idempotency_key, "reservations.create", data, write)
+
+
+@reservations_router.post("/bulk", response_model=ReservationBulkResult)
+async def create_reservations_bulk(
+    data: ReservationBulkCreate,
+    idempotency_key: str | None = Header(default=None, max_length=MAX_KEY_LENGTH),
+    db: AsyncSession = Depends(get_async_db),
+):
+    async def write() -> StoredResponse:
+        results = await async_reservation_service.create_reservations_bulk(db, data.items)
+        accepted = sum(1 for r in results if r.accepted)
+        result = ReservationBulkResult(accepted=accepted, rejected=len(results) - accepted, results=results)
+        return model_response(ReservationBulkResult, result)
+
+    return await idempotent_async(idempotency_key, "reservations.bulk", data, write)
+
+
+@reservations_router.get("/{reservation_id:int}", response_model=ReservationOut)
+async def get_reservation(
+    reservation_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)
+):
+    obj = await async_reservation_service.get_reservation(db, reservation_id)
+    if not obj:
+        raise HTTPException(status_code=404, detail="Reservation not found")
+    etag, last_modified = row_set_validators(*rows_validators([obj]))
+    if is_fresh(request, etag, last_modified):
+        return not_modified(etag, last_modified)
+    response.headers.update(validator_headers(etag, last_modified))
+    return obj
+
+
+@reservations_router.get("/", response_model=list[ReservationOut])
+async def list_reservations(
+    request: Request,
+    resource_id: int | None = Query(default=None),
+    user_id: int | None = Query(default=None),
+    start: datetime | None = Query(default=None),
+    end: datetime | None = Query(default=None),
+    guest_last_name: str | None = Query(default=None),
+    limit: int | None = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(default=None),
+    output: Literal["json", "ndjson"] = Query(default="json", alias="format"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    filters = dict(
+        resource_id=resource_id, user_id=user_id, start=start, end=end, guest_last_name=guest_last_name
+    )
+    after = decode_cursor(cursor) if cursor else None
+    if output == "ndjson":
+        rows = async_reservation_service.iter_reservations(
+            db, **filters, limit=limit, after=after, chunk_size=STREAM_CHUNK_SIZE
+        )
+        return StreamingResponse(_ndjson_lines(rows), media_type="application/x-ndjson")
+
+    fetch = None if limit is None else limit + 1
+    if has_conditions(request):
+        etag, last_modified = row_set_validators(
+            *await async_reservation_service.list_validators(db, **filters, limit=fetch, after=after)
+        )
+        if is_fresh(request, etag, last_modified):
+            return not_modified(etag, last_modified)
+    page = await async_reservation_service.list_reservation_rows(db, **filters, limit=fetch, after=after)
+    headers = validator_headers(*row_set_validators(*rows_validators(page)))
+    if limit is not None and len(page) > limit:
+        page = page[:limit]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(page[-1].start_time, page[-1].id)
+    return Response(rows_json(ReservationOut, page), media_type="application/json", headers=headers)
+
+
+@reservations_router.patch("/{reservation_id:int}", response_model=ReservationOut)
+async def update_reservation(
+    reservation_id: int, data: ReservationUpdate, db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        obj = await async_reservation_service.update_reservation_by_id(db, reservation_id, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not obj:
+        raise HTTPException(status_code=404, detail="Reservation not found")
+    return obj
+
+
+@reservations_router.post("/{reservation_id:int}/cancel", response_model=ReservationOut)
+async def cancel_reservation(
+    reservation_id: int,
+    idempotency_key: str | None = Header(default=None, max_length=MAX_KEY_LENGTH),
+    db: AsyncSession = Depends(get_async_db),
+):
+    async def write() -> StoredResponse:
+        obj = await async_reservation_service.cancel_reservation_by_id(db, reservation_id)
+        if not obj:
+            return error_response(404, "Reservation not found")
+        return model_response(ReservationOut, obj)
+
+    return await idempotent_async(idempotency_key, "reservations.cancel", reservation_id, write)
+
+
+@reservations_router.delete("/{reservation_id:int}", status_code=204)
+async def delete_reservation(reservation_id: int, db: AsyncSession = Depends(get_async_db)):
+    if not await async_reservation_service.delete_reservation_by_id(db, reservation_id):
+        raise HTTPException(status_code=404, detail="Reservation not found")
+    return None
+
+
+@resources_router.post("/", response_model=ResourceOut, status_code=201)
+async def create_resource(data: ResourceCreate, db: AsyncSession = Depends(get_async_db)):
+    return await async_resource_service.create_resource(db, data)
+
+
+@resources_router.get("/{resource_id:int}", response_model=ResourceOut)
+async def get_resource(resource_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    obj = await async_resource_service.get_resource_cached(db, resource_id)
+    if not obj:
+        raise HTTPException(status_code=404, detail="Resource not found")
+    return conditional_json(request, json_body(obj))
+
+
+@resources_router.get("/", response_model=list[ResourceOut])
+async def list_resources(
+    request: Request,
+    organization_id: int | None = Query(default=None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    payload = await async_resource_service.list_resources_cached(db, organization_id=organization_id)
+    return conditional_json(request, json_body(payload))
+
+
+@resources_router.patch("/{resource_id:int}", response_model=ResourceOut)
+async def update_resource(resource_id: int, data: ResourceUpdate, db: AsyncSession = Depends(get_async_db)):
+    try:
+        obj = await async_resource_service.update_resource_by_id(db, resource_id, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not obj:
+        raise HTTPException(status_code=404, detail="Resource not found")
+    return obj
+
+
+@resources_router.delete("/{resource_id:int}", status_code=204)
+async def delete_resource(resource_id: int, db: AsyncSession = Depends(get_async_db)):
+    if not await async_resource_service.delete_resource_by_id(db, resource_id):
+        raise HTTPException(status_code=404, detail="Resource not found")
+    return None
+
+
+@organizations_router.post("/", response_model=OrganizationOut, status_code=201)
+async def create_organization(data: OrganizationCreate, db: AsyncSession = Depends(get_async_db)):
+    return await async_organization_service.create_organization(db, data)
+
+
+@organizations_router.get("/", response_model=list[OrganizationOut])
+async def list_organizations(request: Request, db: AsyncSession = Depends(get_async_db)):
+    payload = await async_organization_service.list_organizations_cached(db)
+    return conditional_json(request, json_body(payload))
+
+
+@organizations_router.get("/{org_id:int}", response_model=OrganizationOut)
+async def get_organization(
+    org_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)
+):
+    obj = await async_organization_service.get_organization(db, org_id)
+    if not obj:
+        raise HTTPException(status_code=404, detail="Organization not found")
+    etag, last_modified = row_set_validators(1, naive_utc(obj.updated_at), obj.id)
+    if is_fresh(request, etag, last_modified):
+        return not_modified(etag, last_modified)
+    response.headers.update(validator_headers(etag, last_modified))
+    return obj
+
+
+@organizations_router.patch("/{org_id:int}", response_model=OrganizationOut)
+async def update_organization(org_id: int, data: OrganizationUpdate, db: AsyncSession = Depends(get_async_db)):
+    obj = await async_organization_service.update_organization_by_id(db, org_id, data)
+    if not obj:
+        raise HTTPException(status_code=404, detail="Organization not found")
+    return obj
+
+
+@organizations_router.delete("/{org_id:int}", status_code=204)
+async def delete_organization(org_id: int, db: AsyncSession = Depends(get_async_db)):
+    if not await async_organization_service.delete_organization_by_id(db, org_id):
+        raise HTTPException(status_code=404, detail="Organization not found")
+    return None
+
+
+async_api_router = APIRouter()
+async_api_router.include_router(resources_router)
+async_api_router.include_router(reservations_router)
+async_api_router.include_router(organizations_router)
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any
+
+from fastapi import Request, Response
+
+ETAG_HEADER = "ETag"
+# Responses may be stored but must be revalidated, so a poll always reaches the server and
+# gets a 304 while nothing changed
+CACHE_CONTROL = "no-cache"
+
+
+def etag_for(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def json_body(payload: Any) -> bytes:
+    # Same bytes as FastAPI's JSONResponse
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def row_set_validators(count: int, latest: datetime | None, id_sum: int) -> tuple[str, datetime | None]:
+    # ETag and Last-Modified of a set of rows from its count, latest updated_at (naive UTC)
+    # and sum of ids; a single row is a set of one
+    etag = etag_for(f"{count}:{latest.isoformat() if latest else ''}:{id_sum}".encode())
+    return etag, latest
+
+
+def if_none_match(request: Request, etag: str) -> bool:
+    # Weak comparison (RFC 9110 13.1.2): W/"x" matches "x"
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in tags or etag in tags
+
+
+def has_conditions(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def is_fresh(request: Request, etag: str, last_modified: datetime | None = None) -> bool:
+    # If-Modified-Since only counts without If-None-Match (RFC 9110 13.2.2). It has whole
+    # seconds and cannot see deletions, so clients that keep the ETag get exact answers.
+    if "if-none-match" in request.headers:
+        return if_none_match(request, etag)
+    since = request.headers.get("if-modified-since")
+    if since is None or last_modified is None:
+        return False
+    try:
+        since_at = parsedate_to_datetime(since)
+    except (TypeError, ValueError):
+        return False
+    if since_at.tzinfo is None:
+        since_at = since_at.replace(tzinfo=timezone.utc)
+    return last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= since_at
+
+
+def validator_headers(etag: str, last_modified: datetime | None = None) -> dict[str, str]:
+    headers = {ETAG_HEADER: etag, "Cache-Control": CACHE_CONTROL}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+    return headers
+
+
+def not_modified(etag: str, last_modified: datetime | None = None) -> Response:
+    return Response(status_code=304, headers=validator_headers(etag, last_modified))
+
+
+def conditional_json(request: Request, body: bytes) -> Response:
+    # For payloads already in memory (cached reads, composed views): the ETag hashes the
+    # body, and an unchanged one costs the client a bodiless 304
+    etag = etag_for(body)
+    if if_none_match(request, etag):
+        return not_modified(etag)
+    return Response(content=body, media_type="application/json", headers=validator_headers(etag))
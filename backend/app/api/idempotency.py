@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from fastapi import HTTPException, Response
+from pydantic import BaseModel
+
+from app.api.conditional import json_body
+from app.core.idempotency import (
+    IdempotencyKeyInUse,
+    IdempotencyKeyReused,
+    StoredResponse,
+    digest,
+    idempotency,
+)
+
+# Write routes taking an Idempotency-Key header run once per key: a retry with the same key
+# and request gets the first response back, marked with REPLAYED_HEADER, without touching
+# the database. Keys are scoped to the route, and every response below 500 is kept.
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+
+def model_response(model: type[BaseModel], obj: Any, status_code: int = 200) -> StoredResponse:
+    # Same body as response_model would produce
+    return StoredResponse(status_code, model.model_validate(obj).model_dump_json().encode())
+
+
+def error_response(status_code: int, detail: str) -> StoredResponse:
+    # Same body as HTTPException
+    return StoredResponse(status_code, json_body({"detail": detail}))
+
+
+def _send(stored: StoredResponse, replayed: bool = False) -> Response:
+    headers = {REPLAYED_HEADER: "true"} if replayed else None
+    return Response(stored.body, status_code=stored.status_code, media_type="application/json", headers=headers)
+
+
+def _begin(name: str, fingerprint: bytes) -> Response | None:
+    try:
+        stored = idempotency.begin(name, fingerprint)
+    except IdempotencyKeyInUse:
+        raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+    except IdempotencyKeyReused:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+    return None if stored is None else _send(stored, replayed=True)
+
+
+def _fingerprint(scope: str, payload: BaseModel | int) -> bytes:
+    body = payload.model_dump_json() if isinstance(payload, BaseModel) else str(payload)
+    return digest(f"{scope}\n{body}")
+
+
+def idempotent(
+    key: str | None, scope: str, payload: BaseModel | int, write: Callable[[], StoredResponse]
+) -> Response:
+    # Runs `write` unless a request with this key and the same payload already did
+    if key is None:
+        return _send(write())
+    name, fingerprint = f"{scope}:{key}", _fingerprint(scope, payload)
+    if (replay := _begin(name, fingerprint)) is not None:
+        return replay
+    try:
+        stored = write()
+    except BaseException:
+        idempotency.release(name)
+        raise
+    idempotency.finish(name, fingerprint, stored)
+    return _send(stored)
+
+
+async def idempotent_async(
+    key: str | None, scope: str, payload: BaseModel | int, write: Callable[[], Awaitable[StoredResponse]]
+) -> Response:
+    # `idempotent` for the async routes
+    if key is None:
+        return _send(await write())
+    name, fingerprint = f"{scope}:{key}", _fingerprint(scope, payload)
+    if (replay := _begin(name, fingerprint)) is not None:
+        return replay
+    try:
+        stored = await write()
+    except BaseException:
+        idempotency.release(name)
+        raise
+    idempotency.finish(name, fingerprint, stored)
+    return _send(stored)
@@ -1,15 +1,29 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime, timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 
+from app.api.conditional import (
+    conditional_json,
+    is_fresh,
+    json_body,
+    not_modified,
+    row_set_validators,
+    validator_headers,
+)
 from app.db.database import get_db
+from app.schemas.calendar import CalendarOut
 from app.schemas.organization import OrganizationCreate, OrganizationOut, OrganizationUpdate
 from app.services import organization_service
+from app.services.reservation_service import naive_utc
 
 router = APIRouter(prefix="/organizations", tags=["Organizations"])
 
+MAX_CALENDAR_WINDOW = timedelta(days=366)
+
 
 @router.post("/", response_model=OrganizationOut, status_code=201)
 def create_organization(data: OrganizationCreate, db: Session = Depends(get_db)):
@@ -17,30 +31,50 @@ def create_organization(data: OrganizationCreate, db: Session = Depends(get_db))
 
 
 @router.get("/", response_model=list[OrganizationOut])
-def list_organizations(db: Session = Depends(get_db)):
-    return organization_service.list_organizations(db)
+def list_organizations(request: Request, db: Session = Depends(get_db)):
+    return conditional_json(request, json_body(organization_service.list_organizations_cached(db)))
 
 
 @router.get("/{org_id}", response_model=OrganizationOut)
-def get_organization(org_id: int, db: Session = Depends(get_db)):
+def get_organization(org_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
     obj = organization_service.get_organization(db, org_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Organization not found")
+    etag, last_modified = row_set_validators(1, naive_utc(obj.updated_at), obj.id)
+    if is_fresh(request, etag, last_modified):
+        return not_modified(etag, last_modified)
+    response.headers.update(validator_headers(etag, last_modified))
     return obj
 
 
+@router.get("/{org_id}/calendar", response_model=CalendarOut)
+def get_organization_calendar(
+    org_id: int,
+    request: Request,
+    start: datetime = Query(...),
+    end: datetime = Query(...),
+    db: Session = Depends(get_db),
+):
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    if end - start > MAX_CALENDAR_WINDOW:
+        raise HTTPException(status_code=400, detail="Calendar window is limited to 366 days")
+    calendar = organization_service.get_calendar(db, org_id, start, end)
+    if calendar is None:
+        raise HTTPException(status_code=404, detail="Organization not found")
+    return conditional_json(request, calendar.model_dump_json().encode())
+
+
 @router.patch("/{org_id}", response_model=OrganizationOut)
 def update_organization(org_id: int, data: OrganizationUpdate, db: Session = Depends(get_db)):
-    obj = organization_service.get_organization(db, org_id)
+    obj = organization_service.update_organization_by_id(db, org_id, data)
     if not obj:
         raise HTTPException(status_code=404, detail="Organization not found")
-    return organization_service.update_organization(db, obj, data)
+    return obj
 
 
 @router.delete("/{org_id}", status_code=204)
 def delete_organization(org_id: int, db: Session = Depends(get_db)):
-    obj = organization_service.get_organization(db, org_id)
-    if not obj:
+    if not organization_service.delete_organization_by_id(db, org_id):
         raise HTTPException(status_code=404, detail="Organization not found")
-    organization_service.delete_organization(db, obj)
     return None
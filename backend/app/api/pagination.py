@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import base64
+from datetime import datetime
+
+from fastapi import HTTPException
+
+# Response header carrying the cursor of the next page; absent on the last page.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(start_time: datetime, row_id: int) -> str:
+    raw = f"{start_time.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        start_time, row_id = raw.split("|")
+        return datetime.fromisoformat(start_time), int(row_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
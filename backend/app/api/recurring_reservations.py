@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.db.database import get_db
+from app.schemas.recurring_reservation import (
+    OccurrenceOut,
+    RecurrenceExceptionCreate,
+    RecurringReservationCreate,
+    RecurringReservationOut,
+)
+from app.services import recurring_service
+
+router = APIRouter(prefix="/recurring-reservations", tags=["Recurring Reservations"])
+
+MAX_OCCURRENCE_WINDOW = timedelta(days=366)
+
+
+@router.post("/", response_model=RecurringReservationOut, status_code=201)
+def create_recurring_reservation(data: RecurringReservationCreate, db: Session = Depends(get_db)):
+    try:
+        return recurring_service.create_recurring_reservation(db, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/", response_model=list[RecurringReservationOut])
+def list_recurring_reservations(
+    resource_id: int | None = Query(default=None),
+    db: Session = Depends(get_db),
+):
+    return recurring_service.list_recurring_reservations(db, resource_id=resource_id)
+
+
+@router.get("/occurrences", response_model=list[OccurrenceOut])
+def list_occurrences(
+    start: datetime = Query(...),
+    end: datetime = Query(...),
+    resource_id: int | None = Query(default=None),
+    rule_id: int | None = Query(default=None),
+    db: Session = Depends(get_db),
+):
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    if end - start > MAX_OCCURRENCE_WINDOW:
+        raise HTTPException(status_code=400, detail="Occurrence window is limited to 366 days")
+    return recurring_service.list_occurrences(db, start, end, resource_id=resource_id, rule_id=rule_id)
+
+
+@router.get("/{rule_id}", response_model=RecurringReservationOut)
+def get_recurring_reservation(rule_id: int, db: Session = Depends(get_db)):
+    obj = recurring_service.get_recurring_reservation(db, rule_id)
+    if not obj:
+        raise HTTPException(status_code=404, detail="Recurring reservation not found")
+    return obj
+
+
+@router.post("/{rule_id}/exceptions", response_model=RecurringReservationOut)
+def add_exception(rule_id: int, data: RecurrenceExceptionCreate, db: Session = Depends(get_db)):
+    try:
+        obj = recurring_service.add_exception(db, rule_id, data.occurrence_start)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not obj:
+        raise HTTPException(status_code=404, detail="Recurring reservation not found")
+    return obj
+
+
+@router.post("/{rule_id}/cancel", response_model=RecurringReservationOut)
+def cancel_recurring_reservation(rule_id: int, db: Session = Depends(get_db)):
+    obj = recurring_service.cancel_recurring_reservation_by_id(db, rule_id)
+    if not obj:
+        raise HTTPException(status_code=404, detail="Recurring reservation not found")
+    return obj
+
+
+@router.delete("/{rule_id}", status_code=204)
+def delete_recurring_reservation(rule_id: int, db: Session = Depends(get_db)):
+    if not recurring_service.delete_recurring_reservation_by_id(db, rule_id):
+        raise HTTPException(status_code=404, detail="Recurring reservation not found")
+    return None
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.database import get_db
+from app.schemas.report import UtilizationReport
+from app.services import report_service
+
+router = APIRouter(prefix="/reports", tags=["Reports"])
+
+MAX_REPORT_WINDOW = timedelta(days=731)
+
+
+@router.get("/utilization", response_model=UtilizationReport)
+def utilization_report(
+    start: date = Query(...),
+    end: date = Query(..., description="First day not included"),
+    granularity: Literal["day", "week"] = Query(default="day"),
+    group_by: Literal["resource", "organization"] = Query(default="resource"),
+    organization_id: int | None = Query(default=None),
+    resource_id: int | None = Query(default=None),
+    peak: bool = Query(default=True, description="Compute peak concurrency (always read live)"),
+    db: Session = Depends(get_db),
+):
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    if end - start > MAX_REPORT_WINDOW:
+        raise HTTPException(status_code=400, detail="Report window is limited to 731 days")
+    rows = report_service.utilization(
+        db,
+        start,
+        end,
+        granularity=granularity,
+        group_by=group_by,
+        organization_id=organization_id,
+        resource_id=resource_id,
+        use_rollup=settings.REPORTS_ROLLUP,
+        peak=peak,
+    )
+    return UtilizationReport(
+        start=start,
+        end=end,
+        granularity=granularity,
+        group_by=group_by,
+        source="rollup" if settings.REPORTS_ROLLUP else "live",
+        rows=rows,
+    )
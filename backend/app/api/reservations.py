@@ -1,71 +1,283 @@
 
 from __future__ import annotations
 
+import csv
+import io
+from collections.abc import Iterable, Iterator
 from datetime import datetime
+from typing import Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+import anyio
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
+from app.api.conditional import (
+    has_conditions,
+    is_fresh,
+    not_modified,
+    row_set_validators,
+    validator_headers,
+)
+from app.api.idempotency import MAX_KEY_LENGTH, error_response, idempotent, model_response
+from app.api.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from app.core.changefeed import changes
+from app.core.config import settings
+from app.core.idempotency import StoredResponse
 from app.db.database import get_db
-from app.schemas.reservation import ReservationCreate, ReservationOut, ReservationUpdate
-from app.services import reservation_service
+from app.models.reservation import Reservation
+from app.schemas.reservation import (
+    ReservationBulkCreate,
+    ReservationBulkResult,
+    ReservationCreate,
+    ReservationImportResult,
+    ReservationOut,
+    ReservationUpdate,
+)
+from app.schemas.rows import rows_json
+from app.services import reservation_service, search_service, transfer_service
 
 router = APIRouter(prefix="/reservations", tags=["Reservations"])
 
+STREAM_CHUNK_SIZE = 500
+EXPORT_COLUMNS = list(ReservationOut.model_fields)
+EXPORT_MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+def _ndjson_lines(rows: Iterable[Reservation]) -> Iterator[bytes]:
+    chunk: list[str] = []
+    for row in rows:
+        chunk.append(ReservationOut.model_validate(row).model_dump_json())
+        if len(chunk) == STREAM_CHUNK_SIZE:
+            yield ("\n".join(chunk) + "\n").encode()
+            chunk.clear()
+    if chunk:
+        yield ("\n".join(chunk) + "\n").encode()
+
+
+def _csv_lines(rows: Iterable[Reservation]) -> Iterator[bytes]:
+    # A header row, then one row per reservation in ReservationOut's JSON form (empty for null)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(ReservationOut.model_validate(row).model_dump(mode="json").values())
+        if count % STREAM_CHUNK_SIZE == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+def _body_chunks(request: Request) -> Iterator[bytes]:
+    # The request body as it arrives, for code running in a worker thread
+    stream = request.stream()
+
+    async def receive() -> bytes | None:
+        return await anext(stream, None)
+
+    while (chunk := anyio.from_thread.run(receive)) is not None:
+        if chunk:
+            yield chunk
+
 
 @router.post("/", response_model=ReservationOut, status_code=201)
-def create_reservation(data: ReservationCreate, db: Session = Depends(get_db)):
-    try:
-        return reservation_service.create_reservation(db, data)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+def create_reservation(
+    data: ReservationCreate,
+    idempotency_key: str | None = Header(default=None, max_length=MAX_KEY_LENGTH),
+    db: Session = Depends(get_db),
+):
+    def write() -> StoredResponse:
+        try:
+            obj = reservation_service.create_reservation(db, data)
+        except ValueError as e:
+            return error_response(400, str(e))
+        return model_response(ReservationOut, obj, 201)
+
+    return idempotent(idempotency_key, "reservations.create", data, write)
+
+
+@router.post("/bulk", response_model=ReservationBulkResult)
+def create_reservations_bulk(
+    data: ReservationBulkCreate,
+    idempotency_key: str | None = Header(default=None, max_length=MAX_KEY_LENGTH),
+    db: Session = Depends(get_db),
+):
+    def write() -> StoredResponse:
+        results = reservation_service.create_reservations_bulk(db, data.items)
+        accepted = sum(1 for r in results if r.accepted)
+        result = ReservationBulkResult(accepted=accepted, rejected=len(results) - accepted, results=results)
+        return model_response(ReservationBulkResult, result)
+
+    return idempotent(idempotency_key, "reservations.bulk", data, write)
+
+
+@router.get("/export", response_class=StreamingResponse)
+def export_reservations(
+    resource_id: int | None = Query(default=None),
+    user_id: int | None = Query(default=None),
+    start: datetime | None = Query(default=None),
+    end: datetime | None = Query(default=None),
+    guest_last_name: str | None = Query(default=None),
+    output: Literal["csv", "ndjson"] = Query(default="ndjson", alias="format"),
+    db: Session = Depends(get_db),
+):
+    # Every matching reservation, cancelled ones included, streamed from a server-side cursor
+    rows = reservation_service.iter_reservations(
+        db,
+        resource_id=resource_id,
+        user_id=user_id,
+        start=start,
+        end=end,
+        guest_last_name=guest_last_name,
+        chunk_size=STREAM_CHUNK_SIZE,
+    )
+    body = _csv_lines(rows) if output == "csv" else _ndjson_lines(rows)
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_MEDIA_TYPES[output],
+        headers={"Content-Disposition": f'attachment; filename="reservations.{output}"'},
+    )
+
+
+@router.post("/import", response_model=ReservationImportResult)
+async def import_reservations(
+    request: Request,
+    source: Literal["csv", "ndjson"] = Query(default="ndjson", alias="format"),
+    db: Session = Depends(get_db),
+):
+    # The body, an export from GET /export or any file with ReservationCreate's fields, is
+    # parsed while it uploads, in a worker thread like the other sync routes
+    return await run_in_threadpool(
+        transfer_service.import_reservations,
+        db,
+        _body_chunks(request),
+        source,
+        settings.IMPORT_BATCH_SIZE,
+        settings.IMPORT_MAX_ERRORS,
+    )
+
+
+@router.get("/search", response_model=list[ReservationOut])
+def search_reservations(
+    q: str | None = Query(default=None, max_length=200, description="Words to find in notes or contact"),
+    name: str | None = Query(default=None, max_length=100, description="Last name prefix, any case"),
+    status: list[str] | None = Query(default=None),
+    resource_id: int | None = Query(default=None),
+    start: datetime | None = Query(default=None),
+    end: datetime | None = Query(default=None),
+    limit: int = Query(default=50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(default=None),
+    db: Session = Depends(get_db),
+):
+    after = decode_cursor(cursor) if cursor else None
+    page = search_service.search_reservations(
+        db, q, name, status, resource_id=resource_id, start=start, end=end, limit=limit + 1, after=after
+    )
+    headers = {}
+    if len(page) > limit:
+        page = page[:limit]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(page[-1].start_time, page[-1].id)
+    return Response(rows_json(ReservationOut, page), media_type="application/json", headers=headers)
+
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_reservation_changes(
+    resource_id: int | None = Query(default=None),
+    last_event_id: str | None = Header(default=None),
+    after: str | None = Query(default=None),
+):
+    # Server-sent events for every reservation write from now on, or after the event id a
+    # reconnecting client sends (`after` is for clients that cannot set Last-Event-ID).
+    # No database session is held while the stream is open.
+    frames = changes.subscribe(last_event_id or after, resource_id, settings.CHANGEFEED_HEARTBEAT_SECONDS)
+    return StreamingResponse(
+        frames, media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.get("/{reservation_id}", response_model=ReservationOut)
-def get_reservation(reservation_id: int, db: Session = Depends(get_db)):
+def get_reservation(reservation_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
     obj = reservation_service.get_reservation(db, reservation_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Reservation not found")
+    etag, last_modified = row_set_validators(*reservation_service.rows_validators([obj]))
+    if is_fresh(request, etag, last_modified):
+        return not_modified(etag, last_modified)
+    response.headers.update(validator_headers(etag, last_modified))
     return obj
 
 
 @router.get("/", response_model=list[ReservationOut])
 def list_reservations(
+    request: Request,
     resource_id: int | None = Query(default=None),
     user_id: int | None = Query(default=None),
     start: datetime | None = Query(default=None),
     end: datetime | None = Query(default=None),
     guest_last_name: str | None = Query(default=None),
+    limit: int | None = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(default=None),
+    output: Literal["json", "ndjson"] = Query(default="json", alias="format"),
     db: Session = Depends(get_db),
 ):
-    return reservation_service.list_reservations(
-        db, resource_id=resource_id, user_id=user_id, start=start, end=end, guest_last_name=guest_last_name
+    filters = dict(
+        resource_id=resource_id, user_id=user_id, start=start, end=end, guest_last_name=guest_last_name
     )
+    after = decode_cursor(cursor) if cursor else None
+    if output == "ndjson":
+        rows = reservation_service.iter_reservations(
+            db, **filters, limit=limit, after=after, chunk_size=STREAM_CHUNK_SIZE
+        )
+        return StreamingResponse(_ndjson_lines(rows), media_type="application/x-ndjson")
+
+    # Fetch one extra row to learn whether another page follows. A conditional request is
+    # first checked against validators computed in the database, without loading any rows.
+    fetch = None if limit is None else limit + 1
+    if has_conditions(request):
+        etag, last_modified = row_set_validators(
+            *reservation_service.list_validators(db, **filters, limit=fetch, after=after)
+        )
+        if is_fresh(request, etag, last_modified):
+            return not_modified(etag, last_modified)
+    page = reservation_service.list_reservation_rows(db, **filters, limit=fetch, after=after)
+    headers = validator_headers(*row_set_validators(*reservation_service.rows_validators(page)))
+    if limit is not None and len(page) > limit:
+        page = page[:limit]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(page[-1].start_time, page[-1].id)
+    # Plain rows serialized in one pass; same body as response_model would produce
+    return Response(rows_json(ReservationOut, page), media_type="application/json", headers=headers)
 
 
 @router.patch("/{reservation_id}", response_model=ReservationOut)
 def update_reservation(reservation_id: int, data: ReservationUpdate, db: Session = Depends(get_db)):
-    obj = reservation_service.get_reservation(db, reservation_id)
-    if not obj:
-        raise HTTPException(status_code=404, detail="Reservation not found")
     try:
-        return reservation_service.update_reservation(db, obj, data)
+        obj = reservation_service.update_reservation_by_id(db, reservation_id, data)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    if not obj:
+        raise HTTPException(status_code=404, detail="Reservation not found")
+    return obj
 
 
 @router.post("/{reservation_id}/cancel", response_model=ReservationOut)
-def cancel_reservation(reservation_id: int, db: Session = Depends(get_db)):
-    obj = reservation_service.get_reservation(db, reservation_id)
-    if not obj:
-        raise HTTPException(status_code=404, detail="Reservation not found")
-    return reservation_service.cancel_reservation(db, obj)
+def cancel_reservation(
+    reservation_id: int,
+    idempotency_key: str | None = Header(default=None, max_length=MAX_KEY_LENGTH),
+    db: Session = Depends(get_db),
+):
+    def write() -> StoredResponse:
+        obj = reservation_service.cancel_reservation_by_id(db, reservation_id)
+        if not obj:
+            return error_response(404, "Reservation not found")
+        return model_response(ReservationOut, obj)
+
+    return idempotent(idempotency_key, "reservations.cancel", reservation_id, write)
 
 
 @router.delete("/{reservation_id}", status_code=204)
 def delete_reservation(reservation_id: int, db: Session = Depends(get_db)):
-    obj = reservation_service.get_reservation(db, reservation_id)
-    if not obj:
+    if not reservation_service.delete_reservation_by_id(db, reservation_id):
         raise HTTPException(status_code=404, detail="Reservation not found")
-    reservation_service.delete_reservation(db, obj)
     return None
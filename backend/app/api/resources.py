@@ -1,49 +1,106 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from datetime import datetime, timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 
+from app.api.conditional import conditional_json, json_body
 from app.db.database import get_db
+from app.schemas.availability import AvailabilityOut, TimeInterval
 from app.schemas.resource import ResourceCreate, ResourceOut, ResourceUpdate
-from app.services import resource_service
+from app.services import availability_service, resource_service
 
 router = APIRouter(prefix="/resources", tags=["Resources"])
 
+MAX_AVAILABILITY_WINDOW = timedelta(days=366)
+
+
+def _check_window(start: datetime, end: datetime) -> None:
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    if end - start > MAX_AVAILABILITY_WINDOW:
+        raise HTTPException(status_code=400, detail="Availability window is limited to 366 days")
+
 
 @router.post("/", response_model=ResourceOut, status_code=201)
 def create_resource(data: ResourceCreate, db: Session = Depends(get_db)):
     return resource_service.create_resource(db, data)
 
 
+@router.get("/available", response_model=list[ResourceOut])
+def list_available_resources(
+    start: datetime = Query(...),
+    end: datetime = Query(...),
+    organization_id: int | None = Query(default=None),
+    type: str | None = Query(default=None),
+    db: Session = Depends(get_db),
+):
+    _check_window(start, end)
+    return availability_service.free_resources(
+        db, start, end, organization_id=organization_id, resource_type=type
+    )
+
+
+@router.get("/{resource_id}/availability", response_model=AvailabilityOut)
+def get_resource_availability(
+    resource_id: int,
+    start: datetime = Query(...),
+    end: datetime = Query(...),
+    duration_minutes: int | None = Query(default=None, ge=1),
+    step_minutes: int | None = Query(default=None, ge=1),
+    db: Session = Depends(get_db),
+):
+    _check_window(start, end)
+    if not resource_service.get_resource(db, resource_id):
+        raise HTTPException(status_code=404, detail="Resource not found")
+    free = availability_service.free_intervals(db, resource_id, start, end)
+    slots = []
+    if duration_minutes is not None:
+        duration = timedelta(minutes=duration_minutes)
+        step = timedelta(minutes=step_minutes) if step_minutes else duration
+        slots = availability_service.candidate_slots(db, free, start, duration, step)
+    return AvailabilityOut(
+        resource_id=resource_id,
+        start=start,
+        end=end,
+        free=[TimeInterval(start=s, end=e) for s, e in free],
+        slots=[TimeInterval(start=s, end=e) for s, e in slots],
+    )
+
+
 @router.get("/{resource_id}", response_model=ResourceOut)
-def get_resource(resource_id: int, db: Session = Depends(get_db)):
-    obj = resource_service.get_resource(db, resource_id)
+def get_resource(resource_id: int, request: Request, db: Session = Depends(get_db)):
+    obj = resource_service.get_resource_cached(db, resource_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Resource not found")
-    return obj
+    return conditional_json(request, json_body(obj))
 
 
 @router.get("/", response_model=list[ResourceOut])
 def list_resources(
+    request: Request,
     organization_id: int | None = Query(default=None),
     db: Session = Depends(get_db),
 ):
-    return resource_service.list_resources(db, organization_id=organization_id)
+    payload = resource_service.list_resources_cached(db, organization_id=organization_id)
+    return conditional_json(request, json_body(payload))
 
 
 @router.patch("/{resource_id}", response_model=ResourceOut)
 def update_resource(resource_id: int, data: ResourceUpdate, db: Session = Depends(get_db)):
-    obj = resource_service.get_resource(db, resource_id)
+    try:
+        obj = resource_service.update_resource_by_id(db, resource_id, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not obj:
         raise HTTPException(status_code=404, detail="Resource not found")
-    return resource_service.update_resource(db, obj, data)
+    return obj
 
 
 @router.delete("/{resource_id}", status_code=204)
 def delete_resource(resource_id: int, db: Session = Depends(get_db)):
-    obj = resource_service.get_resource(db, resource_id)
-    if not obj:
+    if not resource_service.delete_resource_by_id(db, resource_id):
         raise HTTPException(status_code=404, detail="Resource not found")
-    resource_service.delete_resource(db, obj)
     return None
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+from app.core.config import settings
+
+
+class CacheStats:
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+class Cache(ABC):
+    # Read-through cache of JSON-compatible values. Subclasses store entries; this class
+    # counts hits/misses and guards against caching a value that a concurrent write has
+    # already invalidated (the write bumps the generation while the load is in flight).
+
+    def __init__(self) -> None:
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    @abstractmethod
+    def _get(self, key: str) -> Any | None:
+        ...
+
+    @abstractmethod
+    def _set(self, key: str, value: Any) -> None:
+        ...
+
+    @abstractmethod
+    def _delete(self, keys: tuple[str, ...]) -> None:
+        ...
+
+    def get_or_load(self, key: str, loader: Callable[[], Any]) -> Any:
+        value = self._get(key)
+        with self._lock:
+            if value is not None:
+                self.stats.hits += 1
+                return value
+            self.stats.misses += 1
+            generation = self._generation
+        value = loader()
+        # Misses are not cached, so a row created later is visible immediately
+        if value is not None:
+            with self._lock:
+                if generation == self._generation:
+                    self._set(key, value)
+        return value
+
+    def invalidate(self, *keys: str) -> None:
+        with self._lock:
+            self._generation += 1
+            self._delete(keys)
+            self.stats.invalidations += len(keys)
+
+    def info(self) -> dict[str, Any]:
+        return {"backend": type(self).__name__, **self.stats.as_dict()}
+
+
+class LRUCache(Cache):
+    # In-process LRU with a per-entry TTL
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        super().__init__()
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def _get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.stats.evictions += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _set(self, key: str, value: Any) -> None:
+        self._entries[key] = (self._clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def _delete(self, keys: tuple[str, ...]) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def info(self) -> dict[str, Any]:
+        return {**super().info(), "entries": len(self._entries), "maxsize": self.maxsize}
+
+
+class SharedCache(Cache):
+    # Cache shared by every worker, stored as JSON in a Redis-compatible client (anything
+    # with get/set(ex=...)/delete). Eviction is left to the store's own TTL and memory policy.
+
+    def __init__(self, client: Any, ttl: float = 30.0, prefix: str = "reservation-manager:"):
+        super().__init__()
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def _get(self, key: str) -> Any | None:
+        raw = self.client.get(self.prefix + key)
+        return None if raw is None else json.loads(raw)
+
+    def _set(self, key: str, value: Any) -> None:
+        self.client.set(self.prefix + key, json.dumps(value), ex=max(1, int(self.ttl)))
+
+    def _delete(self, keys: tuple[str, ...]) -> None:
+        if keys:
+            self.client.delete(*(self.prefix + key for key in keys))
+
+
+class LocalSharedClient:
+    # Minimal in-process stand-in for the Redis client used by SharedCache
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._data: dict[str, tuple[float | None, str]] = {}
+
+    def get(self, name: str) -> str | None:
+        entry = self._data.get(name)
+        if entry is None or (entry[0] is not None and entry[0] <= self._clock()):
+            self._data.pop(name, None)
+            return None
+        return entry[1]
+
+    def set(self, name: str, value: str, ex: int | None = None, nx: bool = False) -> bool | None:
+        if nx and self.get(name) is not None:
+            return None
+        self._data[name] = (self._clock() + ex if ex else None, value)
+        return True
+
+    def delete(self, *names: str) -> None:
+        for name in names:
+            self._data.pop(name, None)
+
+
+class NullCache(Cache):
+    def _get(self, key: str) -> Any | None:
+        return None
+
+    def _set(self, key: str, value: Any) -> None:
+        pass
+
+    def _delete(self, keys: tuple[str, ...]) -> None:
+        pass
+
+
+def build_cache() -> Cache:
+    backend = settings.CACHE_BACKEND
+    if backend == "memory":
+        return LRUCache(maxsize=settings.CACHE_MAX_ENTRIES, ttl=settings.CACHE_TTL_SECONDS)
+    if backend == "redis":
+        import redis  # optional dependency, only needed for the shared backend
+
+        return SharedCache(redis.Redis.from_url(settings.CACHE_URL), ttl=settings.CACHE_TTL_SECONDS)
+    if backend == "local":
+        return SharedCache(LocalSharedClient(), ttl=settings.CACHE_TTL_SECONDS)
+    if backend == "none":
+        return NullCache()
+    raise ValueError(f"Unknown CACHE_BACKEND {backend!r}")
+
+
+cache = build_cache()
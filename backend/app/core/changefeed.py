@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import secrets
+import threading
+from collections import deque
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.core.config import settings
+
+CREATED = "created"
+UPDATED = "updated"
+CANCELLED = "cancelled"
+DELETED = "deleted"
+RESET = "reset"
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    seq: int
+    type: str
+    resource_id: int
+    reservation_id: int
+    # The server-sent event frame, encoded once and shared by every subscriber
+    frame: bytes = field(repr=False)
+
+
+def event_id(epoch: str, seq: int) -> str:
+    return f"{epoch}-{seq}"
+
+
+def sse_frame(event: str, id: str, data: Any) -> bytes:
+    return f"id: {id}\nevent: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
+
+
+class ChangeFeed:
+    # Bounded, in-process log of reservation changes. Writers append from any thread;
+    # subscribers are async iterators that share one wake-up event per event loop and read
+    # new entries straight from the buffer, so publishing costs the same however many
+    # clients listen and nothing is queried per subscriber.
+    #
+    # Sequence numbers restart with the process; the epoch in every event id tells a
+    # reconnecting client that its position belongs to an earlier process.
+
+    def __init__(self, size: int = 10_000) -> None:
+        self.size = size
+        self.epoch = secrets.token_hex(4)
+        self._events: deque[ChangeEvent] = deque(maxlen=size)
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._wakers: dict[asyncio.AbstractEventLoop, asyncio.Event] = {}
+        self._subscribers = 0
+        self._resets = 0
+
+    @property
+    def seq(self) -> int:
+        return self._seq
+
+    def publish(self, type: str, resource_id: int, reservation_id: int, data: dict[str, Any]) -> ChangeEvent:
+        with self._lock:
+            self._seq += 1
+            payload = {"type": type, "resource_id": resource_id, "reservation_id": reservation_id, "data": data}
+            event = ChangeEvent(
+                self._seq, type, resource_id, reservation_id, sse_frame(type, event_id(self.epoch, self._seq), payload)
+            )
+            self._events.append(event)
+            loops = list(self._wakers)
+        for loop in loops:
+            try:
+                loop.call_soon_threadsafe(self._wake, loop)
+            except RuntimeError:  # loop closed
+                with self._lock:
+                    self._wakers.pop(loop, None)
+        return event
+
+    def _wake(self, loop: asyncio.AbstractEventLoop) -> None:
+        # Runs on the subscribers' loop: release everyone waiting and arm a fresh event
+        with self._lock:
+            waker = self._wakers.get(loop)
+            if waker is not None:
+                self._wakers[loop] = asyncio.Event()
+        if waker is not None:
+            waker.set()
+
+    def position(self, last_event_id: str | None) -> int | None:
+        # Sequence number to resume after, from a Last-Event-ID; None when the id comes from
+        # another process or is not one of ours. No id means "from now on".
+        if not last_event_id:
+            return self._seq
+        epoch, _, seq = last_event_id.partition("-")
+        if epoch != self.epoch or not seq.isdigit() or int(seq) > self._seq:
+            return None
+        return int(seq)
+
+    def since(self, seq: int) -> list[ChangeEvent] | None:
+        # Events after `seq` in order, or None when some of them already left the buffer
+        with self._lock:
+            if seq >= self._seq:
+                return []
+            if not self._events or self._events[0].seq > seq + 1:
+                return None
+            found = []
+            for event in reversed(self._events):
+                if event.seq <= seq:
+                    break
+                found.append(event)
+        found.reverse()
+        return found
+
+    def reset_frame(self) -> tuple[int, bytes]:
+        # Tells a client whose position cannot be replayed to reload, and where to resume
+        with self._lock:
+            self._resets += 1
+            seq = self._seq
+        return seq, sse_frame(RESET, event_id(self.epoch, seq), {"type": RESET, "seq": seq})
+
+    async def subscribe(
+        self, last_event_id: str | None, resource_id: int | None = None, heartbeat: float = 15.0
+    ) -> AsyncIterator[bytes]:
+        # Frames for one client: a reset when its position is lost, then every new event
+        # (for one resource if given), with an SSE comment after `heartbeat` idle seconds
+        # to keep proxies from closing the connection
+        loop = asyncio.get_running_loop()
+        position = self.position(last_event_id)
+        with self._lock:
+            self._subscribers += 1
+        try:
+            while True:
+                with self._lock:
+                    waker = self._wakers.setdefault(loop, asyncio.Event())
+                events = None if position is None else self.since(position)
+                if events is None:
+                    position, frame = self.reset_frame()
+                    yield frame
+                    continue
+                for event in events:
+                    if resource_id is None or event.resource_id == resource_id:
+                        yield event.frame
+                if events:
+                    position = events[-1].seq
+                    continue
+                try:
+                    await asyncio.wait_for(waker.wait(), heartbeat)
+                except TimeoutError:
+                    yield b": keepalive\n\n"
+        finally:
+            with self._lock:
+                self._subscribers -= 1
+
+    def info(self) -> dict[str, Any]:
+        return {
+            "published": self._seq,
+            "buffered": len(self._events),
+            "buffer_size": self.size,
+            "subscribers": self._subscribers,
+            "resets": self._resets,
+        }
+
+
+changes = ChangeFeed(settings.CHANGEFEED_BUFFER_SIZE)
@@ -1,6 +1,13 @@
 import os
 from pathlib import Path
 
+# Async drivers accepted in DATABASE_URL, mapped to the sync scheme used alongside them
+ASYNC_SCHEMES = {"sqlite+aiosqlite": "sqlite", "postgresql+asyncpg": "postgresql"}
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).strip().lower() in ("1", "true", "yes", "on")
+
 
 class Settings:
     def __init__(self):
@@ -9,4 +16,96 @@ class Settings:
 
         self.DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{default_sqlite_path}")
 
+        # An async driver in DATABASE_URL turns on the async session layer and routers.
+        # Sync code paths keep working against the same database through the sync driver.
+        self.ASYNC_DATABASE_URL = None
+        scheme, _, rest = self.DATABASE_URL.partition("://")
+        if scheme in ASYNC_SCHEMES:
+            self.ASYNC_DATABASE_URL = self.DATABASE_URL
+            self.DATABASE_URL = f"{ASYNC_SCHEMES[scheme]}://{rest}"
+
+        # Connection pool, per engine and per worker process: keep
+        # workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) below the database's connection limit.
+        self.DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+        self.DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+        self.DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+        self.DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", False)
+        self.DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "-1"))
+        # Server-side statement timeout in milliseconds (PostgreSQL only); 0 disables it
+        self.DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+
+        # Apply pending Alembic migrations (alembic upgrade head) at startup. Turn off where
+        # several workers start at once or a long index build should not delay startup, and
+        # run `alembic upgrade head` as a deploy step instead.
+        self.DB_MIGRATE_ON_STARTUP = _env_bool("DB_MIGRATE_ON_STARTUP", True)
+
+        # SQLite tuning: "default" keeps SQLite's own settings, "production" switches to WAL
+        # with synchronous=NORMAL so readers stop blocking on writers (see sqlite_pragmas).
+        self.SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "default")
+        self.SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+        self.SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))  # negative = KiB
+        self.SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+        # Read-through cache for resources and organizations: memory (per-process LRU),
+        # redis (shared between workers, needs the redis package), local (in-process
+        # stand-in for the shared backend) or none
+        self.CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+        self.CACHE_URL = os.getenv("CACHE_URL", "redis://localhost:6379/0")
+        self.CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "30"))
+        self.CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+
+        # Per-process cache of each resource's near-future bookings (SCHEDULE_CACHE_HORIZON_DAYS
+        # ahead), serving conflict and availability checks from memory. Entries are checked
+        # against a version the database bumps on every booking change; writes always check,
+        # reads at most every SCHEDULE_CACHE_REVALIDATE_SECONDS (0 checks every read).
+        self.SCHEDULE_CACHE = _env_bool("SCHEDULE_CACHE", False)
+        self.SCHEDULE_CACHE_HORIZON_DAYS = int(os.getenv("SCHEDULE_CACHE_HORIZON_DAYS", "30"))
+        self.SCHEDULE_CACHE_MAX_RESOURCES = int(os.getenv("SCHEDULE_CACHE_MAX_RESOURCES", "1024"))
+        self.SCHEDULE_CACHE_REVALIDATE_SECONDS = float(os.getenv("SCHEDULE_CACHE_REVALIDATE_SECONDS", "1"))
+
+        # Move reservations that ended more than ARCHIVE_RETENTION_DAYS ago to
+        # reservations_archive, every ARCHIVE_INTERVAL_SECONDS in batches of ARCHIVE_BATCH_SIZE
+        # rows per transaction (0 days keeps everything in the live table). Lists and reports
+        # reaching back past the horizon read both tables.
+        self.ARCHIVE_RETENTION_DAYS = int(os.getenv("ARCHIVE_RETENTION_DAYS", "0"))
+        self.ARCHIVE_INTERVAL_SECONDS = float(os.getenv("ARCHIVE_INTERVAL_SECONDS", "3600"))
+        self.ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "5000"))
+
+        # Request metrics served at /metrics. Requests slower than METRICS_SLOW_REQUEST_MS or
+        # running more than METRICS_MAX_QUERIES SQL statements are logged (0 turns a check off).
+        self.METRICS_ENABLED = _env_bool("METRICS_ENABLED", True)
+        self.METRICS_SLOW_REQUEST_MS = float(os.getenv("METRICS_SLOW_REQUEST_MS", "500"))
+        self.METRICS_MAX_QUERIES = int(os.getenv("METRICS_MAX_QUERIES", "20"))
+
+        # How far ahead of its first occurrence a new recurring reservation is checked
+        # against existing bookings (open-ended rules cannot be checked forever)
+        self.RECURRENCE_HORIZON_DAYS = int(os.getenv("RECURRENCE_HORIZON_DAYS", "366"))
+
+        # Serve the booked hours and counts of /api/reports from a daily rollup table kept
+        # current by database triggers (SQLite and PostgreSQL); off computes them from
+        # the reservations table on every request
+        self.REPORTS_ROLLUP = _env_bool("REPORTS_ROLLUP", False)
+
+        # Back GET /api/reservations/search with a full-text index (FTS5 on SQLite, pg_trgm on
+        # PostgreSQL) kept current by the database; off, or where unavailable, it scans with LIKE
+        self.SEARCH_INDEX = _env_bool("SEARCH_INDEX", True)
+
+        # Reservation change feed (GET /api/reservations/stream): how many recent events each
+        # process keeps for reconnecting clients to replay, and the idle keepalive interval
+        self.CHANGEFEED_BUFFER_SIZE = int(os.getenv("CHANGEFEED_BUFFER_SIZE", "10000"))
+        self.CHANGEFEED_HEARTBEAT_SECONDS = float(os.getenv("CHANGEFEED_HEARTBEAT_SECONDS", "15"))
+
+        # POST /api/reservations/import: records inserted (and committed) per transaction, and
+        # how many rejected records the response lists by line
+        self.IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+        self.IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "1000"))
+
+        # Responses of create, bulk create and cancel requests sent with an Idempotency-Key,
+        # replayed to retries for IDEMPOTENCY_TTL_SECONDS: memory (per process, at most
+        # IDEMPOTENCY_MAX_KEYS keys), redis (shared by workers at CACHE_URL), local
+        # (in-process stand-in for the shared backend) or none
+        self.IDEMPOTENCY_BACKEND = os.getenv("IDEMPOTENCY_BACKEND", "memory")
+        self.IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+        self.IDEMPOTENCY_MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "10000"))
+
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any, NamedTuple
+
+from app.core.config import settings
+
+# How long a shared-store claim outlives its request: a worker that dies mid-request frees
+# the key after this instead of after the full TTL
+CLAIM_SECONDS = 60
+
+
+class StoredResponse(NamedTuple):
+    status_code: int
+    body: bytes
+
+
+class IdempotencyKeyInUse(Exception):
+    # An earlier request with the same key has not finished yet
+    pass
+
+
+class IdempotencyKeyReused(Exception):
+    # The key was first sent with a different request
+    pass
+
+
+def digest(value: str) -> bytes:
+    return hashlib.blake2b(value.encode(), digest_size=16).digest()
+
+
+class IdempotencyStore(ABC):
+    # Responses of write requests sent with an Idempotency-Key, kept for `ttl` seconds.
+    # `begin` claims a key for a request (None), or returns the response stored for an
+    # earlier request with the same key and fingerprint. The claimant then stores its
+    # response with `finish`, or frees the key with `release` when it has none.
+
+    def __init__(self, ttl: float = 86400.0) -> None:
+        self.ttl = ttl
+        self.replays = 0
+        self.conflicts = 0
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def begin(self, key: str, fingerprint: bytes) -> StoredResponse | None:
+        ...
+
+    @abstractmethod
+    def finish(self, key: str, fingerprint: bytes, response: StoredResponse) -> None:
+        ...
+
+    @abstractmethod
+    def release(self, key: str) -> None:
+        ...
+
+    def _replay(self, stored: bytes, response: StoredResponse | None, fingerprint: bytes) -> StoredResponse:
+        with self._lock:
+            if stored != fingerprint:
+                self.conflicts += 1
+                raise IdempotencyKeyReused
+            if response is None:
+                self.conflicts += 1
+                raise IdempotencyKeyInUse
+            self.replays += 1
+            return response
+
+    def info(self) -> dict[str, Any]:
+        return {"backend": type(self).__name__, "replays": self.replays, "conflicts": self.conflicts}
+
+
+class MemoryIdempotencyStore(IdempotencyStore):
+    # Per-process store. An entry is the digests of key and request, the status and the body
+    # bytes. Every entry lives `ttl` from its last write, so the dict stays in expiry order
+    # and expired entries are dropped from its front; `max_entries` bounds it.
+
+    def __init__(self, ttl: float = 86400.0, max_entries: int = 10000, clock: Callable[[], float] = time.monotonic):
+        super().__init__(ttl)
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._clock = clock
+        self._entries: OrderedDict[bytes, tuple[float, bytes, StoredResponse | None]] = OrderedDict()
+
+    def _evict(self, now: float) -> None:
+        while self._entries:
+            expires_at = next(iter(self._entries.values()))[0]
+            if expires_at > now and len(self._entries) <= self.max_entries:
+                break
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def begin(self, key: str, fingerprint: bytes) -> StoredResponse | None:
+        slot = digest(key)
+        with self._lock:
+            now = self._clock()
+            self._evict(now)
+            entry = self._entries.get(slot)
+            if entry is None:
+                self._entries[slot] = (now + self.ttl, fingerprint, None)
+                self._evict(now)
+                return None
+        return self._replay(entry[1], entry[2], fingerprint)
+
+    def finish(self, key: str, fingerprint: bytes, response: StoredResponse) -> None:
+        slot = digest(key)
+        with self._lock:
+            now = self._clock()
+            self._entries[slot] = (now + self.ttl, fingerprint, response)
+            self._entries.move_to_end(slot)
+            self._evict(now)
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(digest(key), None)
+
+    def info(self) -> dict[str, Any]:
+        return {
+            **super().info(),
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+        }
+
+
+class SharedIdempotencyStore(IdempotencyStore):
+    # Store shared by every worker in a Redis-compatible client (get/set(ex=, nx=)/delete).
+    # A key is claimed with SET NX, so only one request per key runs across all workers.
+    # Values are "<fingerprint hex> <status> <body>", or "<fingerprint hex> -" while claimed.
+
+    def __init__(self, client: Any, ttl: float = 86400.0, prefix: str = "reservation-manager:idempotency:"):
+        super().__init__(ttl)
+        self.client = client
+        self.prefix = prefix
+
+    def _name(self, key: str) -> str:
+        return self.prefix + digest(key).hex()
+
+    def begin(self, key: str, fingerprint: bytes) -> StoredResponse | None:
+        name = self._name(key)
+        while not self.client.set(name, f"{fingerprint.hex()} -", ex=min(CLAIM_SECONDS, self._ex()), nx=True):
+            raw = self.client.get(name)
+            if raw is None:
+                # Expired between the two calls; claim again
+                continue
+            stored, status, *body = (raw.decode() if isinstance(raw, bytes) else raw).split(" ", 2)
+            response = None if status == "-" else StoredResponse(int(status), body[0].encode())
+            return self._replay(bytes.fromhex(stored), response, fingerprint)
+        return None
+
+    def finish(self, key: str, fingerprint: bytes, response: StoredResponse) -> None:
+        value = f"{fingerprint.hex()} {response.status_code} {response.body.decode()}"
+        self.client.set(self._name(key), value, ex=self._ex())
+
+    def release(self, key: str) -> None:
+        self.client.delete(self._name(key))
+
+    def _ex(self) -> int:
+        return max(1, int(self.ttl))
+
+
+class NullIdempotencyStore(IdempotencyStore):
+    # Idempotency-Key headers are ignored and every request runs
+
+    def begin(self, key: str, fingerprint: bytes) -> StoredResponse | None:
+        return None
+
+    def finish(self, key: str, fingerprint: bytes, response: StoredResponse) -> None:
+        pass
+
+    def release(self, key: str) -> None:
+        pass
+
+
+def build_idempotency_store() -> IdempotencyStore:
+    backend = settings.IDEMPOTENCY_BACKEND
+    ttl = settings.IDEMPOTENCY_TTL_SECONDS
+    if backend == "memory":
+        return MemoryIdempotencyStore(ttl=ttl, max_entries=settings.IDEMPOTENCY_MAX_KEYS)
+    if backend == "redis":
+        import redis  # optional dependency, only needed for the shared backend
+
+        return SharedIdempotencyStore(redis.Redis.from_url(settings.CACHE_URL), ttl=ttl)
+    if backend == "local":
+        from app.core.cache import LocalSharedClient
+
+        return SharedIdempotencyStore(LocalSharedClient(), ttl=ttl)
+    if backend == "none":
+        return NullIdempotencyStore()
+    raise ValueError(f"Unknown IDEMPOTENCY_BACKEND {backend!r}")
+
+
+idempotency = build_idempotency_store()
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from app.core.config import settings
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Request latency buckets in seconds (Prometheus client defaults)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+# SQL statements per request
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+# Monotonic entries of the pool, cache, schedule cache, change feed and idempotency stats
+# dicts; the rest are gauges
+COUNTER_KEYS = frozenset(
+    {
+        "connects", "checkouts", "timeouts", "wait_seconds_total",
+        "hits", "misses", "evictions", "invalidations", "stale",
+        "published", "resets", "replays", "conflicts",
+    }
+)
+
+
+@dataclass
+class RequestStats:
+    statements: int = 0
+    db_seconds: float = 0.0
+
+
+# Stats of the request being served. Sync routes run in a worker thread with a copy of the
+# context, which still points at the same RequestStats object.
+current_request: ContextVar[RequestStats | None] = ContextVar("current_request", default=None)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _labels(pairs: dict[str, str]) -> str:
+    if not pairs:
+        return ""
+    escaped = (
+        "{}=\"{}\"".format(k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in pairs.items()
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+class MetricsRegistry:
+    # Per-route request metrics and process-wide SQL counters, rendered in the Prometheus
+    # text exposition format
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency: dict[tuple[str, str, str], Histogram] = {}
+        self.statements: dict[tuple[str, str], Histogram] = {}
+        self.db_seconds: dict[tuple[str, str], float] = defaultdict(float)
+        self.sql_statements_total = 0
+        self.sql_seconds_total = 0.0
+        self.slow_requests_total = 0
+
+    def record_statement(self, seconds: float) -> None:
+        with self._lock:
+            self.sql_statements_total += 1
+            self.sql_seconds_total += seconds
+
+    def record_request(self, method: str, route: str, status: int, seconds: float, stats: RequestStats) -> None:
+        with self._lock:
+            key = (method, route, str(status))
+            if key not in self.latency:
+                self.latency[key] = Histogram(LATENCY_BUCKETS)
+            self.latency[key].observe(seconds)
+            if (method, route) not in self.statements:
+                self.statements[method, route] = Histogram(STATEMENT_BUCKETS)
+            self.statements[method, route].observe(stats.statements)
+            self.db_seconds[method, route] += stats.db_seconds
+
+        too_many = settings.METRICS_MAX_QUERIES and stats.statements > settings.METRICS_MAX_QUERIES
+        too_slow = settings.METRICS_SLOW_REQUEST_MS and seconds * 1000 > settings.METRICS_SLOW_REQUEST_MS
+        if too_many or too_slow:
+            with self._lock:
+                self.slow_requests_total += 1
+            logger.warning(
+                "Slow request %s %s -> %s: %.1f ms, %d SQL statements, %.1f ms in the database",
+                method,
+                route,
+                status,
+                seconds * 1000,
+                stats.statements,
+                stats.db_seconds * 1000,
+            )
+
+    def render(self, gauges: dict[str, dict[str, float]] | None = None) -> str:
+        lines: list[str] = []
+
+        def histogram(name: str, help_text: str, series: dict, label_names: tuple[str, ...]) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for key, hist in sorted(series.items()):
+                labels = dict(zip(label_names, key))
+                cumulative = 0
+                for bound, count in zip(hist.buckets, hist.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels({**labels, 'le': format(bound, 'g')})} {cumulative}")
+                lines.append(f"{name}_bucket{_labels({**labels, 'le': '+Inf'})} {hist.count}")
+                lines.append(f"{name}_sum{_labels(labels)} {hist.sum}")
+                lines.append(f"{name}_count{_labels(labels)} {hist.count}")
+
+        def scalar(name: str, kind: str, help_text: str, value: float, labels: dict | None = None) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name}{_labels(labels or {})} {value}")
+
+        with self._lock:
+            histogram(
+                "http_request_duration_seconds",
+                "Request latency by route template.",
+                self.latency,
+                ("method", "route", "status"),
+            )
+            histogram(
+                "http_request_sql_statements",
+                "SQL statements executed per request.",
+                self.statements,
+                ("method", "route"),
+            )
+            lines.append("# HELP http_request_db_seconds_total Time spent executing SQL, by route.")
+            lines.append("# TYPE http_request_db_seconds_total counter")
+            for (method, route), seconds in sorted(self.db_seconds.items()):
+                lines.append(f"http_request_db_seconds_total{_labels({'method': method, 'route': route})} {seconds}")
+            scalar("db_statements_total", "counter", "SQL statements executed.", self.sql_statements_total)
+            scalar("db_statement_seconds_total", "counter", "Time spent executing SQL.", self.sql_seconds_total)
+            scalar(
+                "http_slow_requests_total",
+                "counter",
+                "Requests over METRICS_SLOW_REQUEST_MS or METRICS_MAX_QUERIES.",
+                self.slow_requests_total,
+            )
+
+        for prefix, values in (gauges or {}).items():
+            for key, value in sorted(values.items()):
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                description = f"{prefix} {key.replace('_', ' ')}."
+                if key in COUNTER_KEYS:
+                    name = f"{prefix}_{key}" if key.endswith("_total") else f"{prefix}_{key}_total"
+                    scalar(name, "counter", description, value)
+                else:
+                    scalar(f"{prefix}_{key}", "gauge", description, value)
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # The start time rides on the connection until the matching after/error event
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    metrics.record_statement(elapsed)
+    stats = current_request.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started"):
+        conn.info["query_started"].pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    # Times every statement run on `engine`; safe to call more than once
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+
+class MetricsMiddleware:
+    # Pure ASGI so the timing covers streamed bodies up to their last chunk
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_request.reset(token)
+            route = scope.get("route")
+            metrics.record_request(
+                scope["method"],
+                getattr(route, "path", "<unmatched>"),
+                status,
+                time.perf_counter() - started,
+                stats,
+            )
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.models.reservation import ArchivedReservation
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+# Reservations that ended more than ARCHIVE_RETENTION_DAYS ago are moved to
+# reservations_archive by app.services.archive_service. The indexes used by conflict checks
+# and lists then only hold recent and future bookings. Reads decide without a query whether
+# their window can reach archived rows (ArchiveHorizon.reaches), and only then read both
+# tables. On PostgreSQL the archive is range-partitioned by start_time, one partition per
+# year, so a year of history can be detached or dropped as a whole.
+
+# Slack between times taken from the clock in UTC and stored ones: on SQLite they are the
+# clients' wall clock, which is less than a day away from UTC
+CLOCK_MARGIN = timedelta(days=1)
+
+
+def naive_utc(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+
+class ArchiveHorizon:
+    # How far back archived history may reach, as seen by this process
+
+    def __init__(self, retention_days: int = 0):
+        self.retention = timedelta(days=retention_days) if retention_days > 0 else None
+        # Newest end_time in the archive, read at startup and after each local archive run
+        self.archived_until: datetime | None = None
+
+    @property
+    def active(self) -> bool:
+        return self.retention is not None or self.archived_until is not None
+
+    def cutoff(self) -> datetime | None:
+        # Archived rows end before this. Other workers' runs may have moved rows since this
+        # process last looked, but only ones older than the retention horizon.
+        cutoff = self.archived_until
+        if self.retention is not None:
+            horizon = naive_utc(datetime.now(timezone.utc) - self.retention)
+            cutoff = horizon if cutoff is None else max(cutoff, horizon)
+        return None if cutoff is None else cutoff + CLOCK_MARGIN
+
+    def reaches(self, start: datetime | None) -> bool:
+        # Whether rows ending after `start` (any row, for None) may be in the archive
+        cutoff = self.cutoff()
+        return cutoff is not None and (start is None or naive_utc(start) < cutoff)
+
+    def refresh(self, db: Connection | Session) -> None:
+        latest = db.execute(select(func.max(ArchivedReservation.end_time))).scalar()
+        self.archived_until = None if latest is None else naive_utc(latest)
+
+
+archive = ArchiveHorizon(settings.ARCHIVE_RETENTION_DAYS)
+
+
+def ensure_archive_partitions(db: Session, first: datetime, last: datetime) -> None:
+    # PostgreSQL: the yearly partitions for start times from `first` to `last`
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    for year in range(naive_utc(first).year, naive_utc(last).year + 1):
+        db.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS reservations_archive_{year} PARTITION OF reservations_archive"
+                f" FOR VALUES FROM ('{year}-01-01 00:00:00+00') TO ('{year + 1}-01-01 00:00:00+00')"
+            )
+        )
+
+
+def sync_archive(bind: Engine) -> None:
+    # Startup hook: learns how far archived history reaches
+    with bind.connect() as conn:
+        archive.refresh(conn)
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+
+from app.core.config import settings
+from app.core.metrics import instrument_engine
+from app.db.database import set_sqlite_pragma
+from app.db.pooling import PoolMetrics, engine_options
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL
+async_pool_metrics = PoolMetrics()
+
+# Only built when DATABASE_URL names an async driver (sqlite+aiosqlite, postgresql+asyncpg);
+# the driver package itself is an optional dependency.
+async_engine = (
+    create_async_engine(ASYNC_DATABASE_URL, echo=False, **engine_options(ASYNC_DATABASE_URL, async_pool_metrics))
+    if ASYNC_DATABASE_URL
+    else None
+)
+
+if async_engine is not None:
+    event.listen(async_engine.sync_engine, "connect", async_pool_metrics.record_connect)
+    if settings.METRICS_ENABLED:
+        instrument_engine(async_engine.sync_engine)
+    if async_engine.dialect.name == "sqlite":
+        event.listen(async_engine.sync_engine, "connect", set_sqlite_pragma)
+
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
+        yield db
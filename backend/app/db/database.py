@@ -1,30 +1,75 @@
 from __future__ import annotations
 
+from datetime import datetime, timezone
+
 from app.core.config import settings
+from app.core.metrics import instrument_engine
+from app.db.pooling import PoolMetrics, engine_options
 from sqlalchemy import create_engine, event
 from sqlalchemy.orm import declarative_base, sessionmaker
 
 DATABASE_URL = settings.DATABASE_URL
-connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
+pool_metrics = PoolMetrics()
 
 engine = create_engine(
     DATABASE_URL,
     echo=False,  # Set to True to see SQL queries in logs
     future=True,
-    connect_args=connect_args,
+    **engine_options(DATABASE_URL, pool_metrics),
 )
+event.listen(engine, "connect", pool_metrics.record_connect)
+if settings.METRICS_ENABLED:
+    instrument_engine(engine)
 
-# Enable SQLite foreign key constraints
-if DATABASE_URL.startswith("sqlite"):
-    @event.listens_for(engine, "connect")
-    def set_sqlite_pragma(dbapi_connection, connection_record):  # type: ignore[no-redef]
+SQLITE_PROFILES = ("default", "production")
+
+
+def sqlite_pragmas(profile: str) -> list[str]:
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLITE_PROFILE {profile!r}, expected one of {SQLITE_PROFILES}")
+    pragmas = ["foreign_keys=ON"]
+    if profile == "production":
+        pragmas += [
+            "journal_mode=WAL",
+            "synchronous=NORMAL",  # durable in WAL mode except on power loss
+            f"mmap_size={settings.SQLITE_MMAP_SIZE}",
+            f"cache_size={settings.SQLITE_CACHE_SIZE}",
+            f"busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+            "temp_store=MEMORY",
+        ]
+    return pragmas
+
+
+def sqlite_pragma_listener(profile: str):
+    pragmas = sqlite_pragmas(profile)
+
+    def set_pragmas(dbapi_connection, connection_record):
         cursor = dbapi_connection.cursor()
-        cursor.execute("PRAGMA foreign_keys=ON")
+        for pragma in pragmas:
+            cursor.execute(f"PRAGMA {pragma}")
         cursor.close()
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, future=True)
+    return set_pragmas
+
+
+set_sqlite_pragma = sqlite_pragma_listener(settings.SQLITE_PROFILE)
+
+# Enable SQLite foreign key constraints, plus the tuning of the selected SQLITE_PROFILE
+if DATABASE_URL.startswith("sqlite"):
+    event.listen(engine, "connect", set_sqlite_pragma)
+
+# Write paths return the rows they wrote (INSERT/UPDATE ... RETURNING), so nothing needs
+# reloading after commit
+SessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine, future=True
+)
 Base = declarative_base()
 
+def utcnow() -> datetime:
+    # Python-side updated_at: microsecond resolution on every backend (SQLite's
+    # CURRENT_TIMESTAMP has whole seconds), so conditional GET validators see every write
+    return datetime.now(timezone.utc)
+
 def get_db():
     db = SessionLocal()
     try:
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+
+from alembic import command, op
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from app.db.search import POSTGRESQL_INDEXES
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+# The revision matching what the first release's create_all() built; the next revision
+# adds what later releases created outside migrations, skipping whatever already exists
+BASELINE_REVISION = "0001"
+
+
+def alembic_config(connection: Connection | None = None) -> Config:
+    # The repo's alembic.ini, usable from any working directory; with a connection, env.py
+    # migrates that connection instead of opening its own
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    config.attributes["configure_logger"] = False
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def include_object(obj, name, type_, reflected, compare_to) -> bool:
+    # Autogenerate filter: the search index (FTS5 table and its shadow tables, pg_trgm
+    # indexes) is built by revision 0008 outside the models
+    if type_ == "table" and name.startswith("reservations_fts"):
+        return False
+    if type_ == "index" and name in POSTGRESQL_INDEXES:
+        return False
+    return True
+
+
+def head_revision() -> str | None:
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+
+def current_revision(conn: Connection) -> str | None:
+    return MigrationContext.configure(conn).get_current_revision()
+
+
+def upgrade_database(bind: Engine) -> None:
+    # Startup hook for DB_MIGRATE_ON_STARTUP. A database built by create_all() has at least
+    # the baseline tables but no alembic_version, so it is stamped at the baseline rather
+    # than recreated, then upgraded.
+    with bind.connect() as conn:
+        revision = current_revision(conn)
+        legacy = revision is None and inspect(conn).has_table("reservations")
+        # Alembic runs each revision in its own transaction, so none may be open here
+        conn.commit()
+        config = alembic_config(conn)
+        if legacy:
+            logger.info("Stamping database created without migrations at revision %s", BASELINE_REVISION)
+            command.stamp(config, BASELINE_REVISION)
+        if revision != head_revision():
+            command.upgrade(config, "head")
+
+
+def check_database_revision(bind: Engine) -> bool:
+    # With DB_MIGRATE_ON_STARTUP off, migrations are a deploy step; say so when one is missing
+    with bind.connect() as conn:
+        revision = current_revision(conn)
+    head = head_revision()
+    if revision != head:
+        logger.warning("Database is at revision %s, expected %s; run `alembic upgrade head`", revision, head)
+    return revision == head
+
+
+def _invalid_index(name: str) -> bool:
+    found = op.get_bind().execute(
+        text(
+            "SELECT 1 FROM pg_index JOIN pg_class ON pg_class.oid = pg_index.indexrelid"
+            " WHERE pg_class.relname = :name AND NOT pg_index.indisvalid"
+        ),
+        {"name": name},
+    )
+    return found.first() is not None
+
+
+def create_index_online(index_name: str, table_name: str, columns: list, **kw) -> None:
+    # For revisions indexing large tables. On PostgreSQL the index is built with
+    # CREATE INDEX CONCURRENTLY, outside the revision's transaction, so reads and writes carry
+    # on meanwhile; a build that failed earlier leaves an invalid index, which is dropped
+    # and rebuilt. Elsewhere it is a plain CREATE INDEX.
+    if op.get_bind().dialect.name != "postgresql":
+        op.create_index(index_name, table_name, columns, if_not_exists=True, **kw)
+        return
+    context = op.get_context()
+    with context.autocommit_block():
+        # Offline (`alembic upgrade --sql`) there is no database to look at
+        if not context.as_sql and _invalid_index(index_name):
+            op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True, if_exists=True)
+        op.create_index(index_name, table_name, columns, postgresql_concurrently=True, if_not_exists=True, **kw)
+
+
+def drop_index_online(index_name: str, table_name: str) -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        op.drop_index(index_name, table_name=table_name, if_exists=True)
+        return
+    with op.get_context().autocommit_block():
+        op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any
+
+from app.core.config import settings
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import Pool, QueuePool
+
+
+class PoolMetrics:
+    # Counters for one engine's pool; gauges are read live from the pool in snapshot()
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_checkout(self, waited: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def record_connect(self, *_: Any) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def snapshot(self, pool: Pool) -> dict[str, Any]:
+        stats: dict[str, Any] = {
+            "pool_class": type(pool).__name__.removeprefix("Timed"),
+            "connects": self.connects,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_seconds_total": round(self.wait_seconds_total, 6),
+            "wait_seconds_max": round(self.wait_seconds_max, 6),
+        }
+        if isinstance(pool, QueuePool):
+            stats.update(
+                size=pool.size(),
+                checked_in=pool.checkedin(),
+                checked_out=pool.checkedout(),
+                overflow=pool.overflow(),
+            )
+        return stats
+
+
+def _timed_pool_class(pool_class: type[Pool], metrics: PoolMetrics) -> type[Pool]:
+    # Pool events only fire once a connection is in hand, so the time spent waiting for one
+    # is measured around Pool.connect() instead.
+    class TimedPool(pool_class):  # type: ignore[valid-type, misc]
+        def connect(self):
+            started = time.perf_counter()
+            try:
+                conn = super().connect()
+            except exc.TimeoutError:
+                metrics.record_checkout(time.perf_counter() - started, timed_out=True)
+                raise
+            metrics.record_checkout(time.perf_counter() - started)
+            return conn
+
+    TimedPool.__name__ = f"Timed{pool_class.__name__}"
+    return TimedPool
+
+
+def engine_options(url: str, metrics: PoolMetrics) -> dict[str, Any]:
+    # Keyword arguments for create_engine/create_async_engine built from Settings
+    parsed = make_url(url)
+    pool_class = parsed.get_dialect().get_pool_class(parsed)
+    options: dict[str, Any] = {
+        "poolclass": _timed_pool_class(pool_class, metrics),
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+    # Only queue pools have a size; SQLite in-memory and aiosqlite use other pool classes
+    if issubclass(pool_class, QueuePool):
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+        )
+
+    connect_args: dict[str, Any] = {}
+    backend, driver = parsed.get_backend_name(), parsed.get_driver_name()
+    if backend == "sqlite" and driver == "pysqlite":
+        connect_args["check_same_thread"] = False
+    if settings.DB_STATEMENT_TIMEOUT_MS and backend == "postgresql":
+        if driver == "asyncpg":
+            connect_args["server_settings"] = {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+        else:
+            connect_args["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+    options["connect_args"] = connect_args
+    return options
+
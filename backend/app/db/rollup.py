@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+from app.models.reservation import ArchivedReservation, Reservation
+from app.models.resource_daily_usage import ResourceDailyUsage
+from sqlalchemy import (
+    Date,
+    Integer,
+    case,
+    cast,
+    delete,
+    extract,
+    func,
+    insert,
+    select,
+    text,
+    union_all,
+)
+from sqlalchemy.engine import Connection, Engine
+
+# Triggers keep resource_daily_usage in step with every write to reservations, whichever
+# code path (ORM, bulk insert, set-wise delete, cascade) makes it. An update moves a row's
+# contribution: the old values are taken out, the new ones added. Rows deleted once copied
+# to reservations_archive (app.services.archive_service) keep counting: reports cover the
+# archive too.
+
+# A deleted row that the archive holds a copy of
+ARCHIVED = "EXISTS (SELECT 1 FROM reservations_archive WHERE id = OLD.id AND start_time = OLD.start_time)"
+
+SQLITE_DAY = "date({row}.start_time)"
+SQLITE_SECONDS = "CAST(round((julianday({row}.end_time) - julianday({row}.start_time)) * 86400) AS INTEGER)"
+
+SQLITE_APPLY = """
+INSERT INTO resource_daily_usage (resource_id, day, reservations, cancelled, booked_seconds)
+VALUES (
+    {row}.resource_id, {day}, {sign}, {sign} * ({row}.status IS 'cancelled'),
+    CASE WHEN {row}.status IS 'cancelled' THEN 0 ELSE {sign} * {seconds} END
+)
+ON CONFLICT (resource_id, day) DO UPDATE SET
+    reservations = reservations + excluded.reservations,
+    cancelled = cancelled + excluded.cancelled,
+    booked_seconds = booked_seconds + excluded.booked_seconds;
+DELETE FROM resource_daily_usage
+WHERE resource_id = {row}.resource_id AND day = {day} AND reservations = 0;
+"""
+
+
+def _sqlite_apply(row: str, sign: int) -> str:
+    day = SQLITE_DAY.format(row=row)
+    return SQLITE_APPLY.format(row=row, day=day, sign=sign, seconds=SQLITE_SECONDS.format(row=row))
+
+
+SQLITE_TRIGGERS = {
+    "reservations_usage_insert": (
+        f"CREATE TRIGGER reservations_usage_insert AFTER INSERT ON reservations BEGIN"
+        f"{_sqlite_apply('NEW', 1)}END"
+    ),
+    "reservations_usage_delete": (
+        f"CREATE TRIGGER reservations_usage_delete AFTER DELETE ON reservations WHEN NOT {ARCHIVED} BEGIN"
+        f"{_sqlite_apply('OLD', -1)}END"
+    ),
+    "reservations_usage_update": (
+        "CREATE TRIGGER reservations_usage_update"
+        " AFTER UPDATE OF resource_id, start_time, end_time, status ON reservations BEGIN"
+        f"{_sqlite_apply('OLD', -1)}{_sqlite_apply('NEW', 1)}END"
+    ),
+}
+
+POSTGRESQL_FUNCTIONS = (
+    """
+CREATE OR REPLACE FUNCTION reservations_usage_apply(
+    r_resource_id integer, r_start timestamptz, r_end timestamptz, r_status text, sign integer
+) RETURNS void AS $$
+DECLARE
+    r_day date := (r_start AT TIME ZONE 'UTC')::date;
+    r_cancelled boolean := r_status IS NOT DISTINCT FROM 'cancelled';
+BEGIN
+    INSERT INTO resource_daily_usage AS u (resource_id, day, reservations, cancelled, booked_seconds)
+    VALUES (
+        r_resource_id,
+        r_day,
+        sign,
+        CASE WHEN r_cancelled THEN sign ELSE 0 END,
+        CASE WHEN r_cancelled THEN 0 ELSE sign * round(extract(epoch FROM r_end - r_start))::integer END
+    )
+    ON CONFLICT (resource_id, day) DO UPDATE SET
+        reservations = u.reservations + excluded.reservations,
+        cancelled = u.cancelled + excluded.cancelled,
+        booked_seconds = u.booked_seconds + excluded.booked_seconds;
+    DELETE FROM resource_daily_usage WHERE resource_id = r_resource_id AND day = r_day AND reservations = 0;
+END
+$$ LANGUAGE plpgsql
+""",
+    """
+CREATE OR REPLACE FUNCTION reservations_usage() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' AND %s THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM reservations_usage_apply(OLD.resource_id, OLD.start_time, OLD.end_time, OLD.status, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM reservations_usage_apply(NEW.resource_id, NEW.start_time, NEW.end_time, NEW.status, 1);
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+    % ARCHIVED,
+)
+POSTGRESQL_TRIGGER = (
+    "CREATE TRIGGER reservations_usage"
+    " AFTER INSERT OR DELETE OR UPDATE OF resource_id, start_time, end_time, status ON reservations"
+    " FOR EACH ROW EXECUTE FUNCTION reservations_usage()"
+)
+
+
+def usage_day(column, dialect: str):
+    # The day a reservation is counted under, as the triggers compute it: the stored wall
+    # clock date on SQLite, the UTC date elsewhere
+    if dialect == "sqlite":
+        return func.date(column, type_=Date)
+    return cast(func.timezone("UTC", column), Date)
+
+
+def usage_seconds(start, end, dialect: str):
+    if dialect == "sqlite":
+        return cast(func.round((func.julianday(end) - func.julianday(start)) * 86400), Integer)
+    return cast(func.round(extract("epoch", end - start)), Integer)
+
+
+def _check_dialect(dialect: str) -> None:
+    if dialect not in ("sqlite", "postgresql"):
+        raise ValueError(f"REPORTS_ROLLUP is not supported on {dialect}")
+
+
+def rollup_installed(conn: Connection) -> bool:
+    # Triggers from an older version of this module count as missing
+    if conn.dialect.name == "sqlite":
+        found = conn.execute(
+            text("SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'reservations_usage%'")
+        )
+        return dict(found.tuples().all()) == SQLITE_TRIGGERS
+    return conn.execute(text("SELECT 1 FROM pg_trigger WHERE tgname = 'reservations_usage'")).first() is not None
+
+
+def usage_source(include_archive: bool = True):
+    # The columns usage is computed from, for live reservations and optionally archived ones
+    columns = ("resource_id", "start_time", "end_time", "status")
+    if not include_archive:
+        return Reservation.__table__
+    return union_all(
+        select(*(Reservation.__table__.c[name] for name in columns)),
+        select(*(ArchivedReservation.__table__.c[name] for name in columns)),
+    ).subquery("reservations")
+
+
+def usage_rollup_rebuild(dialect: str) -> tuple:
+    # Statements recomputing the whole table from reservations, archived ones included, in
+    # one INSERT ... SELECT
+    source = usage_source()
+    day = usage_day(source.c.start_time, dialect)
+    cancelled = source.c.status.is_not_distinct_from("cancelled")
+    return (
+        delete(ResourceDailyUsage),
+        insert(ResourceDailyUsage).from_select(
+            ["resource_id", "day", "reservations", "cancelled", "booked_seconds"],
+            select(
+                source.c.resource_id,
+                day,
+                func.count(),
+                func.sum(case((cancelled, 1), else_=0)),
+                func.sum(
+                    case(
+                        (cancelled, 0),
+                        else_=usage_seconds(source.c.start_time, source.c.end_time, dialect),
+                    )
+                ),
+            ).group_by(source.c.resource_id, day),
+        ),
+    )
+
+
+def usage_rollup_ddl(dialect: str) -> tuple[str, ...]:
+    # Statements creating the triggers, for migrations and install_usage_rollup
+    if dialect == "sqlite":
+        return tuple(SQLITE_TRIGGERS.values())
+    return (*POSTGRESQL_FUNCTIONS, POSTGRESQL_TRIGGER)
+
+
+def drop_usage_rollup_ddl(dialect: str) -> tuple[str, ...]:
+    if dialect == "sqlite":
+        return tuple(f"DROP TRIGGER IF EXISTS {name}" for name in SQLITE_TRIGGERS)
+    return ("DROP TRIGGER IF EXISTS reservations_usage ON reservations",)
+
+
+def rebuild_usage_rollup(conn: Connection) -> None:
+    for stmt in usage_rollup_rebuild(conn.dialect.name):
+        conn.execute(stmt)
+
+
+def install_usage_rollup(bind: Engine) -> None:
+    # Installed by migration 0009; this covers schemas built with create_all() (tests,
+    # benchmarks). The table is only trusted while the triggers exist, so it is rebuilt
+    # whenever they had to be (re)created.
+    with bind.begin() as conn:
+        _check_dialect(conn.dialect.name)
+        ResourceDailyUsage.__table__.create(conn, checkfirst=True)
+        if rollup_installed(conn):
+            if conn.dialect.name == "postgresql":
+                # Same trigger, current function bodies
+                for ddl in POSTGRESQL_FUNCTIONS:
+                    conn.exec_driver_sql(ddl)
+            return
+        for ddl in (*drop_usage_rollup_ddl(conn.dialect.name), *usage_rollup_ddl(conn.dialect.name)):
+            conn.exec_driver_sql(ddl)
+        rebuild_usage_rollup(conn)
+
+
+def remove_usage_rollup(conn: Connection) -> None:
+    # Admin step only (and the migration's downgrade): the table stays but is stale, and a
+    # worker with REPORTS_ROLLUP on would keep serving it
+    if conn.dialect.name in ("sqlite", "postgresql"):
+        for ddl in drop_usage_rollup_ddl(conn.dialect.name):
+            conn.exec_driver_sql(ddl)
+
+
+def check_usage_rollup(bind: Engine, enabled: bool) -> None:
+    # Startup hook: never installs, rebuilds or drops anything, since the database is shared
+    # with workers that may have REPORTS_ROLLUP on. The rollup is only served while the
+    # triggers keep it current.
+    if not enabled:
+        return
+    with bind.connect() as conn:
+        _check_dialect(conn.dialect.name)
+        if not rollup_installed(conn):
+            raise RuntimeError("REPORTS_ROLLUP needs the usage rollup triggers; run `alembic upgrade head`")
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+# Triggers bump resources.schedule_version whenever a booking of the resource changes,
+# whichever code path (ORM, bulk insert, set-wise delete, another worker) makes the change.
+# Workers compare it with the version their cached schedule was loaded at (see
+# app.services.schedule_cache). An insert bumps its resource exactly once, which lets the
+# writer move its own cached copy forward without reloading it.
+
+BUMP = "UPDATE resources SET schedule_version = schedule_version + 1 WHERE id"
+RULE_RESOURCE = "(SELECT resource_id FROM recurring_reservations WHERE id = {row}.rule_id)"
+RESERVATION_COLUMNS = "resource_id, start_time, end_time, status"
+RULE_COLUMNS = 'resource_id, start_time, end_time, freq, "interval", weekdays, until, status'
+
+
+def _sqlite_triggers(table: str, columns: str, new: str, old: str) -> dict[str, str]:
+    return {
+        f"{table}_schedule_insert": f"CREATE TRIGGER {table}_schedule_insert AFTER INSERT ON {table} BEGIN {BUMP} = {new}; END",
+        f"{table}_schedule_delete": f"CREATE TRIGGER {table}_schedule_delete AFTER DELETE ON {table} BEGIN {BUMP} = {old}; END",
+        f"{table}_schedule_update": (
+            f"CREATE TRIGGER {table}_schedule_update AFTER UPDATE OF {columns} ON {table}"
+            f" BEGIN {BUMP} IN ({old}, {new}); END"
+        ),
+    }
+
+
+SQLITE_TRIGGERS = {
+    **_sqlite_triggers("reservations", RESERVATION_COLUMNS, "NEW.resource_id", "OLD.resource_id"),
+    **_sqlite_triggers("recurring_reservations", RULE_COLUMNS, "NEW.resource_id", "OLD.resource_id"),
+    **_sqlite_triggers(
+        "recurrence_exceptions",
+        "rule_id, occurrence_start",
+        RULE_RESOURCE.format(row="NEW"),
+        RULE_RESOURCE.format(row="OLD"),
+    ),
+}
+
+
+def _postgresql_function(name: str, new: str, old: str) -> str:
+    return f"""
+CREATE OR REPLACE FUNCTION {name}() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        {BUMP} = {new};
+    ELSIF TG_OP = 'DELETE' THEN
+        {BUMP} = {old};
+    ELSE
+        {BUMP} IN ({old}, {new});
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+
+POSTGRESQL_FUNCTIONS = (
+    _postgresql_function("bump_schedule_version", "NEW.resource_id", "OLD.resource_id"),
+    _postgresql_function(
+        "bump_rule_schedule_version", RULE_RESOURCE.format(row="NEW"), RULE_RESOURCE.format(row="OLD")
+    ),
+)
+POSTGRESQL_TRIGGERS = {
+    "reservations_schedule": (
+        f"CREATE TRIGGER reservations_schedule AFTER INSERT OR DELETE OR UPDATE OF {RESERVATION_COLUMNS}"
+        " ON reservations FOR EACH ROW EXECUTE FUNCTION bump_schedule_version()"
+    ),
+    "recurring_reservations_schedule": (
+        f"CREATE TRIGGER recurring_reservations_schedule AFTER INSERT OR DELETE OR UPDATE OF {RULE_COLUMNS}"
+        " ON recurring_reservations FOR EACH ROW EXECUTE FUNCTION bump_schedule_version()"
+    ),
+    "recurrence_exceptions_schedule": (
+        "CREATE TRIGGER recurrence_exceptions_schedule AFTER INSERT OR DELETE OR UPDATE"
+        " ON recurrence_exceptions FOR EACH ROW EXECUTE FUNCTION bump_rule_schedule_version()"
+    ),
+}
+TABLES = {
+    "reservations_schedule": "reservations",
+    "recurring_reservations_schedule": "recurring_reservations",
+    "recurrence_exceptions_schedule": "recurrence_exceptions",
+}
+
+
+def _check_dialect(dialect: str) -> None:
+    if dialect not in ("sqlite", "postgresql"):
+        raise ValueError(f"SCHEDULE_CACHE is not supported on {dialect}")
+
+
+def schedule_versions_installed(conn: Connection) -> bool:
+    if conn.dialect.name == "sqlite":
+        names = conn.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE '%\\_schedule\\_%' ESCAPE '\\'")
+        ).scalars()
+        return set(names) == set(SQLITE_TRIGGERS)
+    found = conn.execute(
+        text("SELECT count(*) FROM pg_trigger WHERE tgname = ANY(:names)"), {"names": list(POSTGRESQL_TRIGGERS)}
+    ).scalar_one()
+    return found == len(POSTGRESQL_TRIGGERS)
+
+
+def schedule_version_ddl(dialect: str) -> tuple[str, ...]:
+    # Statements creating the triggers, for migrations and install_schedule_versions
+    if dialect == "sqlite":
+        return tuple(SQLITE_TRIGGERS.values())
+    return (*POSTGRESQL_FUNCTIONS, *POSTGRESQL_TRIGGERS.values())
+
+
+def drop_schedule_version_ddl(dialect: str) -> tuple[str, ...]:
+    if dialect == "sqlite":
+        return tuple(f"DROP TRIGGER IF EXISTS {name}" for name in SQLITE_TRIGGERS)
+    return tuple(f"DROP TRIGGER IF EXISTS {name} ON {table}" for name, table in TABLES.items())
+
+
+def install_schedule_versions(bind: Engine) -> None:
+    # Installed by migration 0006; this covers schemas built with create_all() (tests,
+    # benchmarks). Versions only need to move from here on: caches start empty in every
+    # new process.
+    with bind.begin() as conn:
+        _check_dialect(conn.dialect.name)
+        if schedule_versions_installed(conn):
+            return
+        for ddl in (*drop_schedule_version_ddl(conn.dialect.name), *schedule_version_ddl(conn.dialect.name)):
+            conn.exec_driver_sql(ddl)
+
+
+def remove_schedule_versions(conn: Connection) -> None:
+    # Admin step only (and the migration's downgrade): a worker with SCHEDULE_CACHE on
+    # would keep trusting a version that no longer moves
+    if conn.dialect.name in ("sqlite", "postgresql"):
+        for ddl in drop_schedule_version_ddl(conn.dialect.name):
+            conn.exec_driver_sql(ddl)
+
+
+def check_schedule_versions(bind: Engine, enabled: bool) -> None:
+    # Startup hook: never drops the triggers, since the database is shared with workers that
+    # may have SCHEDULE_CACHE on. The cache refuses to start without them.
+    if not enabled:
+        return
+    with bind.connect() as conn:
+        _check_dialect(conn.dialect.name)
+        if not schedule_versions_installed(conn):
+            raise RuntimeError("SCHEDULE_CACHE needs the schedule version triggers; run `alembic upgrade head`")
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import logging
+
+from sqlalchemy import column, table, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+
+logger = logging.getLogger(__name__)
+
+# Substring search over reservation notes and contacts. SQLite gets an external-content
+# FTS5 table with the trigram tokenizer (case-insensitive substring matches, kept current by
+# triggers); PostgreSQL gets pg_trgm GIN indexes, which serve ILIKE '%term%' directly.
+# Without either, search_service falls back to LIKE scans.
+
+FTS5 = "fts5"
+TRIGRAM = "trigram"
+LIKE = "like"
+
+# What the FTS5 index contains; rowid is reservations.id
+reservations_fts = table("reservations_fts", column("rowid"), column("notes"), column("guest_contact"))
+
+SQLITE_FTS_TABLE = (
+    "CREATE VIRTUAL TABLE reservations_fts USING fts5("
+    "notes, guest_contact, content='reservations', content_rowid='id', tokenize='trigram')"
+)
+SQLITE_FTS_INSERT = "INSERT INTO reservations_fts (rowid, notes, guest_contact) VALUES (NEW.id, NEW.notes, NEW.guest_contact);"
+SQLITE_FTS_DELETE = (
+    "INSERT INTO reservations_fts (reservations_fts, rowid, notes, guest_contact)"
+    " VALUES ('delete', OLD.id, OLD.notes, OLD.guest_contact);"
+)
+SQLITE_TRIGGERS = {
+    "reservations_fts_insert": f"CREATE TRIGGER reservations_fts_insert AFTER INSERT ON reservations BEGIN {SQLITE_FTS_INSERT} END",
+    "reservations_fts_delete": f"CREATE TRIGGER reservations_fts_delete AFTER DELETE ON reservations BEGIN {SQLITE_FTS_DELETE} END",
+    "reservations_fts_update": (
+        "CREATE TRIGGER reservations_fts_update AFTER UPDATE OF notes, guest_contact ON reservations"
+        f" BEGIN {SQLITE_FTS_DELETE} {SQLITE_FTS_INSERT} END"
+    ),
+}
+
+# Indexed expression per GIN index, each with gin_trgm_ops
+POSTGRESQL_INDEXES = {
+    "ix_reservations_notes_trgm": "notes",
+    "ix_reservations_guest_contact_trgm": "guest_contact",
+    "ix_reservations_guest_last_name_trgm": "lower(guest_last_name)",
+}
+
+# Backend per database URL, filled on first use and by install/remove
+_backends: dict[str, str] = {}
+
+
+def _detect(conn: Connection) -> str:
+    if conn.dialect.name == "sqlite":
+        names = set(
+            conn.execute(
+                text("SELECT name FROM sqlite_master WHERE name LIKE 'reservations_fts%' AND type IN ('table', 'trigger')")
+            ).scalars()
+        )
+        return FTS5 if {"reservations_fts", *SQLITE_TRIGGERS} <= names else LIKE
+    if conn.dialect.name == "postgresql":
+        found = conn.execute(
+            text("SELECT count(*) FROM pg_indexes WHERE indexname = ANY(:names)"), {"names": list(POSTGRESQL_INDEXES)}
+        ).scalar_one()
+        return TRIGRAM if found == len(POSTGRESQL_INDEXES) else LIKE
+    return LIKE
+
+
+def search_backend(conn: Connection) -> str:
+    key = str(conn.engine.url)
+    if key not in _backends:
+        _backends[key] = _detect(conn)
+    return _backends[key]
+
+
+def install_search_index(bind: Engine) -> str:
+    # Built by migration 0008; this covers schemas made with create_all() (tests,
+    # benchmarks). A database without FTS5, or a role that may not create the pg_trgm
+    # extension, keeps working on the LIKE fallback.
+    try:
+        with bind.begin() as conn:
+            backend = _detect(conn)
+            if backend == LIKE and conn.dialect.name == "sqlite":
+                # Partial leftovers are dropped and the table rebuilt from reservations
+                remove_search_index(conn)
+                conn.exec_driver_sql(SQLITE_FTS_TABLE)
+                for ddl in SQLITE_TRIGGERS.values():
+                    conn.exec_driver_sql(ddl)
+                conn.exec_driver_sql("INSERT INTO reservations_fts (reservations_fts) VALUES ('rebuild')")
+                backend = FTS5
+            elif backend == LIKE and conn.dialect.name == "postgresql":
+                conn.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+                for name, expression in POSTGRESQL_INDEXES.items():
+                    conn.exec_driver_sql(
+                        f"CREATE INDEX IF NOT EXISTS {name} ON reservations USING gin ({expression} gin_trgm_ops)"
+                    )
+                backend = TRIGRAM
+    except DBAPIError as e:
+        logger.warning("Reservation search index unavailable, searching with LIKE: %s", e)
+        backend = LIKE
+    _backends[str(bind.url)] = backend
+    return backend
+
+
+def remove_search_index(conn: Connection) -> None:
+    # Admin step only (and the migration's downgrade): other workers keep searching
+    # through an index they found at startup
+    if conn.dialect.name == "sqlite":
+        for name in SQLITE_TRIGGERS:
+            conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {name}")
+        conn.exec_driver_sql("DROP TABLE IF EXISTS reservations_fts")
+    elif conn.dialect.name == "postgresql":
+        for name in POSTGRESQL_INDEXES:
+            conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+    _backends[str(conn.engine.url)] = LIKE
+
+
+def check_search_index(bind: Engine, enabled: bool) -> str:
+    # Startup hook: only looks for the index, never builds or drops it, since the database
+    # is shared with workers that may be searching through it. SEARCH_INDEX off keeps this
+    # process on LIKE scans.
+    backend = LIKE
+    if enabled:
+        with bind.connect() as conn:
+            backend = _detect(conn)
+            if backend == LIKE and conn.dialect.name in ("sqlite", "postgresql"):
+                logger.warning("Reservation search index missing, searching with LIKE; run `alembic upgrade head`")
+    _backends[str(bind.url)] = backend
+    return backend
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Any, TypeVar
+
+from sqlalchemy import Row, delete, select, update
+from sqlalchemy.orm import Session
+
+ModelT = TypeVar("ModelT")
+
+# Single-statement writes by primary key. Where the backend supports RETURNING the changed
+# row comes back with the write itself; elsewhere (e.g. MySQL) a primary-key read follows.
+# A missing row is reported as None, so callers never need to load the row first.
+# delete_all_returning is the set-wise variant for rows matching a condition.
+
+
+def update_returning(db: Session, model: type[ModelT], row_id: int, values: dict[str, Any]) -> ModelT | None:
+    if not values:
+        return db.get(model, row_id)
+    stmt = update(model).where(model.id == row_id).values(**values)
+    if db.get_bind().dialect.update_returning:
+        return db.execute(stmt.returning(model)).scalar_one_or_none()
+    if db.execute(stmt).rowcount == 0:
+        return None
+    return db.get(model, row_id, populate_existing=True)
+
+
+def delete_returning(db: Session, model: type, row_id: int, *columns) -> Row | None:
+    stmt = delete(model).where(model.id == row_id)
+    if db.get_bind().dialect.delete_returning:
+        return db.execute(stmt.returning(*columns)).one_or_none()
+    row = db.execute(select(*columns).where(model.id == row_id)).one_or_none()
+    if row is not None:
+        db.execute(stmt)
+    return row
+
+
+def delete_all_returning(db: Session, model: type, condition, *columns) -> Sequence[Row]:
+    stmt = delete(model).where(condition)
+    if db.get_bind().dialect.delete_returning:
+        return db.execute(stmt.returning(*columns)).all()
+    rows = db.execute(select(*columns).where(condition)).all()
+    if rows:
+        db.execute(stmt)
+    return rows
@@ -1,15 +1,33 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 from app.api import api_router
-from app.db.database import Base, engine
-
+from app.api.conditional import ETAG_HEADER
+from app.api.idempotency import REPLAYED_HEADER
+from app.api.pagination import NEXT_CURSOR_HEADER
+from app.core.cache import cache
+from app.core.changefeed import changes
+from app.core.config import settings
+from app.core.idempotency import idempotency
+from app.core.metrics import MetricsMiddleware, metrics
+from app.db.archive import sync_archive
+from app.db.database import SessionLocal, engine, pool_metrics
+from app.db.migrations import check_database_revision, upgrade_database
+from app.db.rollup import check_usage_rollup
+from app.db.schedule import check_schedule_versions
+from app.db.search import check_search_index
 from app.models import organization as _org  # noqa: F401
+from app.models import recurring_reservation as _recur  # noqa: F401
 from app.models import reservation as _resv  # noqa: F401
 from app.models import resource as _res  # noqa: F401
+from app.models import resource_daily_usage as _usage  # noqa: F401
 from app.models import user as _user  # noqa: F401
+from app.services.archive_service import run_archiver
+from app.services.schedule_cache import schedules
 
 app = FastAPI(
     title="Reservation Manager API",
@@ -23,19 +41,78 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, ETAG_HEADER, REPLAYED_HEADER],
 )
+if settings.METRICS_ENABLED:
+    # Added last so it wraps everything else, CORS included
+    app.add_middleware(MetricsMiddleware)
+
+if settings.ASYNC_DATABASE_URL:
+    from app.api.async_routes import async_api_router
 
+    # Registered first so the async twins take their paths; the sync routes still document
+    # the shared contract and serve everything that has no async twin.
+    app.include_router(async_api_router, prefix="/api", include_in_schema=False)
 app.include_router(api_router, prefix="/api")
 
 @app.get("/", tags=["Root"])
 async def read_root():
     return {"message": "Welcome to the Reservation Manager API!"}
 
+@app.get("/health/db", tags=["Root"])
+async def database_pool_stats():
+    stats = {"pool": pool_metrics.snapshot(engine.pool)}
+    if settings.ASYNC_DATABASE_URL:
+        from app.db.async_database import async_engine, async_pool_metrics
+
+        stats["async_pool"] = async_pool_metrics.snapshot(async_engine.pool)
+    return stats
+
+@app.get("/health/cache", tags=["Root"])
+async def cache_stats():
+    return {**cache.info(), "schedules": schedules.info(), "idempotency": idempotency.info()}
+
+@app.get("/metrics", tags=["Root"], response_class=PlainTextResponse)
+async def prometheus_metrics():
+    gauges = {"db_pool": pool_metrics.snapshot(engine.pool), "cache": cache.info(), "changefeed": changes.info()}
+    gauges["schedule_cache"] = schedules.info()
+    gauges["idempotency"] = idempotency.info()
+    if settings.ASYNC_DATABASE_URL:
+        from app.db.async_database import async_engine, async_pool_metrics
+
+        gauges["db_async_pool"] = async_pool_metrics.snapshot(async_engine.pool)
+    return PlainTextResponse(metrics.render(gauges), media_type="text/plain; version=0.0.4")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Create tables on startup
-    Base.metadata.create_all(bind=engine)
+    # Schema changes are Alembic revisions (migrations/); with DB_MIGRATE_ON_STARTUP off they
+    # are a deploy step and startup only checks the database is at head. The hooks below
+    # only look at what the revisions built (search index, rollup and version triggers).
+    if settings.DB_MIGRATE_ON_STARTUP:
+        upgrade_database(engine)
+    else:
+        check_database_revision(engine)
+    check_usage_rollup(engine, settings.REPORTS_ROLLUP)
+    check_search_index(engine, settings.SEARCH_INDEX)
+    check_schedule_versions(engine, settings.SCHEDULE_CACHE)
+    sync_archive(engine)
+    archiver = None
+    if settings.ARCHIVE_RETENTION_DAYS > 0:
+        archiver = asyncio.create_task(
+            run_archiver(
+                SessionLocal,
+                settings.ARCHIVE_RETENTION_DAYS,
+                settings.ARCHIVE_INTERVAL_SECONDS,
+                settings.ARCHIVE_BATCH_SIZE,
+            )
+        )
     yield
+    if archiver is not None:
+        archiver.cancel()
+    if settings.ASYNC_DATABASE_URL:
+        from app.db.async_database import async_engine
+
+        await async_engine.dispose()
 
 # Attach lifespan to app
 app.router.lifespan_context = lifespan
\ No newline at end of file
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from app.db.database import Base, utcnow
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+if TYPE_CHECKING:
+    from .resource import Resource
+
+
+class RecurringReservation(Base):
+    # A standing booking stored once as a rule; occurrences are expanded on demand
+    # (see app.services.recurrence)
+    __tablename__ = "recurring_reservations"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    resource_id: Mapped[int] = mapped_column(ForeignKey("resources.id", ondelete="CASCADE"), index=True)
+    user_id: Mapped[int | None] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"), index=True)
+
+    # First occurrence; later ones keep its time of day and duration
+    start_time: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    end_time: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    freq: Mapped[str] = mapped_column(String(10), nullable=False)  # daily|weekly
+    interval: Mapped[int] = mapped_column(Integer, default=1)
+    weekdays: Mapped[str | None] = mapped_column(String(20), nullable=True)  # weekly: "0,2" = Mon, Wed
+    # Latest start an occurrence may have (inclusive); None repeats forever
+    until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    status: Mapped[str] = mapped_column(String(20), default="confirmed")  # confirmed|cancelled
+    notes: Mapped[str | None] = mapped_column(String(500), nullable=True)
+
+    guest_last_name: Mapped[str | None] = mapped_column(String(100), nullable=True, index=True)
+    guest_first_name: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    guest_contact: Mapped[str | None] = mapped_column(String(255), nullable=True)
+
+    resource: Mapped["Resource"] = relationship()
+    exceptions: Mapped[list["RecurrenceException"]] = relationship(
+        back_populates="rule", cascade="all, delete-orphan", order_by="RecurrenceException.occurrence_start"
+    )
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), default=utcnow, onupdate=utcnow
+    )
+
+    __table_args__ = (Index("ix_recurring_reservations_resource_start", "resource_id", "start_time"),)
+
+
+class RecurrenceException(Base):
+    # An occurrence of a rule that does not take place, identified by its original start
+    __tablename__ = "recurrence_exceptions"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    rule_id: Mapped[int] = mapped_column(ForeignKey("recurring_reservations.id", ondelete="CASCADE"))
+    occurrence_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    rule: Mapped["RecurringReservation"] = relationship(back_populates="exceptions")
+
+    __table_args__ = (
+        Index("ix_recurrence_exceptions_rule_start", "rule_id", "occurrence_start", unique=True),
+    )
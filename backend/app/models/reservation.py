@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from app.db.database import Base
+from app.db.database import Base, utcnow
 from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -34,10 +34,50 @@ class Reservation(Base):
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+        DateTime(timezone=True), server_default=func.now(), default=utcnow, onupdate=utcnow
     )
 
     __table_args__ = (
         # Useful index for lookups by last name + start time windows
         Index("ix_reservations_guest_last_name_start", "guest_last_name", "start_time"),
+        # Interval probe used by conflict detection (see reservation_service.has_conflict)
+        Index("ix_reservations_resource_start_end", "resource_id", "start_time", "end_time"),
+        # Keyset pagination order for list_reservations
+        Index("ix_reservations_start_id", "start_time", "id"),
+        # Ids are never reused, so an archived reservation's id stays its own (see app.db.archive)
+        {"sqlite_autoincrement": True},
+    )
+
+# Case-insensitive last name prefix search (search_service), in the same (name, start) shape
+# as ix_reservations_guest_last_name_start
+Index("ix_reservations_guest_last_name_lower_start", func.lower(Reservation.guest_last_name), Reservation.start_time)
+
+
+class ArchivedReservation(Base):
+    # Reservations moved out of `reservations` once they are long over (see app.db.archive),
+    # with the same columns plus when they were moved. Rows keep their ids. The primary key
+    # includes start_time because PostgreSQL range-partitions the table by it.
+    __tablename__ = "reservations_archive"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    start_time: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    resource_id: Mapped[int] = mapped_column(ForeignKey("resources.id", ondelete="CASCADE"))
+    user_id: Mapped[int | None] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"))
+    end_time: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    status: Mapped[str] = mapped_column(String(20))
+    notes: Mapped[str | None] = mapped_column(String(500))
+    guest_last_name: Mapped[str | None] = mapped_column(String(100))
+    guest_first_name: Mapped[str | None] = mapped_column(String(100))
+    guest_contact: Mapped[str | None] = mapped_column(String(255))
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    archived_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # History of one resource, and the keyset order of list_reservations
+        Index("ix_reservations_archive_resource_start", "resource_id", "start_time"),
+        Index("ix_reservations_archive_start_id", "start_time", "id"),
+        # Newest archived end_time, which tells reads whether a window reaches the archive
+        Index("ix_reservations_archive_end_time", "end_time"),
+        {"postgresql_partition_by": "RANGE (start_time)"},
     )
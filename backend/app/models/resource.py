@@ -3,8 +3,8 @@ from __future__ import annotations
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from app.db.database import Base
-from sqlalchemy import DateTime, ForeignKey, Integer, String, func
+from app.db.database import Base, utcnow
+from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, false, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 if TYPE_CHECKING:
@@ -20,6 +20,12 @@ class Resource(Base):
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     type: Mapped[str | None] = mapped_column(String(100), nullable=True)
     capacity: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # Shared resources (halls, shuttles) take up to `capacity` overlapping bookings; others
+    # take one booking at a time whatever their capacity (see reservation_service.has_conflict)
+    shared: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, server_default=false())
+    # Bumped by database triggers on every change to the resource's bookings while
+    # SCHEDULE_CACHE is on; tells workers their cached schedule is stale (see app.db.schedule)
+    schedule_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
 
     organization: Mapped["Organization"] = relationship(back_populates="resources")
     reservations: Mapped[list["Reservation"]] = relationship(
@@ -28,5 +34,5 @@ class Resource(Base):
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+        DateTime(timezone=True), server_default=func.now(), default=utcnow, onupdate=utcnow
     )
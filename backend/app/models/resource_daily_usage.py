@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from datetime import date
+
+from app.db.database import Base
+from sqlalchemy import Date, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class ResourceDailyUsage(Base):
+    # Daily rollup of reservations per resource, by the day a reservation starts. Maintained
+    # by database triggers when REPORTS_ROLLUP is on (see app.db.rollup). No foreign key:
+    # the triggers write to it while a resource's reservations are being deleted, and
+    # reports join it to resources anyway.
+    __tablename__ = "resource_daily_usage"
+
+    resource_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    reservations: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    cancelled: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Length of the active (non-cancelled) reservations
+    booked_seconds: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
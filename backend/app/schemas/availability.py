@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class TimeInterval(BaseModel):
+    start: datetime
+    end: datetime
+
+
+class AvailabilityOut(BaseModel):
+    resource_id: int
+    start: datetime
+    end: datetime
+    free: list[TimeInterval]
+    slots: list[TimeInterval] = []
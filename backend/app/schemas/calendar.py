@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from app.schemas.organization import OrganizationOut
+from app.schemas.recurring_reservation import OccurrenceOut
+from app.schemas.reservation import ReservationOut
+from app.schemas.resource import ResourceOut
+from pydantic import BaseModel
+
+
+class CalendarResource(ResourceOut):
+    reservations: list[ReservationOut]
+    occurrences: list[OccurrenceOut] = []
+
+
+class CalendarOut(BaseModel):
+    organization: OrganizationOut
+    start: datetime
+    end: datetime
+    resources: list[CalendarResource]
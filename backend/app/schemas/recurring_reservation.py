@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Annotated, Literal
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+Weekday = Annotated[int, Field(ge=0, le=6)]  # 0 = Monday ... 6 = Sunday
+# Most occurrences a rule given by count may have (over 27 years of a daily rule)
+MAX_COUNT = 10_000
+# Largest interval whose period (interval weeks for a weekly rule) fits between the earliest
+# and latest supported datetimes
+MAX_INTERVAL = (datetime.max - datetime.min).days // 7
+
+
+class RecurringReservationCreate(BaseModel):
+    resource_id: int
+    user_id: int | None = None
+    start_time: datetime  # first occurrence
+    end_time: datetime
+    freq: Literal["daily", "weekly"]
+    interval: int = Field(default=1, ge=1, le=MAX_INTERVAL)
+    weekdays: list[Weekday] | None = None  # weekly only; defaults to the weekday of start_time
+    until: datetime | None = None
+    count: int | None = Field(default=None, ge=1, le=MAX_COUNT)
+    notes: str | None = None
+    guest_last_name: str | None = None
+    guest_first_name: str | None = None
+    guest_contact: str | None = None
+
+
+class RecurrenceExceptionCreate(BaseModel):
+    occurrence_start: datetime
+
+
+class RecurringReservationOut(BaseModel):
+    id: int
+    resource_id: int
+    user_id: int | None
+    start_time: datetime
+    end_time: datetime
+    freq: str
+    interval: int
+    weekdays: list[int]
+    until: datetime | None
+    status: str
+    notes: str | None
+    guest_last_name: str | None
+    guest_first_name: str | None
+    guest_contact: str | None
+    exceptions: list[datetime] = []
+    model_config = ConfigDict(from_attributes=True)
+
+    @field_validator("weekdays", mode="before")
+    @classmethod
+    def split_weekdays(cls, value):
+        # Stored as "0,2,4"
+        if isinstance(value, str):
+            return [int(day) for day in value.split(",")]
+        return value or []
+
+    @field_validator("exceptions", mode="before")
+    @classmethod
+    def exception_starts(cls, value):
+        return [getattr(item, "occurrence_start", item) for item in value]
+
+
+class OccurrenceOut(BaseModel):
+    rule_id: int
+    resource_id: int
+    start_time: datetime
+    end_time: datetime
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import Literal
+
+from pydantic import BaseModel
+
+
+class UtilizationRow(BaseModel):
+    period_start: date
+    organization_id: int
+    resource_id: int | None = None  # None when grouped by organization
+    reservations: int
+    cancelled: int
+    cancellation_rate: float
+    booked_hours: float
+    # Booked hours over the hours the group's resources exist in the period (24 h a day)
+    utilization: float
+    # Most reservations of the group running at the same time; None when not requested
+    peak_concurrency: int | None = None
+
+
+class UtilizationReport(BaseModel):
+    start: date
+    end: date
+    granularity: Literal["day", "week"]
+    group_by: Literal["resource", "organization"]
+    source: Literal["live", "rollup"]
+    rows: list[UtilizationRow]
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class ReservationCreate(BaseModel):
@@ -38,3 +38,33 @@ class ReservationOut(BaseModel):
     guest_first_name: str | None
     guest_contact: str | None
     model_config = ConfigDict(from_attributes=True)
+
+
+class ReservationBulkCreate(BaseModel):
+    items: list[ReservationCreate] = Field(max_length=10_000)
+
+
+class ReservationBulkItemResult(BaseModel):
+    index: int
+    accepted: bool
+    id: int | None = None
+    error: str | None = None
+
+
+class ReservationBulkResult(BaseModel):
+    accepted: int
+    rejected: int
+    results: list[ReservationBulkItemResult]
+
+
+class ReservationImportError(BaseModel):
+    line: int
+    error: str
+
+
+class ReservationImportResult(BaseModel):
+    accepted: int = 0
+    rejected: int = 0
+    skipped: int = 0
+    errors: list[ReservationImportError] = []
+    errors_truncated: bool = False
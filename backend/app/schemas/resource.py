@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, field_validator
 
 
 class ResourceCreate(BaseModel):
@@ -8,12 +8,22 @@ class ResourceCreate(BaseModel):
     name: str
     type: str | None = None
     capacity: int | None = None
+    shared: bool = False
 
 
 class ResourceUpdate(BaseModel):
     name: str | None = None
     type: str | None = None
     capacity: int | None = None
+    shared: bool | None = None
+
+    @field_validator("name", "shared")
+    @classmethod
+    def not_null(cls, value):
+        # May be left out, but the columns are NOT NULL
+        if value is None:
+            raise ValueError("may not be null")
+        return value
 
 
 class ResourceOut(BaseModel):
@@ -22,4 +32,5 @@ class ResourceOut(BaseModel):
     name: str
     type: str | None = None
     capacity: int | None = None
+    shared: bool = False
     model_config = ConfigDict(from_attributes=True)
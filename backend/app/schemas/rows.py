@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from functools import cache
+from typing import Any
+
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import Row
+from typing_extensions import TypedDict  # pydantic needs it over typing.TypedDict before 3.12
+
+# Fast path for large responses: rows selected as plain columns are serialized by
+# pydantic-core against a TypedDict mirror of an output schema, skipping the model that
+# FastAPI would build and validate per row. The bytes are the same as for `list[schema]`
+# as long as the schema has no custom serializers or aliases (the Out schemas have none).
+
+
+@cache
+def rows_adapter(schema: type[BaseModel]) -> TypeAdapter:
+    # Keys outside the schema are left out of the output, so rows may carry extra columns
+    fields = {name: field.annotation for name, field in schema.model_fields.items()}
+    return TypeAdapter(list[TypedDict(f"{schema.__name__}Row", fields)])
+
+
+def row_dicts(rows: Iterable[Row]) -> list[dict[str, Any]]:
+    # Several times faster than Row._asdict() per row
+    rows = list(rows)
+    if not rows:
+        return []
+    keys = rows[0]._fields
+    return [dict(zip(keys, row)) for row in rows]
+
+
+def rows_json(schema: type[BaseModel], rows: Iterable[Row]) -> bytes:
+    return rows_adapter(schema).dump_json(row_dicts(rows))
+
+
+def rows_python(schema: type[BaseModel], rows: Iterable[Row]) -> list[dict[str, Any]]:
+    # JSON-compatible dicts, e.g. for the cache
+    return rows_adapter(schema).dump_python(row_dicts(rows), mode="json")
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+
+from app.db.archive import archive, ensure_archive_partitions
+from app.models.reservation import ArchivedReservation, Reservation
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+# Columns copied to the archive, under the same names
+COLUMNS = [column.key for column in Reservation.__table__.columns]
+
+
+def _check_dialect(dialect: str) -> None:
+    if dialect not in ("sqlite", "postgresql"):
+        raise ValueError(f"ARCHIVE_RETENTION_DAYS is not supported on {dialect}")
+
+
+def archive_reservations(db: Session, before: datetime, batch_size: int = 5000) -> int:
+    # Moves reservations that ended before `before` to reservations_archive, oldest ids
+    # first, and returns how many moved. Each batch is one INSERT ... SELECT and one DELETE
+    # committed together, so a row is always in exactly one of the tables. The INSERT comes
+    # first: on SQLite it takes the write lock before anything is read. On PostgreSQL the
+    # batch's rows are locked and rows another worker's run holds are skipped.
+    dialect = db.get_bind().dialect.name
+    _check_dialect(dialect)
+    candidates = select(Reservation.id).where(Reservation.end_time < before)
+    if dialect != "sqlite":
+        first = db.execute(select(func.min(Reservation.start_time)).where(Reservation.end_time < before)).scalar()
+        if first is None:
+            db.rollback()
+            return 0
+        ensure_archive_partitions(db, first, before)
+        db.commit()
+    candidates = candidates.order_by(Reservation.id).limit(batch_size).with_for_update(skip_locked=True)
+
+    moved = 0
+    while True:
+        ids = (
+            db.execute(
+                insert(ArchivedReservation)
+                .from_select(
+                    COLUMNS,
+                    select(*(Reservation.__table__.c[name] for name in COLUMNS)).where(
+                        Reservation.id.in_(candidates)
+                    ),
+                )
+                .returning(ArchivedReservation.id)
+            )
+            .scalars()
+            .all()
+        )
+        if not ids:
+            db.rollback()
+            break
+        db.execute(delete(Reservation).where(Reservation.id.in_(ids)))
+        db.commit()
+        moved += len(ids)
+    if moved:
+        archive.refresh(db)
+        db.rollback()
+    return moved
+
+
+async def run_archiver(
+    session_factory: Callable[[], Session], retention_days: int, interval_seconds: float, batch_size: int
+) -> None:
+    # Background task started by the app's lifespan: archives once per interval, in a
+    # worker thread. A failed run is logged and retried at the next interval.
+    def run_once() -> int:
+        before = datetime.now(timezone.utc) - timedelta(days=retention_days)
+        with session_factory() as db:
+            return archive_reservations(db, before, batch_size)
+
+    while True:
+        try:
+            moved = await run_in_threadpool(run_once)
+            if moved:
+                logger.info("Archived %d reservations", moved)
+        except Exception:
+            logger.exception("Reservation archive run failed")
+        await asyncio.sleep(interval_seconds)
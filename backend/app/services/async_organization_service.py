@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from typing import Any
+
+from app.models.organization import Organization
+from app.schemas.organization import OrganizationCreate, OrganizationUpdate
+from app.services import organization_service
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Same split as async_reservation_service: native async reads, sync writes via run_sync.
+
+
+async def create_organization(db: AsyncSession, data: OrganizationCreate) -> Organization:
+    return await db.run_sync(organization_service.create_organization, data)
+
+
+async def list_organizations(db: AsyncSession) -> list[Organization]:
+    return list((await db.scalars(select(Organization))).all())
+
+
+async def list_organizations_cached(db: AsyncSession) -> list[dict[str, Any]]:
+    return await db.run_sync(organization_service.list_organizations_cached)
+
+
+async def get_organization(db: AsyncSession, org_id: int) -> Organization | None:
+    return await db.get(Organization, org_id)
+
+
+async def update_organization_by_id(
+    db: AsyncSession, org_id: int, data: OrganizationUpdate
+) -> Organization | None:
+    return await db.run_sync(organization_service.update_organization_by_id, org_id, data)
+
+
+async def delete_organization_by_id(db: AsyncSession, org_id: int) -> bool:
+    return await db.run_sync(organization_service.delete_organization_by_id, org_id)
+
+
+async def update_organization(db: AsyncSession, org: Organization, data: OrganizationUpdate) -> Organization:
+    return await db.run_sync(organization_service.update_organization, org, data)
+
+
+async def delete_organization(db: AsyncSession, org: Organization) -> None:
+    await db.run_sync(organization_service.delete_organization, org)
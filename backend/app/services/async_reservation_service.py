@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+from datetime import datetime
+
+from app.db.archive import archive
+from app.models.reservation import ArchivedReservation, Reservation
+from app.schemas.reservation import ReservationBulkItemResult, ReservationCreate, ReservationUpdate
+from app.services import reservation_service
+from app.services.reservation_service import (
+    entity,
+    naive_utc,
+    out_columns,
+    reservations_page,
+    validators_query,
+)
+from sqlalchemy import Row, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Reads are native async queries. Writes run the sync implementations through
+# AsyncSession.run_sync, which drives them on the event loop over the async driver, so
+# locking and conflict rules stay defined in one place.
+
+
+async def create_reservation(db: AsyncSession, data: ReservationCreate) -> Reservation:
+    return await db.run_sync(reservation_service.create_reservation, data)
+
+
+async def create_reservations_bulk(
+    db: AsyncSession, items: list[ReservationCreate]
+) -> list[ReservationBulkItemResult]:
+    return await db.run_sync(reservation_service.create_reservations_bulk, items)
+
+
+async def get_reservation(db: AsyncSession, reservation_id: int) -> Reservation | ArchivedReservation | None:
+    obj = await db.get(Reservation, reservation_id)
+    if obj is None and archive.active:
+        obj = await db.scalar(select(ArchivedReservation).where(ArchivedReservation.id == reservation_id))
+    return obj
+
+
+async def list_reservations(
+    db: AsyncSession,
+    resource_id: int | None = None,
+    user_id: int | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    guest_last_name: str | None = None,
+    limit: int | None = None,
+    after: tuple[datetime, int] | None = None,
+) -> list[Reservation]:
+    filters = dict(resource_id=resource_id, user_id=user_id, start=start, end=end, guest_last_name=guest_last_name)
+    return list((await db.scalars(reservations_page(entity, limit, after, **filters))).all())
+
+
+async def list_reservation_rows(
+    db: AsyncSession,
+    resource_id: int | None = None,
+    user_id: int | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    guest_last_name: str | None = None,
+    limit: int | None = None,
+    after: tuple[datetime, int] | None = None,
+) -> list[Row]:
+    filters = dict(resource_id=resource_id, user_id=user_id, start=start, end=end, guest_last_name=guest_last_name)
+    return list((await db.execute(reservations_page(out_columns, limit, after, **filters))).all())
+
+
+async def list_validators(db: AsyncSession, **filters) -> tuple[int, datetime | None, int]:
+    count, latest, id_sum = (await db.execute(validators_query(**filters))).one()
+    return count, naive_utc(latest), id_sum
+
+
+async def iter_reservations(
+    db: AsyncSession,
+    resource_id: int | None = None,
+    user_id: int | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    guest_last_name: str | None = None,
+    limit: int | None = None,
+    after: tuple[datetime, int] | None = None,
+    chunk_size: int = 500,
+) -> AsyncIterator[Reservation]:
+    filters = dict(resource_id=resource_id, user_id=user_id, start=start, end=end, guest_last_name=guest_last_name)
+    stmt = reservations_page(entity, limit, after, **filters).execution_options(yield_per=chunk_size)
+    async for row in await db.stream_scalars(stmt):
+        yield row
+
+
+async def update_reservation_by_id(
+    db: AsyncSession, reservation_id: int, data: ReservationUpdate
+) -> Reservation | None:
+    return await db.run_sync(reservation_service.update_reservation_by_id, reservation_id, data)
+
+
+async def cancel_reservation_by_id(db: AsyncSession, reservation_id: int) -> Reservation | None:
+    return await db.run_sync(reservation_service.cancel_reservation_by_id, reservation_id)
+
+
+async def delete_reservation_by_id(db: AsyncSession, reservation_id: int) -> bool:
+    return await db.run_sync(reservation_service.delete_reservation_by_id, reservation_id)
+
+
+async def update_reservation(db: AsyncSession, reservation: Reservation, data: ReservationUpdate) -> Reservation:
+    return await db.run_sync(reservation_service.update_reservation, reservation, data)
+
+
+async def cancel_reservation(db: AsyncSession, reservation: Reservation) -> Reservation:
+    return await db.run_sync(reservation_service.cancel_reservation, reservation)
+
+
+async def delete_reservation(db: AsyncSession, reservation: Reservation) -> None:
+    await db.run_sync(reservation_service.delete_reservation, reservation)
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from typing import Any
+
+from app.models.resource import Resource
+from app.schemas.resource import ResourceCreate, ResourceUpdate
+from app.services import resource_service
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Same split as async_reservation_service: native async reads, sync writes via run_sync.
+
+
+async def create_resource(db: AsyncSession, data: ResourceCreate) -> Resource:
+    return await db.run_sync(resource_service.create_resource, data)
+
+
+async def get_resource(db: AsyncSession, resource_id: int) -> Resource | None:
+    return await db.get(Resource, resource_id)
+
+
+async def list_resources(db: AsyncSession, organization_id: int | None = None) -> list[Resource]:
+    stmt = select(Resource)
+    if organization_id is not None:
+        stmt = stmt.where(Resource.organization_id == organization_id)
+    return list((await db.scalars(stmt)).all())
+
+
+async def get_resource_cached(db: AsyncSession, resource_id: int) -> dict[str, Any] | None:
+    return await db.run_sync(resource_service.get_resource_cached, resource_id)
+
+
+async def list_resources_cached(db: AsyncSession, organization_id: int | None = None) -> list[dict[str, Any]]:
+    return await db.run_sync(resource_service.list_resources_cached, organization_id)
+
+
+async def update_resource_by_id(db: AsyncSession, resource_id: int, data: ResourceUpdate) -> Resource | None:
+    return await db.run_sync(resource_service.update_resource_by_id, resource_id, data)
+
+
+async def delete_resource_by_id(db: AsyncSession, resource_id: int) -> bool:
+    return await db.run_sync(resource_service.delete_resource_by_id, resource_id)
+
+
+async def update_resource(db: AsyncSession, resource: Resource, data: ResourceUpdate) -> Resource:
+    return await db.run_sync(resource_service.update_resource, resource, data)
+
+
+async def delete_resource(db: AsyncSession, resource: Resource) -> None:
+    await db.run_sync(resource_service.delete_resource, resource)
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from app.models.reservation import Reservation
+from app.models.resource import Resource
+from app.services.occupancy import peak_occupancy
+from app.services.reservation_service import (
+    BOOKING_LIMIT,
+    CANCELLED,
+    booking_limit,
+    cached_schedule,
+    last_active_before,
+    recurring_occurrences,
+    time_key,
+)
+from app.services.schedule_cache import schedules
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+
+MAX_SLOTS = 1000
+
+
+def utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc)
+
+
+def free_intervals(db: Session, resource_id: int, start: datetime, end: datetime) -> list[tuple[datetime, datetime]]:
+    # One ordered scan of the active reservations touching [start, end). The scan starts at the
+    # last reservation beginning before `start` (the only earlier one that can reach into the
+    # window) rather than at the beginning of the resource's history. Occurrences of
+    # recurring reservations in the window are merged in. Time is free while fewer bookings
+    # than the resource's limit are in progress: one at a time, or its capacity when shared.
+    # With SCHEDULE_CACHE on, windows inside the cached horizon are read from memory.
+    key = time_key(db)
+    schedule = cached_schedule(db, resource_id, start, end) if schedules.enabled else None
+    if schedule is not None:
+        # Cached bookings are in time_key form: wall clock on SQLite, naive UTC elsewhere
+        aware = (lambda value: value) if db.get_bind().dialect.name == "sqlite" else utc
+        limit = schedule.limit
+        busy = [(aware(booked[0]), aware(booked[1])) for booked in schedule.window(key(start), key(end))]
+    else:
+        limit = db.execute(select(BOOKING_LIMIT).where(Resource.id == resource_id)).scalar() or 1
+        stmt = select(Reservation.start_time, Reservation.end_time).where(
+            Reservation.resource_id == resource_id,
+            Reservation.start_time < end,
+            Reservation.end_time > start,
+            Reservation.status.is_distinct_from(CANCELLED),
+        )
+        if limit == 1:
+            # Bookings of a shared resource overlap, so there is no single neighbour to start from
+            lower = func.coalesce(last_active_before(Reservation.start_time, resource_id, start), start)
+            stmt = stmt.where(Reservation.start_time >= lower)
+        busy = list(db.execute(stmt).tuples())
+        recurring = recurring_occurrences(db, [resource_id], start, end).get(resource_id, [])
+        busy += [(occurrence_start, occurrence_end) for occurrence_start, occurrence_end, _ in recurring]
+
+    # Sweep start (+1) and end (-1) events in time order, ends first at equal times
+    events = []
+    for busy_start, busy_end in busy:
+        events.append((max(key(busy_start), key(start)), 1, busy_start if key(busy_start) > key(start) else start))
+        if key(busy_end) < key(end):
+            events.append((key(busy_end), -1, busy_end))
+    events.sort(key=lambda event: event[:2])
+    free: list[tuple[datetime, datetime]] = []
+    booked, since = 0, start
+    for _, delta, at in events:
+        booked += delta
+        if delta == 1 and booked == limit and key(at) > key(since):
+            free.append((since, at))
+        elif delta == -1 and booked == limit - 1:
+            since = at
+    if booked < limit and key(since) < key(end):
+        free.append((since, end))
+    return free
+
+
+def candidate_slots(
+    db: Session,
+    free: list[tuple[datetime, datetime]],
+    window_start: datetime,
+    duration: timedelta,
+    step: timedelta,
+) -> list[tuple[datetime, datetime]]:
+    # Slots of `duration` on a grid of `step` anchored at the window start, inside free time
+    key = time_key(db)
+    slots: list[tuple[datetime, datetime]] = []
+    for free_start, free_end in free:
+        offset = key(free_start) - key(window_start)
+        slot_start = window_start + step * -(-offset // step)  # first grid point >= free_start
+        while key(slot_start + duration) <= key(free_end):
+            slots.append((slot_start, slot_start + duration))
+            if len(slots) == MAX_SLOTS:
+                return slots
+            slot_start += step
+    return slots
+
+
+def free_resources(
+    db: Session,
+    start: datetime,
+    end: datetime,
+    organization_id: int | None = None,
+    resource_type: str | None = None,
+) -> list[Resource]:
+    # A resource is free for [start, end) when its last active reservation starting before
+    # `end` is finished by `start`: one correlated probe per resource, all in one query.
+    # Resources left over are then checked for recurring occurrences in the window. Shared
+    # resources are free while their peak occupancy in the window is below capacity.
+    neighbour_end = last_active_before(Reservation.end_time, Resource.id, end)
+    stmt = select(Resource).where(or_(BOOKING_LIMIT > 1, func.coalesce(neighbour_end, start) <= start))
+    if organization_id is not None:
+        stmt = stmt.where(Resource.organization_id == organization_id)
+    if resource_type is not None:
+        stmt = stmt.where(Resource.type == resource_type)
+    resources = list(db.execute(stmt.order_by(Resource.id)).scalars().all())
+    busy = recurring_occurrences(db, [resource.id for resource in resources], start, end)
+
+    limits = {resource.id: booking_limit(resource.shared, resource.capacity) for resource in resources}
+    full = {resource_id for resource_id in busy if limits[resource_id] == 1}
+    shared = [resource_id for resource_id, limit in limits.items() if limit > 1]
+    if shared:
+        key = time_key(db)
+        booked: dict[int, list[tuple[datetime, datetime]]] = defaultdict(list)
+        rows = db.execute(
+            select(Reservation.resource_id, Reservation.start_time, Reservation.end_time).where(
+                Reservation.resource_id.in_(shared),
+                Reservation.start_time < end,
+                Reservation.end_time > start,
+                Reservation.status.is_distinct_from(CANCELLED),
+            )
+        )
+        for resource_id, booked_start, booked_end in rows:
+            booked[resource_id].append((key(booked_start), key(booked_end)))
+        for resource_id in shared:
+            booked[resource_id] += [(occurrence[0], occurrence[1]) for occurrence in busy.get(resource_id, [])]
+            if peak_occupancy(booked[resource_id], key(start), key(end)) >= limits[resource_id]:
+                full.add(resource_id)
+    return [resource for resource in resources if resource.id not in full]
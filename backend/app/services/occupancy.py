@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+
+
+def peak_occupancy(intervals: Iterable[tuple], start: datetime, end: datetime) -> int:
+    # Most intervals in progress at once within [start, end): an ordered sweep over their
+    # start (+1) and end (-1) events, ends first at equal times since intervals are
+    # half-open. The same sweep as reservation_service.peak_booked, over intervals already
+    # in time_key form; anything after an interval's start and end is ignored.
+    events = []
+    for interval_start, interval_end, *_ in intervals:
+        if interval_start < end and interval_end > start:
+            events += ((max(interval_start, start), 1), (interval_end, -1))
+    peak = booked = 0
+    for _, delta in sorted(events):
+        booked += delta
+        peak = max(peak, booked)
+    return peak
+
+
+class Occupancy:
+    # Bookings of one resource in start order (time_key form), for checks made in Python.
+    # Entries are (start, end, ...) tuples. Only intervals starting within the longest booking
+    # before a window can reach into it, so window() and peak() look at that slice rather
+    # than every interval.
+
+    def __init__(self, intervals: Iterable[tuple] = ()):
+        self.intervals: list[tuple] = sorted(intervals)
+        self.longest = max((end - start for start, end, *_ in self.intervals), default=timedelta(0))
+
+    def add(self, start: datetime, end: datetime, *extra) -> None:
+        insort(self.intervals, (start, end, *extra))
+        self.longest = max(self.longest, end - start)
+
+    def window(self, start: datetime, end: datetime) -> list[tuple]:
+        lo = bisect_left(self.intervals, (start - self.longest,))
+        hi = bisect_left(self.intervals, (end,))
+        return [interval for interval in self.intervals[lo:hi] if interval[1] > start]
+
+    def peak(self, start: datetime, end: datetime) -> int:
+        return peak_occupancy(self.window(start, end), start, end)
@@ -1,16 +1,34 @@
 from __future__ import annotations
 
+from datetime import datetime
+from typing import Any
+
+from app.core.cache import cache
+from app.db.writes import delete_all_returning, update_returning
 from app.models.organization import Organization
-from app.schemas.organization import OrganizationCreate, OrganizationUpdate
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from app.models.recurring_reservation import RecurrenceException, RecurringReservation
+from app.models.reservation import Reservation
+from app.models.resource import Resource
+from app.models.user import User
+from app.schemas.calendar import CalendarOut, CalendarResource
+from app.schemas.organization import OrganizationCreate, OrganizationOut, OrganizationUpdate
+from app.schemas.recurring_reservation import OccurrenceOut
+from app.schemas.reservation import ReservationOut
+from app.schemas.resource import ResourceOut
+from app.schemas.rows import rows_python
+from app.services.reservation_service import publish_deleted, recurring_occurrences, time_key
+from app.services.resource_service import resource_cache_keys
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.orm import Session, selectinload
+
+ORGANIZATIONS_KEY = "organizations:all"
 
 
 def create_organization(db: Session, data: OrganizationCreate) -> Organization:
     obj = Organization(name=data.name)
     db.add(obj)
     db.commit()
-    db.refresh(obj)
+    cache.invalidate(ORGANIZATIONS_KEY)
     return obj
 
 
@@ -18,19 +36,105 @@ def list_organizations(db: Session) -> list[Organization]:
     return list(db.execute(select(Organization)).scalars().all())
 
 
+def list_organizations_cached(db: Session) -> list[dict[str, Any]]:
+    columns = [getattr(Organization, name) for name in OrganizationOut.model_fields]
+    return cache.get_or_load(ORGANIZATIONS_KEY, lambda: rows_python(OrganizationOut, db.execute(select(*columns))))
+
+
 def get_organization(db: Session, org_id: int) -> Organization | None:
     return db.get(Organization, org_id)
 
 
-def update_organization(db: Session, org: Organization, data: OrganizationUpdate) -> Organization:
-    for field, value in data.model_dump(exclude_unset=True).items():
-        setattr(org, field, value)
-    db.add(org)
+def get_calendar(db: Session, org_id: int, start: datetime, end: datetime) -> CalendarOut | None:
+    # The organization, its resources and their reservations overlapping [start, end) in
+    # three statements whatever the number of resources (selectin loads them by IN lists),
+    # plus the recurring occurrences in the window. Returns None when the org does not exist.
+    org = db.execute(
+        select(Organization)
+        .where(Organization.id == org_id)
+        .options(
+            selectinload(Organization.resources).selectinload(
+                Resource.reservations.and_(Reservation.start_time < end, Reservation.end_time > start)
+            )
+        )
+        .execution_options(populate_existing=True)
+    ).scalar_one_or_none()
+    if org is None:
+        return None
+
+    key = time_key(db)
+    resources = sorted(org.resources, key=lambda resource: resource.id)
+    found = recurring_occurrences(db, [resource.id for resource in resources], start, end)
+    return CalendarOut(
+        organization=OrganizationOut.model_validate(org),
+        start=start,
+        end=end,
+        resources=[
+            CalendarResource(
+                **ResourceOut.model_validate(resource).model_dump(),
+                reservations=[
+                    ReservationOut.model_validate(reservation)
+                    for reservation in sorted(
+                        resource.reservations, key=lambda r: (key(r.start_time), r.id)
+                    )
+                ],
+                occurrences=[
+                    OccurrenceOut(rule_id=rule_id, resource_id=resource.id, start_time=s, end_time=e)
+                    for s, e, rule_id in found.get(resource.id, [])
+                ],
+            )
+            for resource in resources
+        ],
+    )
+
+
+def update_organization_by_id(db: Session, org_id: int, data: OrganizationUpdate) -> Organization | None:
+    obj = update_returning(db, Organization, org_id, data.model_dump(exclude_unset=True))
     db.commit()
-    db.refresh(org)
-    return org
+    if obj is not None:
+        cache.invalidate(ORGANIZATIONS_KEY)
+    return obj
 
 
-def delete_organization(db: Session, org: Organization) -> None:
-    db.delete(org)
+def delete_organization_by_id(db: Session, org_id: int) -> bool:
+    # Same rows as the ORM cascade (users, resources and the reservations of both), deleted
+    # set-wise instead of being loaded and deleted one by one. Recurring reservations go with
+    # their resource and lose their user, as their foreign keys declare. Deleted reservations
+    # are published to the changefeed once committed.
+    resources = select(Resource.id).where(Resource.organization_id == org_id)
+    users = select(User.id).where(User.organization_id == org_id)
+    deleted = delete_all_returning(
+        db,
+        Reservation,
+        or_(Reservation.resource_id.in_(resources), Reservation.user_id.in_(users)),
+        Reservation.id,
+        Reservation.resource_id,
+    )
+    rules = select(RecurringReservation.id).where(RecurringReservation.resource_id.in_(resources))
+    db.execute(delete(RecurrenceException).where(RecurrenceException.rule_id.in_(rules)))
+    db.execute(delete(RecurringReservation).where(RecurringReservation.resource_id.in_(resources)))
+    db.execute(
+        update(RecurringReservation).where(RecurringReservation.user_id.in_(users)).values(user_id=None)
+    )
+    db.execute(delete(User).where(User.organization_id == org_id))
+    resource_ids = db.execute(resources).scalars().all()
+    db.execute(delete(Resource).where(Resource.organization_id == org_id))
+    if db.execute(delete(Organization).where(Organization.id == org_id)).rowcount == 0:
+        db.rollback()
+        return False
     db.commit()
+
+    keys = {ORGANIZATIONS_KEY, "resources:all", f"resources:org:{org_id}"}
+    for resource_id in resource_ids:
+        keys.update(resource_cache_keys(resource_id, org_id))
+    cache.invalidate(*sorted(keys))
+    publish_deleted(deleted)
+    return True
+
+
+def update_organization(db: Session, org: Organization, data: OrganizationUpdate) -> Organization:
+    return update_organization_by_id(db, org.id, data) or org
+
+
+def delete_organization(db: Session, org: Organization) -> None:
+    delete_organization_by_id(db, org.id)
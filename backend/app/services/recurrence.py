@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import math
+from collections.abc import Collection, Iterator
+from datetime import datetime, timedelta
+
+# Expansion of recurrence rules into occurrences. Pure functions over datetimes that are
+# already in one comparable form (see reservation_service.time_key).
+
+DAILY = "daily"
+WEEKLY = "weekly"
+FREQUENCIES = (DAILY, WEEKLY)
+
+
+def parse_weekdays(value: str | None) -> tuple[int, ...]:
+    return tuple(int(day) for day in value.split(",")) if value else ()
+
+
+def format_weekdays(days: Collection[int]) -> str | None:
+    return ",".join(str(day) for day in sorted(set(days))) or None
+
+
+def period_days(freq: str, interval: int) -> int:
+    # Days after which a rule's pattern repeats
+    if freq == DAILY:
+        return interval
+    if freq == WEEKLY:
+        return 7 * interval
+    raise ValueError(f"Unknown frequency {freq!r}, expected one of {FREQUENCIES}")
+
+
+def _pattern(start: datetime, freq: str, interval: int, weekdays: Collection[int]):
+    # A rule repeats a fixed pattern every `period`: occurrences fall at `anchor + k * period
+    # + offset` for each offset. Weekly rules anchor at the Monday of the first week.
+    period = timedelta(days=period_days(freq, interval))
+    if freq == DAILY:
+        return start, period, [timedelta(0)]
+    days = sorted(set(weekdays)) or [start.weekday()]
+    return start - timedelta(days=start.weekday()), period, [timedelta(days=day) for day in days]
+
+
+def min_gap(start: datetime, freq: str, interval: int, weekdays: Collection[int]) -> timedelta:
+    # Shortest distance between two consecutive occurrence starts
+    _, period, offsets = _pattern(start, freq, interval, weekdays)
+    gaps = [b - a for a, b in zip(offsets, offsets[1:])]
+    return min(gaps + [period - offsets[-1] + offsets[0]])
+
+
+def patterns_meet(
+    first: tuple[datetime, datetime, str, int, Collection[int]],
+    second: tuple[datetime, datetime, str, int, Collection[int]],
+) -> bool:
+    # Whether two rules, each given as (start, end, freq, interval, weekdays) and repeating
+    # without end, ever overlap. The differences between their occurrence starts are exactly
+    # the differences of their pattern slots shifted by multiples of the gcd of the periods.
+    first_anchor, first_period, first_offsets = _pattern(first[0], *first[2:])
+    second_anchor, second_period, second_offsets = _pattern(second[0], *second[2:])
+    step = timedelta(days=math.gcd(first_period.days, second_period.days))
+    first_duration, second_duration = first[1] - first[0], second[1] - second[0]
+    for first_offset in first_offsets:
+        for second_offset in second_offsets:
+            gap = (first_anchor + first_offset - second_anchor - second_offset) % step
+            if gap < second_duration or step - gap < first_duration:
+                return True
+    return False
+
+
+def occurrences(
+    start: datetime,
+    end: datetime,
+    freq: str,
+    interval: int,
+    weekdays: Collection[int],
+    until: datetime | None,
+    window_start: datetime,
+    window_end: datetime,
+    skip: Collection[datetime] = (),
+) -> Iterator[tuple[datetime, datetime]]:
+    # Occurrences of the rule whose first instance is [start, end) that overlap
+    # [window_start, window_end), in start order. Iteration jumps straight to the first
+    # period that can reach the window, so the cost follows the window, not the rule's age.
+    duration = end - start
+    anchor, period, offsets = _pattern(start, freq, interval, weekdays)
+    try:
+        k = max(0, (window_start - duration - anchor - offsets[-1]) // period)
+        while True:
+            base = anchor + k * period
+            for offset in offsets:
+                occurrence = base + offset
+                if occurrence >= window_end or (until is not None and occurrence > until):
+                    return
+                if occurrence >= start and occurrence + duration > window_start and occurrence not in skip:
+                    yield occurrence, occurrence + duration
+            k += 1
+    except OverflowError:
+        # The next occurrence would fall past the latest supported date
+        return
+
+
+def nth_start(
+    start: datetime, end: datetime, freq: str, interval: int, weekdays: Collection[int], count: int
+) -> datetime:
+    # Start of the count-th occurrence, used to turn an RRULE COUNT into an UNTIL. Computed
+    # from the pattern rather than by stepping through the occurrences, so its cost does not
+    # grow with `count`.
+    if count < 1:
+        raise ValueError("count must be at least 1")
+    anchor, period, offsets = _pattern(start, freq, interval, weekdays)
+    # Pattern slots of the first period that fall before `start` are not occurrences
+    index = count - 1 + sum(1 for offset in offsets if anchor + offset < start)
+    try:
+        return anchor + index // len(offsets) * period + offsets[index % len(offsets)]
+    except OverflowError:
+        raise ValueError("count reaches past the latest supported date") from None
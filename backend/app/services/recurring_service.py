@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+import math
+from datetime import datetime, timedelta
+
+from app.core.config import settings
+from app.db.writes import delete_returning, update_returning
+from app.models.recurring_reservation import RecurrenceException, RecurringReservation
+from app.models.reservation import Reservation
+from app.models.resource import Resource
+from app.schemas.recurring_reservation import OccurrenceOut, RecurringReservationCreate
+from app.services.occupancy import Occupancy
+from app.services.recurrence import (
+    WEEKLY,
+    format_weekdays,
+    min_gap,
+    nth_start,
+    occurrences,
+    parse_weekdays,
+    patterns_meet,
+    period_days,
+)
+from app.services.reservation_service import (
+    CANCELLED,
+    CONFLICT_ERROR,
+    booking_limit,
+    lock_resources,
+    recurring_occurrences,
+    shared_peak,
+    time_key,
+)
+from app.services.schedule_cache import schedules
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session, selectinload
+
+
+def _joint_horizon(
+    db: Session, data: RecurringReservationCreate, weekdays: list[int], horizon: datetime
+) -> datetime:
+    # Other rules of the resource still repeating at `horizon` could meet the new one any
+    # time later. Once every one of them has started and is past its last exception, their
+    # occurrences together repeat every lcm of their periods, so checking one such joint
+    # period after that covers the rest; the horizon is moved to its end. Rules whose
+    # patterns never meet the new one (recurrence.patterns_meet) are left out. A rule that
+    # does meet it in a pattern longer than the horizon would take too long to sweep.
+    key = time_key(db)
+    rules = db.execute(
+        select(
+            RecurringReservation.id,
+            RecurringReservation.start_time,
+            RecurringReservation.end_time,
+            RecurringReservation.freq,
+            RecurringReservation.interval,
+            RecurringReservation.weekdays,
+            RecurringReservation.until,
+        ).where(
+            RecurringReservation.resource_id == data.resource_id,
+            RecurringReservation.status.is_distinct_from(CANCELLED),
+        )
+    ).all()
+    new_rule = (key(data.start_time), key(data.end_time), data.freq, data.interval, weekdays)
+    days = period_days(data.freq, data.interval)
+    reaching = []
+    for rule in rules:
+        if rule.until is not None and key(rule.until) + (key(rule.end_time) - key(rule.start_time)) <= key(horizon):
+            continue
+        pattern = (key(rule.start_time), key(rule.end_time), rule.freq, rule.interval, parse_weekdays(rule.weekdays))
+        if not patterns_meet(new_rule, pattern):
+            continue
+        joint = math.lcm(days, period_days(rule.freq, rule.interval))
+        if joint > settings.RECURRENCE_HORIZON_DAYS:
+            raise ValueError(
+                f"The rule meets recurring reservation {rule.id} in a pattern repeating every {joint} days;"
+                " give it an until or a count"
+            )
+        days = joint
+        reaching.append(rule)
+    if not reaching:
+        return horizon
+    starts = [horizon, *(rule.start_time for rule in reaching)]
+    last_exception = db.execute(
+        select(func.max(RecurrenceException.occurrence_start)).where(
+            RecurrenceException.rule_id.in_([rule.id for rule in reaching])
+        )
+    ).scalar()
+    if last_exception is not None:
+        starts.append(last_exception)
+    longest = max(
+        data.end_time - data.start_time, *(key(rule.end_time) - key(rule.start_time) for rule in reaching)
+    )
+    return max(starts, key=key) + timedelta(days=days) + longest
+
+
+def _rule_conflicts(
+    db: Session, data: RecurringReservationCreate, weekdays: list[int], until: datetime | None, limit: int
+) -> bool:
+    # Sweep the new rule's occurrences against the resource's bookings, single and recurring,
+    # up to RECURRENCE_HORIZON_DAYS after the first occurrence, or one joint period of the
+    # rules still repeating by then (_joint_horizon). Both sides are in start order and
+    # active bookings never overlap, so each occurrence only meets the next stored one. On a
+    # shared resource (limit > 1) each occurrence is checked for occupancy instead. Single
+    # bookings further out are few, and each is checked on its own.
+    key = time_key(db)
+    duration = data.end_time - data.start_time
+    horizon = data.start_time + timedelta(days=settings.RECURRENCE_HORIZON_DAYS)
+    if until is not None and key(until + duration) < key(horizon):
+        horizon = until + duration
+    else:
+        horizon = _joint_horizon(db, data, weekdays, horizon)
+
+    def expand(window_start: datetime, window_end: datetime):
+        return occurrences(
+            key(data.start_time),
+            key(data.end_time),
+            data.freq,
+            data.interval,
+            weekdays,
+            key(until) if until is not None else None,
+            window_start,
+            window_end,
+        )
+
+    rows = db.execute(
+        select(Reservation.start_time, Reservation.end_time)
+        .where(
+            Reservation.resource_id == data.resource_id,
+            Reservation.start_time < horizon,
+            Reservation.end_time > data.start_time,
+            Reservation.status.is_distinct_from(CANCELLED),
+        )
+        .order_by(Reservation.start_time)
+    )
+    stored = [(key(start), key(end)) for start, end in rows]
+    recurring = recurring_occurrences(db, [data.resource_id], data.start_time, horizon)
+    stored += [(start, end) for start, end, _ in recurring.get(data.resource_id, [])]
+    stored.sort()
+    occupancy = Occupancy(stored) if limit > 1 else None
+
+    pos = 0
+    for start, end in expand(key(data.start_time), key(horizon)):
+        if occupancy is not None:
+            if occupancy.peak(start, end) >= limit:
+                return True
+            continue
+        while pos < len(stored) and stored[pos][1] <= start:
+            pos += 1
+        if pos < len(stored) and stored[pos][0] < end:
+            return True
+
+    # Occurrences starting past the horizon can only meet single bookings reaching past it
+    later = select(Reservation.start_time, Reservation.end_time).where(
+        Reservation.resource_id == data.resource_id,
+        Reservation.end_time > horizon,
+        Reservation.status.is_distinct_from(CANCELLED),
+    )
+    if until is not None:
+        later = later.where(Reservation.start_time < until + duration)
+    for booked_start, booked_end in db.execute(later.order_by(Reservation.start_time)).all():
+        for start, end in expand(max(key(booked_start), key(horizon)), key(booked_end)):
+            if start < key(horizon):
+                continue
+            if limit == 1 or shared_peak(db, data.resource_id, start, end) >= limit:
+                return True
+    return False
+
+
+def create_recurring_reservation(db: Session, data: RecurringReservationCreate) -> RecurringReservation:
+    try:
+        return _create_recurring_reservation(db, data)
+    except OverflowError:
+        # The conflict horizon or the rule's pattern lies past the latest supported date
+        db.rollback()
+        raise ValueError("The rule reaches past the latest supported date") from None
+
+
+def _create_recurring_reservation(db: Session, data: RecurringReservationCreate) -> RecurringReservation:
+    if data.end_time <= data.start_time:
+        raise ValueError("end_time must be after start_time")
+    if data.freq == WEEKLY and data.weekdays and data.start_time.weekday() not in data.weekdays:
+        raise ValueError("start_time must fall on one of the weekdays")
+    if data.until is not None and data.count is not None:
+        raise ValueError("Give either until or count, not both")
+    duration = data.end_time - data.start_time
+    if duration > min_gap(data.start_time, data.freq, data.interval, data.weekdays or ()):
+        raise ValueError("Occurrences of a recurring reservation must not overlap each other")
+
+    key = time_key(db)
+    # Weekdays are stored in the frame the database compares times in (UTC outside SQLite)
+    shift = key(data.start_time).weekday() - data.start_time.weekday()
+    weekdays = sorted({(day + shift) % 7 for day in data.weekdays or ()})
+    until = data.until
+    if data.count is not None:
+        until = nth_start(
+            data.start_time, data.end_time, data.freq, data.interval, data.weekdays or (), data.count
+        )
+    if until is not None and key(until) < key(data.start_time):
+        raise ValueError("until must not be before start_time")
+
+    lock_resources(db, [data.resource_id])
+    resource = db.get(Resource, data.resource_id)
+    if resource is None:
+        db.rollback()
+        raise ValueError("Resource not found")
+    try:
+        conflict = _rule_conflicts(db, data, weekdays, until, booking_limit(resource.shared, resource.capacity))
+    except ValueError:
+        db.rollback()
+        raise
+    if conflict:
+        db.rollback()
+        raise ValueError(CONFLICT_ERROR)
+
+    obj = RecurringReservation(
+        **data.model_dump(exclude={"weekdays", "until", "count"}),
+        weekdays=format_weekdays(weekdays) if data.freq == WEEKLY else None,
+        until=until,
+        exceptions=[],
+    )
+    db.add(obj)
+    db.commit()
+    schedules.discard(data.resource_id)
+    return obj
+
+
+def get_recurring_reservation(db: Session, rule_id: int) -> RecurringReservation | None:
+    return db.get(RecurringReservation, rule_id, options=[selectinload(RecurringReservation.exceptions)])
+
+
+def list_recurring_reservations(db: Session, resource_id: int | None = None) -> list[RecurringReservation]:
+    stmt = select(RecurringReservation).options(selectinload(RecurringReservation.exceptions))
+    if resource_id is not None:
+        stmt = stmt.where(RecurringReservation.resource_id == resource_id)
+    return list(db.execute(stmt.order_by(RecurringReservation.id)).scalars().all())
+
+
+def list_occurrences(
+    db: Session,
+    start: datetime,
+    end: datetime,
+    resource_id: int | None = None,
+    rule_id: int | None = None,
+) -> list[OccurrenceOut]:
+    found = recurring_occurrences(
+        db, None if resource_id is None else [resource_id], start, end, rule_id=rule_id
+    )
+    result = [
+        OccurrenceOut(rule_id=rule, resource_id=resource, start_time=start, end_time=end)
+        for resource, items in found.items()
+        for start, end, rule in items
+    ]
+    result.sort(key=lambda o: (o.start_time, o.rule_id))
+    return result
+
+
+def add_exception(db: Session, rule_id: int, occurrence_start: datetime) -> RecurringReservation | None:
+    # Skips one occurrence, which frees its slot. Returns None when the rule does not exist.
+    rule = get_recurring_reservation(db, rule_id)
+    if rule is None:
+        return None
+    key = time_key(db)
+    target = key(occurrence_start)
+    expanded = occurrences(
+        key(rule.start_time),
+        key(rule.end_time),
+        rule.freq,
+        rule.interval,
+        parse_weekdays(rule.weekdays),
+        key(rule.until) if rule.until is not None else None,
+        target,
+        target + timedelta(microseconds=1),
+    )
+    if not any(start == target for start, _ in expanded):
+        raise ValueError("The rule has no occurrence starting at occurrence_start")
+    if all(key(item.occurrence_start) != target for item in rule.exceptions):
+        rule.exceptions.append(RecurrenceException(occurrence_start=occurrence_start))
+        db.commit()
+        schedules.discard(rule.resource_id)
+    return rule
+
+
+def cancel_recurring_reservation_by_id(db: Session, rule_id: int) -> RecurringReservation | None:
+    obj = update_returning(db, RecurringReservation, rule_id, {"status": CANCELLED})
+    db.commit()
+    if obj is not None:
+        schedules.discard(obj.resource_id)
+    return obj
+
+
+def delete_recurring_reservation_by_id(db: Session, rule_id: int) -> bool:
+    db.execute(delete(RecurrenceException).where(RecurrenceException.rule_id == rule_id))
+    row = delete_returning(db, RecurringReservation, rule_id, RecurringReservation.resource_id)
+    db.commit()
+    if row is not None:
+        schedules.discard(row.resource_id)
+    return row is not None
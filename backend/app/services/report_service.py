@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from app.db.archive import archive
+from app.db.rollup import usage_day, usage_seconds, usage_source
+from app.models.resource import Resource
+from app.models.resource_daily_usage import ResourceDailyUsage
+from app.schemas.report import UtilizationRow
+from app.services.reservation_service import CANCELLED, recurring_occurrences, time_key
+from sqlalchemy import Date, case, cast, func, literal, select, union_all
+from sqlalchemy.orm import Session
+
+GRANULARITIES = ("day", "week")
+GROUPINGS = ("resource", "organization")
+
+
+def _period(day, granularity: str, dialect: str):
+    # First day of the period `day` falls in; weeks start on Monday
+    if granularity == "day":
+        return day
+    if dialect == "sqlite":
+        return func.date(day, "weekday 0", "-6 days", type_=Date)
+    return cast(func.date_trunc("week", day), Date)
+
+
+def _period_days(period_start: date, granularity: str, start: date, end: date) -> int:
+    # Days of the period inside the report window
+    period_end = period_start + timedelta(days=1 if granularity == "day" else 7)
+    return (min(period_end, end) - max(period_start, start)).days
+
+
+def _groups(group_by: str) -> list:
+    columns = [Resource.organization_id.label("organization_id")]
+    if group_by == "resource":
+        columns.append(Resource.id.label("resource_id"))
+    return columns
+
+
+def _filter(stmt, organization_id: int | None, resource_id: int | None):
+    if organization_id is not None:
+        stmt = stmt.where(Resource.organization_id == organization_id)
+    if resource_id is not None:
+        stmt = stmt.where(Resource.id == resource_id)
+    return stmt
+
+
+def _window(start: date, end: date) -> tuple[datetime, datetime]:
+    return datetime.combine(start, datetime.min.time()), datetime.combine(end, datetime.min.time())
+
+
+def _totals(dialect: str, start: date, end: date, granularity: str, group_by: str, use_rollup: bool):
+    # Reservations, cancellations and booked seconds per group and period, by start day
+    groups = _groups(group_by)
+    if use_rollup:
+        period = _period(ResourceDailyUsage.day, granularity, dialect)
+        stmt = (
+            select(
+                *groups,
+                period.label("period"),
+                func.sum(ResourceDailyUsage.reservations),
+                func.sum(ResourceDailyUsage.cancelled),
+                func.sum(ResourceDailyUsage.booked_seconds),
+            )
+            .select_from(ResourceDailyUsage)
+            .join(Resource, Resource.id == ResourceDailyUsage.resource_id)
+            .where(ResourceDailyUsage.day >= start, ResourceDailyUsage.day < end)
+        )
+    else:
+        window_start, window_end = _window(start, end)
+        source = usage_source(archive.reaches(window_start))
+        cancelled = source.c.status == CANCELLED
+        period = _period(usage_day(source.c.start_time, dialect), granularity, dialect)
+        stmt = (
+            select(
+                *groups,
+                period.label("period"),
+                func.count(),
+                func.sum(case((cancelled, 1), else_=0)),
+                func.sum(
+                    case(
+                        (cancelled, 0),
+                        else_=usage_seconds(source.c.start_time, source.c.end_time, dialect),
+                    )
+                ),
+            )
+            .select_from(source)
+            .join(Resource, Resource.id == source.c.resource_id)
+            .where(source.c.start_time >= window_start, source.c.start_time < window_end)
+        )
+    return stmt.group_by(*groups, period)
+
+
+def _peaks(dialect: str, start: date, end: date, granularity: str, group_by: str, filters):
+    # Peak concurrency per group and period: a running sum over start (+1) and end (-1)
+    # events in time order, ends first on ties so back-to-back bookings do not overlap.
+    # The level held just before an end event is level + 1.
+    window_start, window_end = _window(start, end)
+    groups = _groups(group_by)
+    source = usage_source(archive.reaches(window_start))
+
+    def events(at, delta: int):
+        stmt = (
+            select(*groups, at.label("at"), literal(delta).label("delta"))
+            .select_from(source)
+            .join(Resource, Resource.id == source.c.resource_id)
+            .where(
+                source.c.start_time < window_end,
+                source.c.end_time > window_start,
+                source.c.status.is_distinct_from(CANCELLED),
+            )
+        )
+        return filters(stmt)
+
+    timeline = union_all(events(source.c.start_time, 1), events(source.c.end_time, -1)).subquery()
+    keys = [timeline.c[column.name] for column in groups]
+    levels = select(
+        *keys,
+        timeline.c.at,
+        timeline.c.delta,
+        func.sum(timeline.c.delta)
+        .over(partition_by=keys, order_by=(timeline.c.at, timeline.c.delta), rows=(None, 0))
+        .label("level"),
+    ).subquery()
+    keys = [levels.c[column.name] for column in groups]
+    period = _period(usage_day(levels.c.at, dialect), granularity, dialect)
+    held = levels.c.level + case((levels.c.delta < 0, 1), else_=0)
+    return (
+        select(*keys, period, func.max(held))
+        .where(levels.c.at >= window_start, levels.c.at < window_end)
+        .group_by(*keys, period)
+    )
+
+
+def _period_of(day: date, granularity: str) -> date:
+    # _period for a day already in Python
+    return day if granularity == "day" else day - timedelta(days=day.weekday())
+
+
+def _recurring(db: Session, start: date, end: date, group_by: str, filters) -> dict[tuple, list]:
+    # Occurrences of active recurring reservations overlapping the window, in time_key
+    # form, per group. They are not stored rows, so they are expanded here as
+    # availability_service does.
+    window_start, window_end = _window(start, end)
+    owners = filters(select(Resource.id, *_groups(group_by)))
+    group_of = {resource_id: tuple(key) for resource_id, *key in db.execute(owners)}
+    by_group: dict[tuple, list] = defaultdict(list)
+    for resource_id, items in recurring_occurrences(db, None, window_start, window_end).items():
+        if resource_id in group_of:
+            by_group[group_of[resource_id]] += [(first, last) for first, last, _ in items]
+    return dict(by_group)
+
+
+def _swept_peaks(
+    db: Session, start: date, end: date, granularity: str, group_by: str, filters, recurring: dict[tuple, list]
+) -> dict[tuple, int]:
+    # Peak concurrency of the groups holding recurring occurrences, from their stored
+    # reservations and the occurrences together, swept the way _peaks runs its sum
+    window_start, window_end = _window(start, end)
+    source = usage_source(archive.reaches(window_start))
+    stmt = filters(
+        select(*_groups(group_by), source.c.start_time, source.c.end_time)
+        .select_from(source)
+        .join(Resource, Resource.id == source.c.resource_id)
+        .where(
+            source.c.start_time < window_end,
+            source.c.end_time > window_start,
+            source.c.status.is_distinct_from(CANCELLED),
+        )
+    )
+    key = time_key(db)
+    intervals = {group: list(items) for group, items in recurring.items()}
+    for *group, booked_start, booked_end in db.execute(stmt):
+        if tuple(group) in intervals:
+            intervals[tuple(group)].append((key(booked_start), key(booked_end)))
+
+    peaks: dict[tuple, int] = {}
+    window = (key(window_start), key(window_end))
+    for group, items in intervals.items():
+        level = 0
+        for at, delta in sorted([(a, 1) for a, _ in items] + [(b, -1) for _, b in items]):
+            level += delta
+            if window[0] <= at < window[1]:
+                period = (*group, _period_of(at.date(), granularity))
+                peaks[period] = max(peaks.get(period, 0), level + (1 if delta < 0 else 0))
+    return peaks
+
+
+def utilization(
+    db: Session,
+    start: date,
+    end: date,
+    granularity: str = "day",
+    group_by: str = "resource",
+    organization_id: int | None = None,
+    resource_id: int | None = None,
+    use_rollup: bool = False,
+    peak: bool = True,
+) -> list[UtilizationRow]:
+    # Aggregates over stored reservations run in the database; Python joins the per-period
+    # results and adds the occurrences of recurring reservations, which are not stored rows.
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {GRANULARITIES}")
+    if group_by not in GROUPINGS:
+        raise ValueError(f"group_by must be one of {GROUPINGS}")
+    dialect = db.get_bind().dialect.name
+    groups = _groups(group_by)
+    key_size = len(groups)
+
+    def filters(stmt):
+        return _filter(stmt, organization_id, resource_id)
+
+    rows: dict[tuple, list] = defaultdict(lambda: [0, 0, 0, None])
+    for *key, period, reservations, cancelled, seconds in db.execute(
+        filters(_totals(dialect, start, end, granularity, group_by, use_rollup))
+    ):
+        rows[(*key, period)][:3] = [reservations, cancelled or 0, seconds or 0]
+    # Occurrences count like reservations, by the day they start
+    recurring = _recurring(db, start, end, group_by, filters)
+    window_start, window_end = (time_key(db)(value) for value in _window(start, end))
+    for group, items in recurring.items():
+        for occurrence_start, occurrence_end in items:
+            if window_start <= occurrence_start < window_end:
+                row = rows[(*group, _period_of(occurrence_start.date(), granularity))]
+                row[0] += 1
+                row[2] += round((occurrence_end - occurrence_start).total_seconds())
+    if peak:
+        for *key, period, value in db.execute(_peaks(dialect, start, end, granularity, group_by, filters)):
+            if tuple(key) not in recurring:
+                rows[(*key, period)][3] = value
+        for key, value in _swept_peaks(db, start, end, granularity, group_by, filters, recurring).items():
+            rows[key][3] = value
+
+    # Resources per group, for the utilization denominator
+    capacity = filters(select(*groups, func.count()).group_by(*groups))
+    resources = {tuple(key): count for *key, count in db.execute(capacity)}
+    if group_by == "resource":
+        resources = {key: 1 for key in resources}
+
+    result = []
+    for key in sorted(rows):
+        reservations, cancelled, seconds, peak_value = rows[key]
+        period_start = key[key_size]
+        hours = 24 * _period_days(period_start, granularity, start, end) * resources.get(key[:key_size], 1)
+        result.append(
+            UtilizationRow(
+                period_start=period_start,
+                organization_id=key[0],
+                resource_id=key[1] if group_by == "resource" else None,
+                reservations=reservations,
+                cancelled=cancelled,
+                cancellation_rate=round(cancelled / reservations, 4) if reservations else 0.0,
+                booked_hours=round(seconds / 3600, 2),
+                utilization=round(seconds / 3600 / hours, 4) if hours > 0 else 0.0,
+                peak_concurrency=(peak_value or 0) if peak else None,
+            )
+        )
+    return result
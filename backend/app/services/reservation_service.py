@@ -1,31 +1,344 @@
 from __future__ import annotations
 
-from datetime import datetime
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Iterator
+from datetime import datetime, timedelta, timezone
+from typing import Any
 
-from app.models.reservation import Reservation
-from app.schemas.reservation import ReservationCreate, ReservationUpdate
-from sqlalchemy import and_, or_, select
-from sqlalchemy.orm import Session
+from app.core import changefeed
+from app.core.changefeed import changes
+from app.db.archive import archive
+from app.db.writes import delete_returning, update_returning
+from app.models.recurring_reservation import RecurrenceException, RecurringReservation
+from app.models.reservation import ArchivedReservation, Reservation
+from app.models.resource import Resource
+from app.schemas.reservation import (
+    ReservationBulkItemResult,
+    ReservationCreate,
+    ReservationOut,
+    ReservationUpdate,
+)
+from app.services.occupancy import Occupancy, peak_occupancy
+from app.services.recurrence import occurrences, parse_weekdays
+from app.services.schedule_cache import Schedule, schedules
+from sqlalchemy import (
+    Row,
+    ScalarSelect,
+    Select,
+    and_,
+    case,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    tuple_,
+    union_all,
+    update,
+)
+from sqlalchemy.orm import Session, aliased
 
+CANCELLED = "cancelled"
+CONFLICT_ERROR = "Reservation time conflicts with an existing reservation"
+BATCH_CONFLICT_ERROR = "Reservation time conflicts with another item in the batch"
+# Fields whose change can make a reservation overlap another one
+SCHEDULE_FIELDS = frozenset({"start_time", "end_time", "status"})
 
-def has_conflict(db: Session, resource_id: int, start: datetime, end: datetime, exclude_id: int | None = None) -> bool:
-    # Overlap if NOT (existing.end <= start OR existing.start >= end)
-    stmt = select(Reservation).where(
+
+def out_columns(model) -> tuple:
+    # What list_reservation_rows selects: the ReservationOut fields, plus updated_at for the
+    # conditional GET validators
+    return (*(getattr(model, name) for name in ReservationOut.model_fields), model.updated_at)
+
+
+OUT_COLUMNS = out_columns(Reservation)
+# How many active bookings of a resource may overlap: its capacity when it is shared, else one
+BOOKING_LIMIT = case((and_(Resource.shared.is_(True), Resource.capacity > 1), Resource.capacity), else_=1)
+
+
+def booking_limit(shared: bool | None, capacity: int | None) -> int:
+    # BOOKING_LIMIT for a resource already loaded
+    return capacity if shared and capacity is not None and capacity > 1 else 1
+
+
+def publish(event: str, obj: Reservation | None) -> None:
+    # Feed a committed write to /api/reservations/stream subscribers
+    if obj is not None:
+        data = ReservationOut.model_validate(obj).model_dump(mode="json")
+        changes.publish(event, obj.resource_id, obj.id, data)
+
+
+def time_key(db: Session) -> Callable[[datetime], datetime]:
+    # Interval maths done in Python must order datetimes the way the database does.
+    # SQLite stores the wall-clock value and drops tzinfo; other backends compare instants.
+    if db.get_bind().dialect.name == "sqlite":
+        return lambda value: value.replace(tzinfo=None)
+    return lambda value: value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+
+def lock_resources(db: Session, resource_ids: Iterable[int]) -> dict[int, int]:
+    # Serialize bookings per resource until the transaction ends, so the conflict check and
+    # the write that follows it cannot interleave with another worker's. Backends with row
+    # locks lock the resource rows; SQLite has none, so a no-op UPDATE takes its write lock.
+    # With SCHEDULE_CACHE on, the same statement reads the locked resources' schedule
+    # versions, which confirm or drop their cached schedules; they are returned by id.
+    ids = sorted(set(resource_ids))
+    if not ids:
+        return {}
+    columns = (Resource.id, Resource.schedule_version, BOOKING_LIMIT)
+    if db.get_bind().dialect.name == "sqlite":
+        stmt = update(Resource).where(Resource.id.in_(ids)).values(id=Resource.id, updated_at=Resource.updated_at)
+        if not schedules.enabled:
+            db.execute(stmt)
+            return {}
+        if db.get_bind().dialect.update_returning:
+            rows = db.execute(stmt.returning(*columns)).all()
+        else:
+            db.execute(stmt)
+            rows = db.execute(select(*columns).where(Resource.id.in_(ids))).all()
+    else:
+        rows = db.execute(select(*columns).where(Resource.id.in_(ids)).order_by(Resource.id).with_for_update()).all()
+    if not schedules.enabled:
+        return {}
+    schedules.confirm({resource_id: (version, limit) for resource_id, version, limit in rows})
+    return {resource_id: version for resource_id, version, _ in rows}
+
+
+def last_active_before(column, resource_id, before: datetime, exclude_id: int | None = None) -> ScalarSelect:
+    # `column` of the last active (non-cancelled) reservation of `resource_id` that starts
+    # before `before`, as a scalar subquery; `resource_id` may be a correlated column.
+    # Active reservations of a resource never overlap each other, so ordered by start_time
+    # their end_times are ordered too: this single neighbour, found through
+    # ix_reservations_resource_start_end, is the only earlier row that can reach past `before`.
+    stmt = (
+        select(column)
+        .where(
+            Reservation.resource_id == resource_id,
+            Reservation.start_time < before,
+            Reservation.status.is_distinct_from(CANCELLED),
+        )
+        .order_by(Reservation.start_time.desc())
+        .limit(1)
+    )
+    if exclude_id is not None:
+        stmt = stmt.where(Reservation.id != exclude_id)
+    return stmt.scalar_subquery()
+
+
+def peak_booked(resource_id: int, start: datetime, end: datetime, exclude_id: int | None = None) -> ScalarSelect:
+    # Most active reservations of a shared resource in progress at once within [start, end),
+    # as a scalar subquery: a running sum over their start (+1) and end (-1) events in time
+    # order, ends first at equal times since reservations are half-open. Reservations that
+    # started before `start` are counted by the time the window opens, so the maximum of the
+    # running sum is the peak inside the window.
+    window = [
+        Reservation.resource_id == resource_id,
+        Reservation.start_time < end,
+        Reservation.end_time > start,
+        Reservation.status.is_distinct_from(CANCELLED),
+    ]
+    if exclude_id is not None:
+        window.append(Reservation.id != exclude_id)
+    events = union_all(
+        select(Reservation.start_time.label("at"), literal(1).label("delta")).where(*window),
+        select(Reservation.end_time.label("at"), literal(-1).label("delta")).where(*window),
+    ).subquery()
+    running = select(
+        func.sum(events.c.delta).over(order_by=(events.c.at, events.c.delta)).label("booked")
+    ).subquery()
+    return select(func.coalesce(func.max(running.c.booked), 0)).scalar_subquery()
+
+
+def active_rules(resource_ids: Iterable[int] | None, before: datetime):
+    # Active recurring reservations whose first occurrence starts before `before`
+    stmt = select(RecurringReservation).where(
+        RecurringReservation.start_time < before,
+        RecurringReservation.status.is_distinct_from(CANCELLED),
+    )
+    if resource_ids is not None:
+        stmt = stmt.where(RecurringReservation.resource_id.in_(set(resource_ids)))
+    return stmt
+
+
+def recurring_occurrences(
+    db: Session,
+    resource_ids: Iterable[int] | None,
+    start: datetime,
+    end: datetime,
+    exclude_rule_id: int | None = None,
+    rule_id: int | None = None,
+) -> dict[int, list[tuple[datetime, datetime, int]]]:
+    # Occurrences of active recurring reservations overlapping [start, end), as
+    # (start, end, rule_id) in time_key form, per resource in start order. A resource holds
+    # few rules, so all of them are read and each is expanded over the window only.
+    stmt = active_rules(resource_ids, end).with_only_columns(
+        RecurringReservation.id,
+        RecurringReservation.resource_id,
+        RecurringReservation.start_time,
+        RecurringReservation.end_time,
+        RecurringReservation.freq,
+        RecurringReservation.interval,
+        RecurringReservation.weekdays,
+        RecurringReservation.until,
+    )
+    if exclude_rule_id is not None:
+        stmt = stmt.where(RecurringReservation.id != exclude_rule_id)
+    if rule_id is not None:
+        stmt = stmt.where(RecurringReservation.id == rule_id)
+    rules = db.execute(stmt).all()
+    if not rules:
+        return {}
+
+    key = time_key(db)
+    window_start, window_end = key(start), key(end)
+    found: dict[int, list[tuple[datetime, datetime, int]]] = defaultdict(list)
+    for rule in rules:
+        for occurrence in occurrences(
+            key(rule.start_time),
+            key(rule.end_time),
+            rule.freq,
+            rule.interval,
+            parse_weekdays(rule.weekdays),
+            key(rule.until) if rule.until is not None else None,
+            window_start,
+            window_end,
+        ):
+            found[rule.resource_id].append((*occurrence, rule.id))
+    if not found:
+        return {}
+
+    # Exceptions are only looked up once the window holds occurrences
+    longest = max(key(rule.end_time) - key(rule.start_time) for rule in rules)
+    skipped = {
+        (rule_id, key(occurrence_start))
+        for rule_id, occurrence_start in db.execute(
+            select(RecurrenceException.rule_id, RecurrenceException.occurrence_start).where(
+                RecurrenceException.rule_id.in_([rule.id for rule in rules]),
+                RecurrenceException.occurrence_start < end,
+                RecurrenceException.occurrence_start > start - longest,
+            )
+        )
+    }
+    result = {}
+    for resource_id, items in found.items():
+        kept = sorted(item for item in items if (item[2], item[0]) not in skipped)
+        if kept:
+            result[resource_id] = kept
+    return result
+
+
+def has_conflict(
+    db: Session,
+    resource_id: int,
+    start: datetime,
+    end: datetime,
+    exclude_id: int | None = None,
+    exclude_rule_id: int | None = None,
+) -> bool:
+    # Only the last reservation starting before `end` can overlap [start, end). Recurring
+    # reservations are only expanded when the resource has any, in the same round trip.
+    # A shared resource's bookings overlap each other, so for it the question is whether
+    # the window is already at capacity somewhere. With SCHEDULE_CACHE on, windows inside
+    # the cached horizon are answered from memory.
+    if schedules.enabled:
+        schedule = cached_schedule(db, resource_id, start, end)
+        if schedule is not None:
+            key = time_key(db)
+            return schedule.conflicts(key(start), key(end), exclude_id, exclude_rule_id)
+    neighbour_end = last_active_before(Reservation.end_time, resource_id, end, exclude_id)
+    rules = active_rules([resource_id], end)
+    if exclude_rule_id is not None:
+        rules = rules.where(RecurringReservation.id != exclude_rule_id)
+    limit = select(BOOKING_LIMIT).where(Resource.id == resource_id).scalar_subquery()
+    single, recurring, limit = db.execute(select(neighbour_end > start, rules.exists(), limit)).one()
+    if limit is not None and limit > 1:
+        return shared_peak(db, resource_id, start, end, exclude_id, exclude_rule_id, bool(recurring)) >= limit
+    if single:
+        return True
+    return bool(recurring) and bool(
+        recurring_occurrences(db, [resource_id], start, end, exclude_rule_id=exclude_rule_id)
+    )
+
+
+def shared_peak(
+    db: Session,
+    resource_id: int,
+    start: datetime,
+    end: datetime,
+    exclude_id: int | None = None,
+    exclude_rule_id: int | None = None,
+    recurring: bool = True,
+) -> int:
+    # Peak occupancy of a shared resource within [start, end), counted in the database unless
+    # recurring occurrences have to be merged in
+    if not recurring:
+        return db.execute(select(peak_booked(resource_id, start, end, exclude_id))).scalar_one()
+    stmt = select(Reservation.start_time, Reservation.end_time).where(
         Reservation.resource_id == resource_id,
-        or_(
-            and_(Reservation.start_time < end, Reservation.end_time > start),
-        ),
+        Reservation.start_time < end,
+        Reservation.end_time > start,
+        Reservation.status.is_distinct_from(CANCELLED),
     )
     if exclude_id is not None:
         stmt = stmt.where(Reservation.id != exclude_id)
-    return db.execute(stmt).scalars().first() is not None
+    key = time_key(db)
+    booked = [(key(row_start), key(row_end)) for row_start, row_end in db.execute(stmt)]
+    found = recurring_occurrences(db, [resource_id], start, end, exclude_rule_id=exclude_rule_id)
+    booked += [(occurrence_start, occurrence_end) for occurrence_start, occurrence_end, _ in found.get(resource_id, [])]
+    return peak_occupancy(booked, key(start), key(end))
+
+
+def load_schedule(db: Session, resource_id: int, version: int, limit: int) -> Schedule:
+    # A resource's active bookings and occurrences from a day ago to the cache horizon. The
+    # version must have been read before the bookings: a write landing in between then
+    # makes the entry look stale rather than the other way round.
+    key = time_key(db)
+    start = datetime.now(timezone.utc) - timedelta(days=1)
+    end = start + timedelta(days=1) + schedules.horizon
+    rows = db.execute(
+        select(Reservation.start_time, Reservation.end_time, Reservation.id).where(
+            Reservation.resource_id == resource_id,
+            Reservation.start_time < end,
+            Reservation.end_time > start,
+            Reservation.status.is_distinct_from(CANCELLED),
+        )
+    )
+    intervals = [(key(row_start), key(row_end), row_id, 0) for row_start, row_end, row_id in rows]
+    found = recurring_occurrences(db, [resource_id], start, end).get(resource_id, [])
+    intervals += [(occurrence_start, occurrence_end, 0, rule_id) for occurrence_start, occurrence_end, rule_id in found]
+    return Schedule(resource_id, version, limit, key(start), key(end), intervals)
+
+
+def cached_schedule(db: Session, resource_id: int, start: datetime, end: datetime) -> Schedule | None:
+    # The resource's cached schedule when it covers [start, end), loading it on a miss.
+    # Entries are checked against the database's schedule_version unless confirmed within
+    # SCHEDULE_CACHE_REVALIDATE_SECONDS, e.g. by lock_resources in the same write. None
+    # sends the caller to the database (unknown resource, window outside the horizon).
+    key = time_key(db)
+    # Entries are reloaded once half their horizon has gone by
+    reload_before = key(datetime.now(timezone.utc) + schedules.horizon / 2)
+    schedule = schedules.recent(resource_id)
+    if schedule is None or schedule.end < reload_before:
+        row = db.execute(
+            select(Resource.schedule_version, BOOKING_LIMIT).where(Resource.id == resource_id)
+        ).one_or_none()
+        if row is None:
+            return None
+        version, limit = row
+        schedule = schedules.get(resource_id, version, limit)
+        if schedule is None or schedule.end < reload_before:
+            schedule = load_schedule(db, resource_id, version, limit)
+            schedules.put(schedule)
+    return schedule if schedule.covers(key(start), key(end)) else None
 
 
 def create_reservation(db: Session, data: ReservationCreate) -> Reservation:
     if data.end_time <= data.start_time:
         raise ValueError("end_time must be after start_time")
+    versions = lock_resources(db, [data.resource_id])
     if has_conflict(db, data.resource_id, data.start_time, data.end_time):
-        raise ValueError("Reservation time conflicts with an existing reservation")
+        db.rollback()
+        raise ValueError(CONFLICT_ERROR)
 
     obj = Reservation(
         resource_id=data.resource_id,
@@ -39,61 +352,355 @@ def create_reservation(db: Session, data: ReservationCreate) -> Reservation:
     )
     db.add(obj)
     db.commit()
-    db.refresh(obj)
+    if versions:
+        key = time_key(db)
+        interval = (key(data.start_time), key(data.end_time), obj.id, 0)
+        schedules.booked(data.resource_id, versions[data.resource_id], [interval])
+    publish(changefeed.CREATED, obj)
     return obj
 
 
-def get_reservation(db: Session, reservation_id: int) -> Reservation | None:
-    return db.get(Reservation, reservation_id)
+def create_reservations_bulk(db: Session, items: list[ReservationCreate]) -> list[ReservationBulkItemResult]:
+    results: list[ReservationBulkItemResult | None] = [None] * len(items)
+    key = time_key(db)
 
+    def reject(index: int, error: str) -> None:
+        results[index] = ReservationBulkItemResult(index=index, accepted=False, error=error)
 
-def list_reservations(
-    db: Session,
+    by_resource: dict[int, list[int]] = defaultdict(list)
+    for index, item in enumerate(items):
+        if item.end_time <= item.start_time:
+            reject(index, "end_time must be after start_time")
+        else:
+            by_resource[item.resource_id].append(index)
+
+    versions = lock_resources(db, by_resource)
+    limits = {
+        resource_id: limit
+        for resource_id, limit in db.execute(select(Resource.id, BOOKING_LIMIT).where(Resource.id.in_(by_resource)))
+    }
+    for resource_id in set(by_resource) - set(limits):
+        for index in by_resource.pop(resource_id):
+            reject(index, "Resource not found")
+
+    # One query for every active reservation overlapping the batch's span on each resource
+    existing: dict[int, list[tuple[datetime, datetime]]] = defaultdict(list)
+    if by_resource:
+        windows = [
+            and_(
+                Reservation.resource_id == resource_id,
+                Reservation.start_time < max(items[i].end_time for i in indices),
+                Reservation.end_time > min(items[i].start_time for i in indices),
+            )
+            for resource_id, indices in by_resource.items()
+        ]
+        rows = db.execute(
+            select(Reservation.resource_id, Reservation.start_time, Reservation.end_time)
+            .where(or_(*windows), Reservation.status.is_distinct_from(CANCELLED))
+            .order_by(Reservation.resource_id, Reservation.start_time)
+        )
+        for resource_id, start, end in rows:
+            existing[resource_id].append((key(start), key(end)))
+        span_start = min(items[i].start_time for indices in by_resource.values() for i in indices)
+        span_end = max(items[i].end_time for indices in by_resource.values() for i in indices)
+        for resource_id, found in recurring_occurrences(db, by_resource, span_start, span_end).items():
+            existing[resource_id].extend((start, end) for start, end, _ in found)
+            existing[resource_id].sort()
+
+    # Sweep each resource's candidates in start order. Active reservations never overlap, so
+    # only the next stored interval and the last accepted candidate can collide. Within a
+    # batch the earlier-starting item wins (ties go to the earlier item). Shared resources
+    # count occupancy instead, against the stored bookings and then with those accepted.
+    accepted: list[int] = []
+    for resource_id, indices in by_resource.items():
+        stored = existing[resource_id]
+        ordered = sorted(indices, key=lambda i: (key(items[i].start_time), i))
+        limit = limits[resource_id]
+        if limit > 1:
+            before, booked = Occupancy(stored), Occupancy(stored)
+            for index in ordered:
+                start, end = key(items[index].start_time), key(items[index].end_time)
+                if before.peak(start, end) >= limit:
+                    reject(index, CONFLICT_ERROR)
+                elif booked.peak(start, end) >= limit:
+                    reject(index, BATCH_CONFLICT_ERROR)
+                else:
+                    accepted.append(index)
+                    booked.add(start, end)
+            continue
+        pos, last_end = 0, None
+        for index in ordered:
+            start, end = key(items[index].start_time), key(items[index].end_time)
+            while pos < len(stored) and stored[pos][1] <= start:
+                pos += 1
+            if pos < len(stored) and stored[pos][0] < end:
+                reject(index, CONFLICT_ERROR)
+            elif last_end is not None and last_end > start:
+                reject(index, BATCH_CONFLICT_ERROR)
+            else:
+                accepted.append(index)
+                last_end = end
+
+    if accepted:
+        accepted.sort()
+        rows = db.execute(
+            insert(Reservation).returning(Reservation, sort_by_parameter_order=True),
+            [items[i].model_dump() for i in accepted],
+        ).scalars().all()
+        db.commit()
+        added: dict[int, list[tuple[datetime, datetime, int, int]]] = defaultdict(list)
+        for index, row in zip(accepted, rows):
+            results[index] = ReservationBulkItemResult(index=index, accepted=True, id=row.id)
+            added[row.resource_id].append((key(row.start_time), key(row.end_time), row.id, 0))
+            publish(changefeed.CREATED, row)
+        for resource_id, intervals in added.items():
+            if resource_id in versions:
+                schedules.booked(resource_id, versions[resource_id], intervals)
+    else:
+        db.rollback()
+    return results  # type: ignore[return-value]
+
+
+def get_reservation(db: Session, reservation_id: int) -> Reservation | ArchivedReservation | None:
+    # Archived reservations can still be read by id, though no longer changed
+    obj = db.get(Reservation, reservation_id)
+    if obj is None and archive.active:
+        obj = db.execute(
+            select(ArchivedReservation).where(ArchivedReservation.id == reservation_id)
+        ).scalar_one_or_none()
+    return obj
+
+
+def filter_reservations(
+    stmt: Select,
     resource_id: int | None = None,
     user_id: int | None = None,
     start: datetime | None = None,
     end: datetime | None = None,
     guest_last_name: str | None = None,
-) -> list[Reservation]:
-    stmt = select(Reservation)
+    model=Reservation,
+) -> Select:
     if resource_id is not None:
-        stmt = stmt.where(Reservation.resource_id == resource_id)
+        stmt = stmt.where(model.resource_id == resource_id)
     if user_id is not None:
-        stmt = stmt.where(Reservation.user_id == user_id)
+        stmt = stmt.where(model.user_id == user_id)
     if start is not None:
-        stmt = stmt.where(Reservation.end_time > start)
+        stmt = stmt.where(model.end_time > start)
     if end is not None:
-        stmt = stmt.where(Reservation.start_time < end)
+        stmt = stmt.where(model.start_time < end)
     if guest_last_name is not None:
-        stmt = stmt.where(Reservation.guest_last_name == guest_last_name)
-    return list(db.execute(stmt).scalars().all())
+        stmt = stmt.where(model.guest_last_name == guest_last_name)
+    return stmt
 
 
-def update_reservation(db: Session, reservation: Reservation, data: ReservationUpdate) -> Reservation:
+def keyset_page(stmt: Select, limit: int | None, after: tuple[datetime, int] | None, model=Reservation) -> Select:
+    # Rows come back in (start_time, id) order; `after` is the key of the last row already seen.
+    stmt = stmt.order_by(model.start_time, model.id)
+    if after is not None:
+        stmt = stmt.where(tuple_(model.start_time, model.id) > tuple_(*after))
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
+def with_archive(limit: int | None, after: tuple[datetime, int] | None, **filters):
+    # Live and archived reservations matching the filters, as Reservation mapped over the
+    # union of both tables. Each table contributes its own first `limit` rows, found through
+    # its keyset index, so the union is small; the caller orders and cuts it again.
+    arms = [
+        keyset_page(
+            filter_reservations(
+                select(*(getattr(model, column.key) for column in Reservation.__table__.columns)),
+                **filters,
+                model=model,
+            ),
+            limit,
+            after,
+            model,
+        ).subquery()
+        for model in (Reservation, ArchivedReservation)
+    ]
+    return aliased(Reservation, union_all(*(select(arm) for arm in arms)).subquery("history"))
+
+
+def reservations_page(
+    columns: Callable[[Any], tuple], limit: int | None, after: tuple[datetime, int] | None, **filters
+) -> Select:
+    # `columns(model)` of the reservations matching the filters, one keyset page of them.
+    # Only windows reaching back past the archive horizon read the archive.
+    if archive.reaches(filters.get("start")):
+        history = with_archive(limit, after, **filters)
+        return keyset_page(select(*columns(history)), limit, None, history)
+    return keyset_page(filter_reservations(select(*columns(Reservation)), **filters), limit, after)
+
+
+def entity(model) -> tuple:
+    return (model,)
+
+
+def list_reservations(
+    db: Session,
+    resource_id: int | None = None,
+    user_id: int | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    guest_last_name: str | None = None,
+    limit: int | None = None,
+    after: tuple[datetime, int] | None = None,
+) -> list[Reservation]:
+    filters = dict(resource_id=resource_id, user_id=user_id, start=start, end=end, guest_last_name=guest_last_name)
+    return list(db.execute(reservations_page(entity, limit, after, **filters)).scalars().all())
+
+
+def list_reservation_rows(
+    db: Session,
+    resource_id: int | None = None,
+    user_id: int | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    guest_last_name: str | None = None,
+    limit: int | None = None,
+    after: tuple[datetime, int] | None = None,
+) -> list[Row]:
+    # Same rows as list_reservations as plain column tuples, for app.schemas.rows: no ORM
+    # objects, identity map or attribute tracking
+    filters = dict(resource_id=resource_id, user_id=user_id, start=start, end=end, guest_last_name=guest_last_name)
+    return list(db.execute(reservations_page(out_columns, limit, after, **filters)).all())
+
+
+def validators_query(
+    resource_id: int | None = None,
+    user_id: int | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    guest_last_name: str | None = None,
+    limit: int | None = None,
+    after: tuple[datetime, int] | None = None,
+) -> Select:
+    # Count, latest updated_at and sum of ids of the rows list_reservations would return.
+    # Every write bumps updated_at and a delete changes the count, so an unchanged result
+    # can be recognised without loading it.
+    filters = dict(resource_id=resource_id, user_id=user_id, start=start, end=end, guest_last_name=guest_last_name)
+    page = reservations_page(lambda model: (model.id, model.updated_at), limit, after, **filters).subquery()
+    return select(func.count(), func.max(page.c.updated_at), func.coalesce(func.sum(page.c.id), 0))
+
+
+def naive_utc(value: datetime | None) -> datetime | None:
+    # updated_at is always UTC; SQLite hands it back naive
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def list_validators(db: Session, **filters) -> tuple[int, datetime | None, int]:
+    count, latest, id_sum = db.execute(validators_query(**filters)).one()
+    return count, naive_utc(latest), id_sum
+
+
+def rows_validators(rows: list[Reservation] | list[Row]) -> tuple[int, datetime | None, int]:
+    # The same values computed from rows already loaded
+    latest = max((naive_utc(row.updated_at) for row in rows if row.updated_at is not None), default=None)
+    return len(rows), latest, sum(row.id for row in rows)
+
+
+def iter_reservations(
+    db: Session,
+    resource_id: int | None = None,
+    user_id: int | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    guest_last_name: str | None = None,
+    limit: int | None = None,
+    after: tuple[datetime, int] | None = None,
+    chunk_size: int = 500,
+) -> Iterator[Reservation]:
+    # Same rows as list_reservations, fetched from a server-side cursor chunk by chunk
+    filters = dict(resource_id=resource_id, user_id=user_id, start=start, end=end, guest_last_name=guest_last_name)
+    stmt = reservations_page(entity, limit, after, **filters).execution_options(yield_per=chunk_size)
+    yield from db.execute(stmt).scalars()
+
+
+def update_reservation_by_id(db: Session, reservation_id: int, data: ReservationUpdate) -> Reservation | None:
+    # Returns None when the reservation does not exist
     payload = data.model_dump(exclude_unset=True)
-    new_start = payload.get("start_time", reservation.start_time)
-    new_end = payload.get("end_time", reservation.end_time)
+    event = changefeed.CANCELLED if payload.get("status") == CANCELLED else changefeed.UPDATED
+    if SCHEDULE_FIELDS.isdisjoint(payload):
+        obj = update_returning(db, Reservation, reservation_id, payload)
+        db.commit()
+        publish(event, obj)
+        return obj
+
+    # A reservation never changes resource, so its resource is locked before the slot and
+    # status are read: a concurrent change to them commits first, and its values are the
+    # ones merged with the payload and checked
+    resource_id = db.execute(select(Reservation.resource_id).where(Reservation.id == reservation_id)).scalar()
+    if resource_id is None:
+        return None
+    lock_resources(db, [resource_id])
+    current = db.execute(
+        select(Reservation.start_time, Reservation.end_time, Reservation.status).where(Reservation.id == reservation_id)
+    ).one_or_none()
+    if current is None:
+        db.rollback()
+        return None
+    new_start = payload.get("start_time", current.start_time)
+    new_end = payload.get("end_time", current.end_time)
     if new_end <= new_start:
+        db.rollback()
         raise ValueError("end_time must be after start_time")
-    if has_conflict(db, reservation.resource_id, new_start, new_end, exclude_id=reservation.id):
-        raise ValueError("Reservation time conflicts with an existing reservation")
+    # Active reservations never overlap, so only a slot that moves, or a cancelled
+    # reservation becoming active again, needs checking. One that stays cancelled never
+    # blocks anything.
+    key = time_key(db)
+    moved = (key(new_start), key(new_end)) != (key(current.start_time), key(current.end_time))
+    if payload.get("status", current.status) != CANCELLED and (moved or current.status == CANCELLED):
+        if has_conflict(db, resource_id, new_start, new_end, exclude_id=reservation_id):
+            db.rollback()
+            raise ValueError(CONFLICT_ERROR)
 
-    for field, value in payload.items():
-        setattr(reservation, field, value)
-    db.add(reservation)
+    obj = update_returning(db, Reservation, reservation_id, payload)
     db.commit()
-    db.refresh(reservation)
-    return reservation
+    # Other workers see the version move; this one drops its copy so it reads its own write
+    schedules.discard(resource_id)
+    publish(event, obj)
+    return obj
 
 
-def cancel_reservation(db: Session, reservation: Reservation) -> Reservation:
-    reservation.status = "cancelled"
-    db.add(reservation)
+def cancel_reservation_by_id(db: Session, reservation_id: int) -> Reservation | None:
+    obj = update_returning(db, Reservation, reservation_id, {"status": CANCELLED})
     db.commit()
-    db.refresh(reservation)
-    return reservation
+    if obj is not None:
+        schedules.discard(obj.resource_id)
+    publish(changefeed.CANCELLED, obj)
+    return obj
 
 
-def delete_reservation(db: Session, reservation: Reservation) -> None:
-    db.delete(reservation)
+def publish_deleted(rows: Iterable[Row]) -> None:
+    # Announce committed deletes, given as (id, resource_id) rows, e.g. those removed
+    # set-wise together with their resource or organization
+    for row in rows:
+        schedules.discard(row.resource_id)
+        changes.publish(changefeed.DELETED, row.resource_id, row.id, {"id": row.id})
+
+
+def delete_reservation_by_id(db: Session, reservation_id: int) -> bool:
+    row = delete_returning(db, Reservation, reservation_id, Reservation.id, Reservation.resource_id)
     db.commit()
+    if row is not None:
+        publish_deleted([row])
+    return row is not None
+
+
+# Variants taking an already loaded reservation
+
+
+def update_reservation(db: Session, reservation: Reservation, data: ReservationUpdate) -> Reservation:
+    return update_reservation_by_id(db, reservation.id, data) or reservation
+
+
+def cancel_reservation(db: Session, reservation: Reservation) -> Reservation:
+    return cancel_reservation_by_id(db, reservation.id) or reservation
+
+
+def delete_reservation(db: Session, reservation: Reservation) -> None:
+    delete_reservation_by_id(db, reservation.id)
@@ -1,21 +1,44 @@
 from __future__ import annotations
 
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from app.core.cache import cache
+from app.core.config import settings
+from app.db.writes import delete_all_returning, delete_returning, update_returning
+from app.models.recurring_reservation import RecurrenceException, RecurringReservation
+from app.models.reservation import Reservation
 from app.models.resource import Resource
-from app.schemas.resource import ResourceCreate, ResourceUpdate
-from sqlalchemy import select
+from app.schemas.resource import ResourceCreate, ResourceOut, ResourceUpdate
+from app.schemas.rows import rows_python
+from app.services.reservation_service import (
+    CANCELLED,
+    booking_limit,
+    lock_resources,
+    publish_deleted,
+    shared_peak,
+    time_key,
+)
+from app.services.schedule_cache import schedules
+from sqlalchemy import delete, func, select
 from sqlalchemy.orm import Session
 
 
+def resource_cache_keys(resource_id: int, organization_id: int) -> tuple[str, ...]:
+    return (f"resource:{resource_id}", "resources:all", f"resources:org:{organization_id}")
+
+
 def create_resource(db: Session, data: ResourceCreate) -> Resource:
     obj = Resource(
         organization_id=data.organization_id,
         name=data.name,
         type=data.type,
         capacity=data.capacity,
+        shared=data.shared,
     )
     db.add(obj)
     db.commit()
-    db.refresh(obj)
+    cache.invalidate("resources:all", f"resources:org:{obj.organization_id}")
     return obj
 
 
@@ -30,15 +53,96 @@ def list_resources(db: Session, organization_id: int | None = None) -> list[Reso
     return list(db.execute(stmt).scalars().all())
 
 
-def update_resource(db: Session, resource: Resource, data: ResourceUpdate) -> Resource:
-    for field, value in data.model_dump(exclude_unset=True).items():
-        setattr(resource, field, value)
-    db.add(resource)
+# Cached read paths return ResourceOut-shaped dicts, safe to share between sessions and workers
+
+
+def get_resource_cached(db: Session, resource_id: int) -> dict[str, Any] | None:
+    def load() -> dict[str, Any] | None:
+        obj = get_resource(db, resource_id)
+        return ResourceOut.model_validate(obj).model_dump(mode="json") if obj else None
+
+    return cache.get_or_load(f"resource:{resource_id}", load)
+
+
+def list_resources_cached(db: Session, organization_id: int | None = None) -> list[dict[str, Any]]:
+    key = "resources:all" if organization_id is None else f"resources:org:{organization_id}"
+
+    def load() -> list[dict[str, Any]]:
+        stmt = select(*(getattr(Resource, name) for name in ResourceOut.model_fields))
+        if organization_id is not None:
+            stmt = stmt.where(Resource.organization_id == organization_id)
+        return rows_python(ResourceOut, db.execute(stmt))
+
+    return cache.get_or_load(key, load)
+
+
+def overbooked(db: Session, resource_id: int, limit: int) -> bool:
+    # Whether more than `limit` active bookings of the resource overlap anywhere: its
+    # reservations, and recurring occurrences up to RECURRENCE_HORIZON_DAYS from now (as far
+    # as new rules are checked)
+    active = (Reservation.resource_id == resource_id, Reservation.status.is_distinct_from(CANCELLED))
+    first, last = db.execute(select(func.min(Reservation.start_time), func.max(Reservation.end_time)).where(*active)).one()
+    first_rule = db.execute(
+        select(func.min(RecurringReservation.start_time)).where(
+            RecurringReservation.resource_id == resource_id,
+            RecurringReservation.status.is_distinct_from(CANCELLED),
+        )
+    ).scalar()
+    if first_rule is not None:
+        key = time_key(db)
+        horizon = datetime.now(timezone.utc) + timedelta(days=settings.RECURRENCE_HORIZON_DAYS)
+        first = min((value for value in (first, first_rule) if value is not None), key=key)
+        last = max((value for value in (last, horizon) if value is not None), key=key)
+    if first is None:
+        return False
+    return shared_peak(db, resource_id, first, last, recurring=first_rule is not None) > limit
+
+
+def update_resource_by_id(db: Session, resource_id: int, data: ResourceUpdate) -> Resource | None:
+    values = data.model_dump(exclude_unset=True)
+    if "shared" in values or "capacity" in values:
+        # Fewer overlapping bookings allowed than there already are would break conflict
+        # checks, which on a single-occupancy resource rely on bookings never overlapping.
+        # The resource stays locked from the check to the update.
+        lock_resources(db, [resource_id])
+        current = db.execute(select(Resource.shared, Resource.capacity).where(Resource.id == resource_id)).one_or_none()
+        if current is not None:
+            limit = booking_limit(values.get("shared", current.shared), values.get("capacity", current.capacity))
+            if limit < booking_limit(current.shared, current.capacity) and overbooked(db, resource_id, limit):
+                db.rollback()
+                raise ValueError(f"More than {limit} active reservations of this resource overlap")
+    obj = update_returning(db, Resource, resource_id, values)
     db.commit()
-    db.refresh(resource)
-    return resource
+    if obj is not None:
+        cache.invalidate(*resource_cache_keys(obj.id, obj.organization_id))
+        schedules.discard(obj.id)
+    return obj
 
 
-def delete_resource(db: Session, resource: Resource) -> None:
-    db.delete(resource)
+def delete_resource_by_id(db: Session, resource_id: int) -> bool:
+    # Reservations go in one statement instead of being loaded for the ORM cascade; the
+    # foreign key's ON DELETE CASCADE only fires where the backend enforces it. The deleted
+    # ids come back with the statement, for the changefeed.
+    rules = select(RecurringReservation.id).where(RecurringReservation.resource_id == resource_id)
+    db.execute(delete(RecurrenceException).where(RecurrenceException.rule_id.in_(rules)))
+    db.execute(delete(RecurringReservation).where(RecurringReservation.resource_id == resource_id))
+    deleted = delete_all_returning(
+        db, Reservation, Reservation.resource_id == resource_id, Reservation.id, Reservation.resource_id
+    )
+    row = delete_returning(db, Resource, resource_id, Resource.organization_id)
+    if row is None:
+        db.rollback()
+        return False
     db.commit()
+    cache.invalidate(*resource_cache_keys(resource_id, row.organization_id))
+    schedules.discard(resource_id)
+    publish_deleted(deleted)
+    return True
+
+
+def update_resource(db: Session, resource: Resource, data: ResourceUpdate) -> Resource:
+    return update_resource_by_id(db, resource.id, data) or resource
+
+
+def delete_resource(db: Session, resource: Resource) -> None:
+    delete_resource_by_id(db, resource.id)
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from datetime import datetime, timedelta
+from typing import Any
+
+from app.core.config import settings
+from app.services.occupancy import Occupancy, peak_occupancy
+
+# Bookings of each recently used resource over a rolling horizon, kept in memory so
+# conflict and availability checks need no window scan. Entries carry the resource's
+# schedule_version at load time (app.db.schedule) and are only used while the database still
+# reports that version: the database stays the source of truth, the cache just skips
+# re-reading what has not changed.
+
+
+class Schedule(Occupancy):
+    # Active bookings of one resource overlapping [start, end), as (start, end,
+    # reservation_id, rule_id) in time_key form; occurrences of recurring reservations have
+    # reservation_id 0 and single reservations rule_id 0.
+
+    def __init__(
+        self,
+        resource_id: int,
+        version: int,
+        limit: int,
+        start: datetime,
+        end: datetime,
+        intervals: Iterable[tuple[datetime, datetime, int, int]],
+    ):
+        super().__init__(intervals)
+        self.resource_id = resource_id
+        self.version = version
+        self.limit = limit
+        self.start = start
+        self.end = end
+        self.checked_at = 0.0
+
+    def covers(self, start: datetime, end: datetime) -> bool:
+        return self.start <= start and end <= self.end
+
+    def booked(
+        self, start: datetime, end: datetime, exclude_id: int | None = None, exclude_rule_id: int | None = None
+    ) -> list[tuple]:
+        return [
+            interval
+            for interval in self.window(start, end)
+            if interval[2] != exclude_id and (exclude_rule_id is None or interval[3] != exclude_rule_id)
+        ]
+
+    def conflicts(
+        self, start: datetime, end: datetime, exclude_id: int | None = None, exclude_rule_id: int | None = None
+    ) -> bool:
+        return peak_occupancy(self.booked(start, end, exclude_id, exclude_rule_id), start, end) >= self.limit
+
+
+class ScheduleStats:
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "stale": self.stale, "evictions": self.evictions}
+
+
+class ScheduleCache:
+    # LRU of Schedule entries per resource, shared by the threads of one process
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        horizon: timedelta = timedelta(days=30),
+        maxsize: int = 1024,
+        revalidate_seconds: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.enabled = enabled
+        self.horizon = horizon
+        self.maxsize = maxsize
+        self.revalidate_seconds = revalidate_seconds
+        self.stats = ScheduleStats()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[int, Schedule] = OrderedDict()
+
+    def recent(self, resource_id: int) -> Schedule | None:
+        # An entry confirmed against the database within revalidate_seconds, usable without
+        # asking the database again
+        with self._lock:
+            schedule = self._entries.get(resource_id)
+            if schedule is None or self._clock() - schedule.checked_at > self.revalidate_seconds:
+                return None
+            self._entries.move_to_end(resource_id)
+            self.stats.hits += 1
+            return schedule
+
+    def get(self, resource_id: int, version: int, limit: int) -> Schedule | None:
+        # The entry if it was loaded at `version`, the resource's current version in the
+        # database; an older one is dropped
+        with self._lock:
+            schedule = self._entries.get(resource_id)
+            if schedule is None:
+                self.stats.misses += 1
+                return None
+            if schedule.version != version:
+                del self._entries[resource_id]
+                self.stats.stale += 1
+                return None
+            schedule.limit = limit  # capacity changes do not move the version
+            schedule.checked_at = self._clock()
+            self._entries.move_to_end(resource_id)
+            self.stats.hits += 1
+            return schedule
+
+    def put(self, schedule: Schedule) -> None:
+        with self._lock:
+            current = self._entries.get(schedule.resource_id)
+            if current is not None and current.version > schedule.version:
+                return
+            schedule.checked_at = self._clock()
+            self._entries[schedule.resource_id] = schedule
+            self._entries.move_to_end(schedule.resource_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def confirm(self, versions: dict[int, tuple[int, int]]) -> None:
+        # Versions read with the resources locked, from lock_resources
+        for resource_id, (version, limit) in versions.items():
+            self.get(resource_id, version, limit)
+
+    def booked(self, resource_id: int, version: int, added: Iterable[tuple[datetime, datetime, int, int]]) -> None:
+        # A committed insert of len(added) reservations made while the resource was locked at
+        # `version`; each one bumped the version once. Entries that moved on meanwhile are
+        # left for the next check to drop.
+        added = list(added)
+        with self._lock:
+            schedule = self._entries.get(resource_id)
+            if schedule is None or schedule.version != version:
+                return
+            for interval in added:
+                if interval[0] < schedule.end and interval[1] > schedule.start:
+                    schedule.add(*interval)
+            schedule.version = version + len(added)
+
+    def discard(self, *resource_ids: int) -> None:
+        with self._lock:
+            for resource_id in resource_ids:
+                self._entries.pop(resource_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def info(self) -> dict[str, Any]:
+        return {"enabled": self.enabled, "entries": len(self._entries), "maxsize": self.maxsize, **self.stats.as_dict()}
+
+
+schedules = ScheduleCache(
+    enabled=settings.SCHEDULE_CACHE,
+    horizon=timedelta(days=settings.SCHEDULE_CACHE_HORIZON_DAYS),
+    maxsize=settings.SCHEDULE_CACHE_MAX_RESOURCES,
+    revalidate_seconds=settings.SCHEDULE_CACHE_REVALIDATE_SECONDS,
+)
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import string
+from datetime import datetime
+
+from app.db.search import FTS5, reservations_fts, search_backend
+from app.models.reservation import Reservation
+from app.services.reservation_service import OUT_COLUMNS, filter_reservations, keyset_page
+from sqlalchemy import Row, and_, func, literal_column, or_, select
+from sqlalchemy.orm import Session
+
+# SQLite's lower() only folds ASCII, so prefixes are folded the same way to stay comparable
+ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+# The trigram tokenizer cannot match anything shorter
+FTS_MIN_TERM = 3
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def name_prefix(prefix: str, dialect: str):
+    # Last names starting with `prefix`, ignoring case. On SQLite a range over lower()
+    # is served by ix_reservations_guest_last_name_lower_start; PostgreSQL uses LIKE, which
+    # its trigram index on lower(guest_last_name) supports.
+    column = func.lower(Reservation.guest_last_name)
+    if dialect == "sqlite":
+        low = prefix.translate(ASCII_LOWER)
+        high = low[:-1] + chr(ord(low[-1]) + 1)
+        return and_(column >= low, column < high)
+    return column.like(_escape_like(prefix.lower()) + "%", escape="\\")
+
+
+def _fts_phrase(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+def text_terms(q: str, backend: str) -> list:
+    # Every whitespace-separated term must appear in notes or guest_contact, in any case.
+    # ILIKE is what pg_trgm indexes serve, and the LIKE fallback everywhere else.
+    terms = q.split()
+    clauses = []
+    if backend == FTS5:
+        long_terms = [term for term in terms if len(term) >= FTS_MIN_TERM]
+        if long_terms:
+            match = literal_column("reservations_fts").op("MATCH")(" AND ".join(map(_fts_phrase, long_terms)))
+            clauses.append(Reservation.id.in_(select(reservations_fts.c.rowid).where(match)))
+        terms = [term for term in terms if len(term) < FTS_MIN_TERM]
+    for term in terms:
+        pattern = f"%{_escape_like(term)}%"
+        clauses.append(
+            or_(
+                Reservation.notes.ilike(pattern, escape="\\"),
+                Reservation.guest_contact.ilike(pattern, escape="\\"),
+            )
+        )
+    return clauses
+
+
+def search_reservations(
+    db: Session,
+    q: str | None = None,
+    name: str | None = None,
+    statuses: list[str] | None = None,
+    resource_id: int | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    limit: int | None = None,
+    after: tuple[datetime, int] | None = None,
+) -> list[Row]:
+    # Rows of the ReservationOut columns in list_reservations order, keyset paginated.
+    # On SQLite without FTS5 and on PostgreSQL without pg_trgm the text terms are LIKE scans.
+    conn = db.connection()
+    stmt = filter_reservations(select(*OUT_COLUMNS), resource_id, None, start, end, None)
+    if name:
+        stmt = stmt.where(name_prefix(name, conn.dialect.name))
+    if statuses:
+        stmt = stmt.where(Reservation.status.in_(statuses))
+    if q and q.strip():
+        stmt = stmt.where(*text_terms(q, search_backend(conn)))
+    return list(db.execute(keyset_page(stmt, limit, after)).all())
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from collections.abc import Iterable, Iterator
+from typing import Any, Literal
+
+from app.schemas.reservation import (
+    ReservationCreate,
+    ReservationImportError,
+    ReservationImportResult,
+)
+from app.services import reservation_service
+from app.services.reservation_service import CANCELLED
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+# Streaming import of reservation exports (GET /api/reservations/export) from another site or
+# a backup. The body is read chunk by chunk and decoded record by record; records are
+# validated as ReservationCreate and inserted batch_size at a time through
+# create_reservations_bulk, so each batch is checked for conflicts and committed on its own.
+# Memory holds one batch plus at most max_errors rejections, whatever the size of the file.
+
+ImportFormat = Literal["csv", "ndjson"]
+
+
+class ChunkReader(io.RawIOBase):
+    # A binary file over an iterable of byte chunks, such as a request body
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._pending = chunk
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def text_stream(chunks: Iterable[bytes]) -> io.TextIOWrapper:
+    # UTF-8 with or without a byte order mark; newline="" leaves line endings to csv
+    return io.TextIOWrapper(io.BufferedReader(ChunkReader(chunks)), encoding="utf-8-sig", newline="")
+
+
+def csv_records(text: io.TextIOBase) -> Iterator[tuple[int, dict[str, Any] | None, str | None]]:
+    # (line, record, error) per data row; empty cells are missing values. The line is the
+    # last physical line of the row, which differs from its first for quoted newlines.
+    reader = csv.DictReader(text)
+    for row in reader:
+        if None in row:
+            yield reader.line_num, None, "More cells than header columns"
+        else:
+            yield reader.line_num, {name: value for name, value in row.items() if value not in ("", None)}, None
+
+
+def ndjson_records(text: io.TextIOBase) -> Iterator[tuple[int, dict[str, Any] | None, str | None]]:
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f"Invalid JSON: {e}"
+            continue
+        if isinstance(record, dict):
+            yield line_number, record, None
+        else:
+            yield line_number, None, "Each line must be a JSON object"
+
+
+def validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" if item["loc"] else item["msg"]
+        for item in error.errors(include_url=False)
+    )
+
+
+def import_reservations(
+    db: Session,
+    chunks: Iterable[bytes],
+    input_format: ImportFormat = "ndjson",
+    batch_size: int = 1000,
+    max_errors: int = 1000,
+) -> ReservationImportResult:
+    # Columns of the export that ReservationCreate does not know (id, status) are ignored.
+    # Cancelled rows are skipped: importing them as active bookings would make them block
+    # the active rows they were replaced by.
+    result = ReservationImportResult()
+    batch: list[tuple[int, ReservationCreate]] = []
+
+    def reject(line: int, error: str) -> None:
+        result.rejected += 1
+        if len(result.errors) < max_errors:
+            result.errors.append(ReservationImportError(line=line, error=error))
+        else:
+            result.errors_truncated = True
+
+    def flush() -> None:
+        outcomes = reservation_service.create_reservations_bulk(db, [item for _, item in batch])
+        for (line, _), outcome in zip(batch, outcomes):
+            if outcome.accepted:
+                result.accepted += 1
+            else:
+                reject(line, outcome.error or "Rejected")
+        batch.clear()
+        # Rows of committed batches are not needed again
+        db.expunge_all()
+
+    text = text_stream(chunks)
+    records = csv_records(text) if input_format == "csv" else ndjson_records(text)
+    line = 0
+    try:
+        for line, record, error in records:
+            if error is not None:
+                reject(line, error)
+                continue
+            if record.get("status") == CANCELLED:
+                result.skipped += 1
+                continue
+            try:
+                batch.append((line, ReservationCreate.model_validate(record)))
+            except ValidationError as e:
+                reject(line, validation_error(e))
+                continue
+            if len(batch) >= batch_size:
+                flush()
+    except (UnicodeDecodeError, csv.Error) as e:
+        # The rest of the file cannot be read; what was read before still goes in
+        reject(line + 1, f"Unreadable {input_format}, import stopped here: {e}")
+    if batch:
+        flush()
+    return result
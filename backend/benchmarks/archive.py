@@ -0,0 +1,124 @@
+"""Hot-path latency with years of history in the live table vs after archiving it.
+
+Fills one database with ``--sizes`` past reservations spread over ``--resources`` resources
+plus a current week of bookings. It measures a conflict check, a current-week list and a
+list of an old week. It then moves the history to reservations_archive (archive_service)
+and measures the same calls again, now that the old week is read from both tables.
+
+    python -m benchmarks.archive --sizes 100000,1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from app.db.archive import archive
+from app.models.organization import Organization
+from app.models.reservation import Reservation
+from app.models.resource import Resource
+from app.services import archive_service, reservation_service
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from benchmarks.common import emit, measure, sqlite_engine
+
+RETENTION = timedelta(days=365)
+
+
+def populate(session: Session, size: int, resources: int, now: datetime, chunk: int = 50_000) -> list[int]:
+    org_id = session.execute(insert(Organization).values(name="Bench Org").returning(Organization.id)).scalar_one()
+    resource_ids = list(
+        session.execute(
+            insert(Resource).returning(Resource.id, sort_by_parameter_order=True),
+            [{"organization_id": org_id, "name": f"R{i}"} for i in range(resources)],
+        ).scalars()
+    )
+    # History ends two years ago, two hours per booking slot per resource
+    first = now - 2 * RETENTION - timedelta(hours=2 * size // resources)
+    for offset in range(0, size, chunk):
+        rows = []
+        for i in range(offset, min(size, offset + chunk)):
+            start = first + timedelta(hours=2 * (i // resources))
+            rows.append(
+                {
+                    "resource_id": resource_ids[i % resources],
+                    "start_time": start,
+                    "end_time": start + timedelta(hours=1),
+                    "status": "cancelled" if i % 10 == 0 else "confirmed",
+                }
+            )
+        session.execute(insert(Reservation), rows)
+    current = [
+        {
+            "resource_id": resource_id,
+            "start_time": now + timedelta(hours=hour),
+            "end_time": now + timedelta(hours=hour, minutes=45),
+        }
+        for resource_id in resource_ids
+        for hour in range(0, 24 * 7, 3)
+    ]
+    session.execute(insert(Reservation), current)
+    session.commit()
+    return resource_ids
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100000,1000000")
+    parser.add_argument("--resources", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    now = datetime.now(timezone.utc).replace(tzinfo=None, minute=0, second=0, microsecond=0)
+    archive.retention = RETENTION
+
+    for size in (int(s) for s in args.sizes.split(",")):
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = sqlite_engine(Path(tmp) / "bench.db")
+            with Session(engine, expire_on_commit=False) as session:
+                resource_ids = populate(session, size, args.resources, now)
+                resource_id = resource_ids[0]
+                old_week = now - 2 * RETENTION - timedelta(days=14)
+                calls = {
+                    "has_conflict": lambda: reservation_service.has_conflict(
+                        session, resource_id, now + timedelta(hours=1), now + timedelta(hours=2)
+                    ),
+                    "list_current_week": lambda: reservation_service.list_reservation_rows(
+                        session, resource_id=resource_id, start=now, end=now + timedelta(days=7)
+                    ),
+                    "list_old_week": lambda: reservation_service.list_reservation_rows(
+                        session, resource_id=resource_id, start=old_week, end=old_week + timedelta(days=7)
+                    ),
+                }
+                for phase in ("live", "archived"):
+                    if phase == "archived":
+                        started = time.perf_counter()
+                        moved = archive_service.archive_reservations(session, now - RETENTION)
+                        elapsed = time.perf_counter() - started
+                        emit(
+                            {
+                                "bench": "archive",
+                                "history": size,
+                                "op": "archive_run",
+                                "moved": moved,
+                                "rows_per_s": round(moved / elapsed),
+                            }
+                        )
+                    for name, fn in calls.items():
+                        emit(
+                            {
+                                "bench": "archive",
+                                "history": size,
+                                "phase": phase,
+                                "op": name,
+                                **measure(fn, repeat=args.repeat),
+                            }
+                        )
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
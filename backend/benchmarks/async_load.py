@@ -0,0 +1,129 @@
+"""Requests per second and p99 latency of the sync vs async database stacks.
+
+Starts uvicorn once per stack, seeds the database over HTTP and then drives a read-heavy
+mix at high concurrency with httpx. By default each stack gets a fresh SQLite file
+(``sqlite://`` vs ``sqlite+aiosqlite://``); point ``--sync-url``/``--async-url`` at
+PostgreSQL (``postgresql://`` vs ``postgresql+asyncpg://``) to compare on a networked DB.
+
+    python -m benchmarks.async_load --concurrency 200 --requests 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import httpx
+
+from benchmarks.common import emit
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+async def wait_ready(client: httpx.AsyncClient) -> None:
+    for _ in range(100):
+        try:
+            if (await client.get("/")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+async def seed(client: httpx.AsyncClient, resources: int, per_resource: int) -> list[int]:
+    org = (await client.post("/api/organizations/", json={"name": f"Load Org {time.time_ns()}"})).json()
+    base = datetime(2030, 1, 1, 8, 0)
+    for r in range(resources):
+        res = (await client.post("/api/resources/", json={"organization_id": org["id"], "name": f"R{r}"})).json()
+        items = [
+            {
+                "resource_id": res["id"],
+                "start_time": (base + timedelta(hours=i)).isoformat(),
+                "end_time": (base + timedelta(hours=i, minutes=50)).isoformat(),
+                "guest_last_name": f"Guest{i}",
+            }
+            for i in range(per_resource)
+        ]
+        await client.post("/api/reservations/bulk", json={"items": items})
+    return [row["id"] for row in (await client.get("/api/resources/", params={"organization_id": org["id"]})).json()]
+
+
+async def drive(client: httpx.AsyncClient, resource_ids: list[int], total: int, concurrency: int) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker() -> None:
+        nonlocal errors
+        for i in counter:
+            if i % 4 == 0:
+                url, params = "/api/reservations/", {"resource_id": random.choice(resource_ids), "limit": 50}
+            else:
+                url, params = f"/api/reservations/{random.randint(1, 1000)}", None
+            started = time.perf_counter()
+            resp = await client.get(url, params=params)
+            latencies.append(time.perf_counter() - started)
+            if resp.status_code >= 500:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "rps": round(total / elapsed),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99)] * 1000, 1),
+        "errors": errors,
+    }
+
+
+async def run_stack(name: str, url: str, port: int, args: argparse.Namespace) -> None:
+    env = {**os.environ, "DATABASE_URL": url}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+            await wait_ready(client)
+            resource_ids = await seed(client, resources=10, per_resource=100)
+            await drive(client, resource_ids, total=500, concurrency=20)  # warm-up
+            stats = await drive(client, resource_ids, total=args.requests, concurrency=args.concurrency)
+        emit({"bench": "async_load", "stack": name, "concurrency": args.concurrency, **stats})
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--sync-url", default=None)
+    parser.add_argument("--async-url", default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        stacks = (
+            ("sync", args.sync_url or f"sqlite:///{Path(tmp) / 'sync.db'}"),
+            ("async", args.async_url or f"sqlite+aiosqlite:///{Path(tmp) / 'async.db'}"),
+        )
+        for offset, (name, url) in enumerate(stacks):
+            asyncio.run(run_stack(name, url, args.port + offset, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Throughput of bulk reservation creation vs the per-row create path.
+
+    python -m benchmarks.bulk_create --sizes 1000,5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from app.models.organization import Organization
+from app.models.resource import Resource
+from app.schemas.reservation import ReservationCreate
+from app.services import reservation_service
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from benchmarks.common import emit, sqlite_engine
+
+
+def make_items(resource_ids: list[int], size: int) -> list[ReservationCreate]:
+    base = datetime(2030, 1, 1, 8, 0)
+    items = []
+    for i in range(size):
+        start = base + timedelta(hours=i // len(resource_ids))
+        # A few items overlap the previous booking on their resource, like a real import
+        if i % 17 == 16 and i >= len(resource_ids):
+            start -= timedelta(minutes=30)
+        items.append(
+            ReservationCreate(
+                resource_id=resource_ids[i % len(resource_ids)],
+                start_time=start,
+                end_time=start + timedelta(minutes=45),
+                guest_last_name=f"Guest{i}",
+            )
+        )
+    return items
+
+
+def per_row(session: Session, items: list[ReservationCreate]) -> int:
+    accepted = 0
+    for item in items:
+        try:
+            reservation_service.create_reservation(session, item)
+            accepted += 1
+        except ValueError:
+            pass
+    return accepted
+
+
+def bulk(session: Session, items: list[ReservationCreate]) -> int:
+    return sum(1 for r in reservation_service.create_reservations_bulk(session, items) if r.accepted)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,5000")
+    parser.add_argument("--resources", type=int, default=20)
+    args = parser.parse_args()
+
+    for size in (int(s) for s in args.sizes.split(",")):
+        for impl, fn in (("per_row", per_row), ("bulk", bulk)):
+            with tempfile.TemporaryDirectory() as tmp:
+                engine = sqlite_engine(Path(tmp) / "bench.db")
+                with Session(engine) as session:
+                    org_id = session.execute(
+                        insert(Organization).values(name="Bench Org").returning(Organization.id)
+                    ).scalar_one()
+                    resource_ids = list(
+                        session.execute(
+                            insert(Resource).returning(Resource.id, sort_by_parameter_order=True),
+                            [{"organization_id": org_id, "name": f"R{i}"} for i in range(args.resources)],
+                        ).scalars()
+                    )
+                    session.commit()
+                    items = make_items(resource_ids, size)
+                    started = time.perf_counter()
+                    accepted = fn(session, items)
+                    elapsed = time.perf_counter() - started
+                engine.dispose()
+            emit(
+                {
+                    "bench": "bulk_create",
+                    "items": size,
+                    "impl": impl,
+                    "accepted": accepted,
+                    "seconds": round(elapsed, 3),
+                    "items_per_s": round(size / elapsed),
+                }
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Helpers shared by the benchmark scripts.
+
+Run the scripts from the ``backend/`` folder, e.g. ``python -m benchmarks.conflict_check``.
+Every script prints one JSON object per measurement so runs can be diffed or plotted.
+"""
+
+from __future__ import annotations
+
+import json
+import statistics
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from app.db.database import Base
+from app.models import (  # noqa: F401
+    organization,
+    recurring_reservation,
+    reservation,
+    resource,
+    resource_daily_usage,
+    user,
+)
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+
+
+def sqlite_engine(path: Path) -> Engine:
+    engine = create_engine(f"sqlite:///{path}", future=True)
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def measure(fn: Callable[[], object], repeat: int = 200, warmup: int = 10) -> dict[str, float]:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1e6)
+    samples.sort()
+    return {
+        "mean_us": round(statistics.fmean(samples), 1),
+        "p50_us": round(samples[len(samples) // 2], 1),
+        "p99_us": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))], 1),
+    }
+
+
+def emit(record: dict) -> None:
+    print(json.dumps(record, default=str), flush=True)
@@ -0,0 +1,70 @@
+"""Compare two ``benchmarks.suite`` result files and flag regressions.
+
+Latencies (``p50_us``, ``p99_us``, ``p50_ms``, ``p99_ms``) regress when they grow and
+``rps`` when it drops, by more than ``--threshold`` (a fraction). Exits with status 1 when
+any scenario regressed, so it can gate CI.
+
+    python -m benchmarks.compare before.json after.json --threshold 0.10
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+LOWER_IS_BETTER = ("p50_us", "p99_us", "p50_ms", "p99_ms")
+HIGHER_IS_BETTER = ("rps",)
+
+
+def compare(base: dict, new: dict, threshold: float) -> list[dict]:
+    base_results = {r["name"]: r for r in base["results"]}
+    rows = []
+    for result in new["results"]:
+        before = base_results.get(result["name"])
+        if before is None:
+            continue
+        for metric in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+            if metric not in result or not before.get(metric):
+                continue
+            change = (result[metric] - before[metric]) / before[metric]
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            rows.append(
+                {
+                    "name": result["name"],
+                    "metric": metric,
+                    "base": before[metric],
+                    "new": result[metric],
+                    "change": change,
+                    "regressed": worse > threshold,
+                }
+            )
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base", type=Path)
+    parser.add_argument("new", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args()
+
+    base = json.loads(args.base.read_text())
+    new = json.loads(args.new.read_text())
+    if base["meta"].get("dataset") != new["meta"].get("dataset"):
+        print("warning: the runs used different datasets", file=sys.stderr)
+
+    rows = compare(base, new, args.threshold)
+    print(f"{'scenario':<28} {'metric':<8} {'base':>12} {'new':>12} {'change':>8}")
+    for row in rows:
+        flag = "  REGRESSED" if row["regressed"] else ""
+        print(
+            f"{row['name']:<28} {row['metric']:<8} {row['base']:>12} {row['new']:>12} "
+            f"{row['change']:>+8.1%}{flag}"
+        )
+    sys.exit(1 if any(row["regressed"] for row in rows) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Conflict-check latency as a resource's reservation history grows.
+
+Compares ``reservation_service.has_conflict`` with the previous full-slice query
+(``select(Reservation)`` filtered by resource and overlap) on the same database.
+
+    python -m benchmarks.conflict_check --sizes 1000,10000,100000,1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from app.models.organization import Organization
+from app.models.reservation import Reservation
+from app.models.resource import Resource
+from app.services import reservation_service
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from benchmarks.common import emit, measure, sqlite_engine
+
+BASE = datetime(2020, 1, 1, 8, 0)
+SLOT = timedelta(minutes=90)
+LENGTH = timedelta(hours=1)
+
+
+def legacy_has_conflict(db: Session, resource_id: int, start: datetime, end: datetime) -> bool:
+    stmt = select(Reservation).where(
+        Reservation.resource_id == resource_id,
+        Reservation.start_time < end,
+        Reservation.end_time > start,
+    )
+    return db.execute(stmt).scalars().first() is not None
+
+
+def populate(session: Session, size: int, chunk: int = 50_000) -> int:
+    org_id = session.execute(insert(Organization).values(name="Bench Org").returning(Organization.id)).scalar_one()
+    resource_id = session.execute(
+        insert(Resource).values(organization_id=org_id, name="Busy room").returning(Resource.id)
+    ).scalar_one()
+    for offset in range(0, size, chunk):
+        rows = []
+        for i in range(offset, min(size, offset + chunk)):
+            start = BASE + i * SLOT
+            # Every tenth booking was cancelled; those must neither block nor slow the probe.
+            rows.append(
+                {
+                    "resource_id": resource_id,
+                    "start_time": start,
+                    "end_time": start + LENGTH,
+                    "status": "cancelled" if i % 10 == 0 else "confirmed",
+                }
+            )
+        session.execute(insert(Reservation), rows)
+    session.commit()
+    return resource_id
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    for size in (int(s) for s in args.sizes.split(",")):
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = sqlite_engine(Path(tmp) / "bench.db")
+            with Session(engine) as session:
+                resource_id = populate(session, size)
+                last = BASE + (size - 1) * SLOT
+                probes = {
+                    # Free slot after the whole history: worst case for a range scan
+                    "free_future": (last + timedelta(days=1), last + timedelta(days=1, hours=1)),
+                    # Overlaps the most recent booking
+                    "conflict_recent": (last + timedelta(minutes=30), last + timedelta(hours=2)),
+                    # Gap between two bookings deep in the history
+                    "free_gap_early": (BASE + SLOT * 5 + LENGTH, BASE + SLOT * 6),
+                }
+                for probe, (start, end) in probes.items():
+                    for impl, fn in (
+                        ("has_conflict", reservation_service.has_conflict),
+                        ("legacy_scan", legacy_has_conflict),
+                    ):
+                        stats = measure(lambda: fn(session, resource_id, start, end), repeat=args.repeat)
+                        emit({"bench": "conflict_check", "rows": size, "probe": probe, "impl": impl, **stats})
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
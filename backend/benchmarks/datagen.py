@@ -0,0 +1,202 @@
+"""Synthetic dataset for the benchmark suite.
+
+Creates organizations, resources and reservations with a realistic shape:
+
+- bookings cluster in opening hours (08:00-22:00), with exponential gaps between them;
+- durations come from a weighted menu (30 min - 3 h);
+- resource popularity and guest surnames follow Zipf-like skews;
+- a share of bookings is cancelled, and some cancelled bookings overlap the active booking
+  that replaced them.
+
+Active reservations of a resource never overlap, as the API guarantees. The same seed
+always produces the same rows.
+
+    python -m benchmarks.datagen --reservations 1000000 --out /tmp/bench.db
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from app.models.organization import Organization
+from app.models.reservation import Reservation
+from app.models.resource import Resource
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from benchmarks.common import emit, sqlite_engine
+
+OPENING_HOUR = 8
+CLOSING_HOUR = 22
+DURATIONS = ((30, 3), (45, 2), (60, 6), (90, 4), (120, 3), (180, 1))  # minutes, weight
+RESOURCE_TYPES = ("table", "room", "court", "desk")
+SURNAMES = tuple(
+    f"{stem}{suffix}"
+    for stem in ("Smith", "Garcia", "Nguyen", "Khan", "Muller", "Rossi", "Silva", "Kowalski", "Tanaka", "Okafor")
+    for suffix in ("", "son", "ova", "ez", "i", "ski", "berg", "man", "ley", "er")
+)
+INSERT_CHUNK = 50_000
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    organizations: int = 10
+    resources_per_org: int = 20
+    reservations: int = 100_000
+    cancelled_ratio: float = 0.08
+    mean_gap_minutes: float = 90.0
+    start: datetime = datetime(2024, 1, 1)
+    seed: int = 42
+
+
+@dataclass
+class Dataset:
+    spec: DatasetSpec
+    resource_ids: list[int]
+    busiest_resource_id: int
+    reservation_ids: range
+    span_start: datetime
+    span_end: datetime
+
+
+def _zipf_weights(n: int, skew: float) -> list[float]:
+    return [1 / (rank**skew) for rank in range(1, n + 1)]
+
+
+def _timeline(rng: random.Random, spec: DatasetSpec, count: int):
+    # Yields (start, end, cancelled) for one resource in start order
+    durations = [timedelta(minutes=m) for m, _ in DURATIONS]
+    weights = [w for _, w in DURATIONS]
+    quarter = timedelta(minutes=15)
+    cursor = spec.start + timedelta(hours=OPENING_HOUR)
+    for _ in range(count):
+        cursor += timedelta(minutes=rng.expovariate(1 / spec.mean_gap_minutes))
+        cursor = spec.start + -(-(cursor - spec.start) // quarter) * quarter  # round up to 15 min
+        duration = rng.choices(durations, weights)[0]
+        if cursor.hour < OPENING_HOUR:
+            cursor = cursor.replace(hour=OPENING_HOUR, minute=0)
+        elif (cursor + duration).hour >= CLOSING_HOUR or (cursor + duration).date() != cursor.date():
+            cursor = (cursor + timedelta(days=1)).replace(hour=OPENING_HOUR, minute=0)
+        if rng.random() < spec.cancelled_ratio:
+            # Cancelled and rebooked: the cancelled row overlaps the active booking that follows
+            yield cursor, cursor + duration, True
+            cursor += duration / 2
+        else:
+            yield cursor, cursor + duration, False
+            cursor += duration
+
+
+def generate(engine: Engine, spec: DatasetSpec) -> Dataset:
+    rng = random.Random(spec.seed)
+    with Session(engine) as session:
+        org_ids = list(
+            session.execute(
+                insert(Organization).returning(Organization.id, sort_by_parameter_order=True),
+                [{"name": f"Org {i}"} for i in range(spec.organizations)],
+            ).scalars()
+        )
+        resource_ids = list(
+            session.execute(
+                insert(Resource).returning(Resource.id, sort_by_parameter_order=True),
+                [
+                    {
+                        "organization_id": org_id,
+                        "name": f"{RESOURCE_TYPES[r % len(RESOURCE_TYPES)].title()} {r}",
+                        "type": RESOURCE_TYPES[r % len(RESOURCE_TYPES)],
+                        "capacity": rng.choice((2, 4, 6, 8, 12)),
+                    }
+                    for org_id in org_ids
+                    for r in range(spec.resources_per_org)
+                ],
+            ).scalars()
+        )
+
+        # Busy resources get most of the bookings
+        weights = _zipf_weights(len(resource_ids), 0.8)
+        total = sum(weights)
+        counts = [int(spec.reservations * w / total) for w in weights]
+        counts[0] += spec.reservations - sum(counts)
+        surname_weights = _zipf_weights(len(SURNAMES), 1.1)
+
+        span_end = spec.start
+        first_id = None
+        rows: list[dict] = []
+
+        def flush() -> None:
+            nonlocal first_id
+            ids = session.execute(
+                insert(Reservation).returning(Reservation.id, sort_by_parameter_order=True), rows
+            ).scalars().all()
+            if first_id is None and ids:
+                first_id = ids[0]
+            rows.clear()
+
+        for resource_id, count in zip(resource_ids, counts):
+            for start, end, cancelled in _timeline(rng, spec, count):
+                rows.append(
+                    {
+                        "resource_id": resource_id,
+                        "start_time": start,
+                        "end_time": end,
+                        "status": "cancelled" if cancelled else "confirmed",
+                        "guest_last_name": rng.choices(SURNAMES, surname_weights)[0],
+                    }
+                )
+                span_end = max(span_end, end)
+                if len(rows) == INSERT_CHUNK:
+                    flush()
+        if rows:
+            flush()
+        session.commit()
+
+    first_id = first_id or 1
+    return Dataset(
+        spec=spec,
+        resource_ids=resource_ids,
+        busiest_resource_id=resource_ids[0],
+        reservation_ids=range(first_id, first_id + spec.reservations),
+        span_start=spec.start,
+        span_end=span_end,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reservations", type=int, default=DatasetSpec.reservations)
+    parser.add_argument("--organizations", type=int, default=DatasetSpec.organizations)
+    parser.add_argument("--resources-per-org", type=int, default=DatasetSpec.resources_per_org)
+    parser.add_argument("--seed", type=int, default=DatasetSpec.seed)
+    parser.add_argument("--out", type=Path, required=True, help="SQLite file to create")
+    args = parser.parse_args()
+    if args.out.exists():
+        parser.error(f"{args.out} already exists")
+
+    spec = DatasetSpec(
+        organizations=args.organizations,
+        resources_per_org=args.resources_per_org,
+        reservations=args.reservations,
+        seed=args.seed,
+    )
+    engine = sqlite_engine(args.out)
+    started = time.perf_counter()
+    dataset = generate(engine, spec)
+    engine.dispose()
+    emit(
+        {
+            "bench": "datagen",
+            **asdict(spec),
+            "resources": len(dataset.resource_ids),
+            "span_end": dataset.span_end,
+            "seconds": round(time.perf_counter() - started, 1),
+        }
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Retried writes with and without an Idempotency-Key, and the key store's footprint.
+
+Through the real app on a resource with ``--history`` bookings, times a first
+``POST /api/reservations/`` with a fresh key, its retry with the same key (replayed from
+the store) and the same retry without a key (conflict check, then 400). Does the same for
+100-item ``POST /api/reservations/bulk`` requests, counts SQL statements per request, and
+measures the in-process store's memory per kept response.
+
+    python -m benchmarks.idempotency --history 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import tempfile
+import tracemalloc
+from datetime import timedelta
+from pathlib import Path
+
+from app.core.idempotency import MemoryIdempotencyStore, StoredResponse
+from app.db.database import get_db
+from app.main import app
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+from starlette.testclient import TestClient
+
+from benchmarks.common import emit, measure, sqlite_engine
+from benchmarks.conflict_check import BASE, SLOT, populate
+
+BULK_ITEMS = 100
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--history", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--keys", type=int, default=10_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = sqlite_engine(Path(tmp) / "bench.db")
+        factory = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+        with factory() as session:
+            resource_id = populate(session, args.history)
+        statements = 0
+
+        def count(conn, cursor, statement, parameters, context, executemany):
+            nonlocal statements
+            statements += 1
+
+        def override_get_db():
+            with factory() as session:
+                yield session
+
+        app.dependency_overrides[get_db] = override_get_db
+        event.listen(engine, "before_cursor_execute", count)
+        slots = itertools.count()
+        keys = itertools.count()
+
+        def booking() -> dict:
+            # Free slots after the history, so first requests are accepted
+            start = BASE + SLOT * args.history + timedelta(hours=2 * next(slots))
+            return {
+                "resource_id": resource_id,
+                "start_time": start.isoformat(),
+                "end_time": (start + timedelta(hours=1)).isoformat(),
+            }
+
+        with TestClient(app) as client:
+            for op, path, payload in (
+                ("create", "/api/reservations/", lambda: booking()),
+                ("bulk", "/api/reservations/bulk", lambda: {"items": [booking() for _ in range(BULK_ITEMS)]}),
+            ):
+                last: dict = {}
+
+                def first() -> None:
+                    last["key"], last["body"] = str(next(keys)), payload()
+                    client.post(path, json=last["body"], headers={"Idempotency-Key": last["key"]})
+
+                def replay() -> None:
+                    client.post(path, json=last["body"], headers={"Idempotency-Key": last["key"]})
+
+                def unkeyed() -> None:
+                    client.post(path, json=last["body"])
+
+                for impl, fn in (("first", first), ("replay", replay), ("retry_without_key", unkeyed)):
+                    statements = 0
+                    timings = measure(fn, repeat=args.repeat)
+                    calls = args.repeat + 10
+                    emit(
+                        {
+                            "bench": "idempotency",
+                            "op": op,
+                            "impl": impl,
+                            "history": args.history,
+                            "statements_per_request": round(statements / calls, 1),
+                            **timings,
+                        }
+                    )
+        event.remove(engine, "before_cursor_execute", count)
+        app.dependency_overrides.pop(get_db, None)
+        engine.dispose()
+
+    # A typical ReservationOut body
+    body = (
+        b'{"resource_id":1,"user_id":null,"start_time":"2034-03-01T09:00:00","end_time":"2034-03-01T10:00:00",'
+        b'"status":"confirmed","notes":null,"guest_last_name":"Smith","guest_first_name":"Ann",'
+        b'"guest_contact":null,"id":123456,"created_at":"2025-10-17T09:00:00","updated_at":"2025-10-17T09:00:00"}'
+    )
+    tracemalloc.start()
+    store = MemoryIdempotencyStore(max_entries=args.keys)
+    for i in range(args.keys):
+        key = f"{i:08d}-retry-key-from-a-mobile-client"
+        fingerprint = bytes(16)
+        store.begin(key, fingerprint)
+        # A distinct body per key, as real responses are
+        store.finish(key, fingerprint, StoredResponse(201, body.replace(b"123456", b"%06d" % i)))
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    emit(
+        {
+            "bench": "idempotency",
+            "op": "store_memory",
+            "keys": args.keys,
+            "body_bytes": len(body),
+            "bytes_per_key": round(size / args.keys),
+        }
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Peak memory of listing every reservation: full list vs NDJSON streaming.
+
+The list path materialises all rows and their ``ReservationOut`` models at once; the
+streaming path reads from a server-side cursor and serializes chunk by chunk.
+
+    python -m benchmarks.list_memory --sizes 10000,100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from app.api.reservations import _ndjson_lines
+from app.models.organization import Organization
+from app.models.reservation import Reservation
+from app.models.resource import Resource
+from app.schemas.reservation import ReservationOut
+from app.services import reservation_service
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from benchmarks.common import emit, sqlite_engine
+
+
+def populate(session: Session, size: int) -> None:
+    org_id = session.execute(insert(Organization).values(name="Bench Org").returning(Organization.id)).scalar_one()
+    resource_id = session.execute(
+        insert(Resource).values(organization_id=org_id, name="Room").returning(Resource.id)
+    ).scalar_one()
+    base = datetime(2024, 1, 1)
+    rows = [
+        {
+            "resource_id": resource_id,
+            "start_time": base + timedelta(hours=i),
+            "end_time": base + timedelta(hours=i, minutes=45),
+            "status": "confirmed",
+            "guest_last_name": f"Guest{i}",
+            "notes": "x" * 80,
+        }
+        for i in range(size)
+    ]
+    session.execute(insert(Reservation), rows)
+    session.commit()
+
+
+def full_list(session: Session) -> int:
+    rows = reservation_service.list_reservations(session)
+    return len([ReservationOut.model_validate(r).model_dump_json() for r in rows])
+
+
+def streamed(session: Session) -> int:
+    return sum(len(chunk) for chunk in _ndjson_lines(reservation_service.iter_reservations(session)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000")
+    args = parser.parse_args()
+
+    for size in (int(s) for s in args.sizes.split(",")):
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = sqlite_engine(Path(tmp) / "bench.db")
+            with Session(engine) as session:
+                populate(session, size)
+            for impl, fn in (("list", full_list), ("ndjson_stream", streamed)):
+                with Session(engine) as session:
+                    tracemalloc.start()
+                    started = time.perf_counter()
+                    fn(session)
+                    elapsed = time.perf_counter() - started
+                    _, peak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                emit(
+                    {
+                        "bench": "list_memory",
+                        "rows": size,
+                        "impl": impl,
+                        "peak_mib": round(peak / 2**20, 1),
+                        "seconds": round(elapsed, 3),
+                    }
+                )
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Reservation list responses: response_model validation vs plain rows and pydantic-core.
+
+On a ``datagen`` dataset, fetches 100 to 10,000 reservations through the real
+``GET /api/reservations/`` (columns selected as plain rows, serialized by ``dump_json``
+against a TypedDict mirror of ``ReservationOut``) and through the same query behind a
+``response_model=list[ReservationOut]`` route returning ORM objects, as the endpoint did
+before. Also times serialization alone, and reports CPU time per request next to latency.
+
+    python -m benchmarks.list_serialization --reservations 100000 --sizes 100,1000,10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from app.api.conditional import json_body
+from app.db.database import get_db
+from app.main import app
+from app.schemas.reservation import ReservationOut
+from app.schemas.rows import rows_json
+from app.services import reservation_service
+from fastapi import Depends, FastAPI
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.testclient import TestClient
+
+from benchmarks.common import emit, measure, sqlite_engine
+from benchmarks.datagen import DatasetSpec, generate
+
+baseline = FastAPI()
+
+
+@baseline.get("/api/reservations/", response_model=list[ReservationOut])
+def list_with_response_model(end: datetime, db: Session = Depends(get_db)):
+    return reservation_service.list_reservations(db, end=end)
+
+
+def timed(fn, repeat: int) -> dict:
+    cpu_started = time.process_time()
+    stats = measure(fn, repeat=repeat, warmup=2)
+    # measure() runs fn warmup + repeat times
+    stats["cpu_us"] = round((time.process_time() - cpu_started) / (repeat + 2) * 1e6, 1)
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reservations", type=int, default=100_000)
+    parser.add_argument("--sizes", default="100,1000,10000")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = sqlite_engine(Path(tmp) / "bench.db")
+        generate(engine, DatasetSpec(reservations=args.reservations))
+        factory = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+        def override_get_db():
+            with factory() as session:
+                yield session
+
+        for target in (app, baseline):
+            target.dependency_overrides[get_db] = override_get_db
+        with TestClient(app) as fast, TestClient(baseline) as slow, factory() as session:
+            for size in map(int, args.sizes.split(",")):
+                # An `end` that leaves about `size` rows (pages are capped at 1,000 rows)
+                end = reservation_service.list_reservation_rows(session, limit=size + 1)[-1].start_time
+                params = {"end": end.isoformat()}
+                size = len(reservation_service.list_reservation_rows(session, end=end))
+                assert fast.get("/api/reservations/", params=params).content == slow.get(
+                    "/api/reservations/", params=params
+                ).content
+                for case, client in (("response_model", slow), ("rows_dump_json", fast)):
+                    stats = timed(lambda: client.get("/api/reservations/", params=params), args.repeat)
+                    emit({"bench": "list_serialization", "case": f"http/{case}", "rows": size, **stats})
+
+                # Serialization alone, rows already fetched
+                objects = reservation_service.list_reservations(session, limit=size)
+                rows = reservation_service.list_reservation_rows(session, limit=size)
+                serializers = {
+                    "response_model": lambda: json_body(
+                        [ReservationOut.model_validate(obj).model_dump(mode="json") for obj in objects]
+                    ),
+                    "rows_dump_json": lambda: rows_json(ReservationOut, rows),
+                }
+                for case, fn in serializers.items():
+                    stats = timed(fn, args.repeat)
+                    emit({"bench": "list_serialization", "case": f"serialize/{case}", "rows": size, **stats})
+                session.expunge_all()
+        for target in (app, baseline):
+            target.dependency_overrides.pop(get_db, None)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Standing weekly bookings stored as materialised rows vs as one recurrence rule.
+
+For each number of weeks, the same Monday and Thursday 18:00 booking is stored either as
+one reservation row per occurrence or as a single ``RecurringReservation``. Reports table
+rows and the latency of ``has_conflict``, one-day ``free_intervals`` and a week of
+``list_reservations`` / ``list_occurrences`` at the far end of the series.
+
+    python -m benchmarks.recurring --weeks 52,520,5200
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from app.models.organization import Organization
+from app.models.recurring_reservation import RecurringReservation
+from app.models.reservation import Reservation
+from app.models.resource import Resource
+from app.services import availability_service, recurring_service, reservation_service
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from benchmarks.common import emit, measure, sqlite_engine
+
+FIRST = datetime(2020, 1, 6, 18, 0)  # a Monday
+LENGTH = timedelta(hours=2)
+
+
+def populate(session: Session, weeks: int, storage: str) -> int:
+    org_id = session.execute(insert(Organization).values(name="Bench Org").returning(Organization.id)).scalar_one()
+    resource_id = session.execute(
+        insert(Resource).values(organization_id=org_id, name="Pitch").returning(Resource.id)
+    ).scalar_one()
+    if storage == "rows":
+        starts = [FIRST + timedelta(weeks=w, days=d) for w in range(weeks) for d in (0, 3)]
+        session.execute(
+            insert(Reservation),
+            [{"resource_id": resource_id, "start_time": s, "end_time": s + LENGTH} for s in starts],
+        )
+    else:
+        session.execute(
+            insert(RecurringReservation).values(
+                resource_id=resource_id,
+                start_time=FIRST,
+                end_time=FIRST + LENGTH,
+                freq="weekly",
+                interval=1,
+                weekdays="0,3",
+                until=FIRST + timedelta(weeks=weeks - 1, days=3),
+            )
+        )
+    session.commit()
+    return resource_id
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--weeks", default="52,520,5200")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    for weeks in (int(w) for w in args.weeks.split(",")):
+        for storage in ("rows", "rule"):
+            with tempfile.TemporaryDirectory() as tmp:
+                engine = sqlite_engine(Path(tmp) / "bench.db")
+                with Session(engine) as session:
+                    resource_id = populate(session, weeks, storage)
+                    stored = session.execute(
+                        select(func.count(Reservation.id) + func.count(RecurringReservation.id.distinct()))
+                        .select_from(Resource)
+                        .outerjoin(Reservation, Reservation.resource_id == Resource.id)
+                        .outerjoin(RecurringReservation, RecurringReservation.resource_id == Resource.id)
+                    ).scalar_one()
+                    monday = FIRST + timedelta(weeks=weeks - 1)
+                    week = (monday.replace(hour=0), monday.replace(hour=0) + timedelta(days=7))
+                    cases = {
+                        "has_conflict": lambda: reservation_service.has_conflict(
+                            session, resource_id, monday + timedelta(hours=1), monday + timedelta(hours=3)
+                        ),
+                        "free_intervals_day": lambda: availability_service.free_intervals(
+                            session, resource_id, monday.replace(hour=0), monday.replace(hour=23)
+                        ),
+                        "week_listing": (
+                            (lambda: reservation_service.list_reservations(session, resource_id, None, *week))
+                            if storage == "rows"
+                            else (lambda: recurring_service.list_occurrences(session, *week, resource_id))
+                        ),
+                    }
+                    for op, fn in cases.items():
+                        stats = measure(fn, repeat=args.repeat)
+                        emit(
+                            {
+                                "bench": "recurring",
+                                "weeks": weeks,
+                                "storage": storage,
+                                "stored_rows": stored,
+                                "op": op,
+                                **stats,
+                            }
+                        )
+                engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Utilization report over a year: aggregating in Python vs in SQL vs from the daily rollup.
+
+On a ``datagen`` dataset, builds the per-resource daily report for the first year three
+ways: fetching every reservation and summing in Python (what clients did through
+``GET /api/reservations``), ``report_service.utilization`` computed live, and the same
+read from the trigger-maintained rollup; then the per-organization weekly dashboard shape.
+Also reports the cost the triggers add to writes.
+
+    python -m benchmarks.reports --reservations 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+from collections import defaultdict
+from datetime import date, timedelta
+from pathlib import Path
+
+from app.db.rollup import install_usage_rollup, remove_usage_rollup
+from app.schemas.reservation import ReservationUpdate
+from app.services import report_service, reservation_service
+from sqlalchemy.orm import Session
+
+from benchmarks.common import emit, measure, sqlite_engine
+from benchmarks.datagen import DatasetSpec, generate
+
+
+def python_report(session: Session, start: date, end: date) -> dict:
+    totals: dict[tuple[int, date], list[float]] = defaultdict(lambda: [0, 0, 0.0])
+    for r in reservation_service.list_reservations(session, start=start, end=end):
+        row = totals[r.resource_id, r.start_time.date()]
+        row[0] += 1
+        if r.status == "cancelled":
+            row[1] += 1
+        else:
+            row[2] += (r.end_time - r.start_time).total_seconds() / 3600
+    return totals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reservations", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = sqlite_engine(Path(tmp) / "bench.db")
+        dataset = generate(engine, DatasetSpec(reservations=args.reservations))
+        start = dataset.span_start.date()
+        end = start + timedelta(days=365)
+        shapes = {"resource_day": ("day", "resource"), "organization_week": ("week", "organization")}
+        with Session(engine, expire_on_commit=False) as session:
+
+            def report(shape: str, **kwargs):
+                granularity, group_by = shapes[shape]
+                return lambda: report_service.utilization(session, start, end, granularity, group_by, **kwargs)
+
+            def run(case: str, fn, repeat: int = args.repeat) -> None:
+                session.expunge_all()
+                emit({"bench": "reports", "case": case, **measure(fn, repeat=repeat, warmup=1)})
+
+            run("python_aggregation/resource_day", lambda: python_report(session, start, end))
+            for shape in shapes:
+                run(f"sql_live/{shape}", report(shape, peak=False))
+            run("sql_live_with_peak/organization_week", report("organization_week"))
+
+            ids = iter(dataset.reservation_ids)
+            cancel = ReservationUpdate(status="cancelled")
+
+            def write() -> None:
+                reservation_service.update_reservation_by_id(session, next(ids), cancel)
+
+            run("write_without_rollup", write, repeat=200)
+            install_usage_rollup(engine)
+            for shape in shapes:
+                run(f"sql_rollup/{shape}", report(shape, use_rollup=True, peak=False), repeat=args.repeat * 4)
+            run("write_with_rollup", write, repeat=200)
+            with engine.begin() as conn:
+                remove_usage_rollup(conn)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
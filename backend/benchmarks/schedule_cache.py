@@ -0,0 +1,91 @@
+"""Conflict and availability checks with and without the in-process schedule cache.
+
+One resource holds ``--per-day`` bookings a day over the cache horizon (plus a weekly
+recurring rule). Measures ``has_conflict`` and a one-day ``free_intervals`` reading the
+database, from the cache checked against the database version on every call
+(``SCHEDULE_CACHE_REVALIDATE_SECONDS=0``), and from the cache within the revalidation
+interval.
+
+    python -m benchmarks.schedule_cache --per-day 8,48
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from app.db.schedule import install_schedule_versions
+from app.models.organization import Organization
+from app.models.recurring_reservation import RecurringReservation
+from app.models.reservation import Reservation
+from app.models.resource import Resource
+from app.services import availability_service, reservation_service
+from app.services.schedule_cache import schedules
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from benchmarks.common import emit, measure, sqlite_engine
+
+DAYS = 30
+# (name, SCHEDULE_CACHE, SCHEDULE_CACHE_REVALIDATE_SECONDS)
+MODES = (("database", False, 0.0), ("cache_checked", True, 0.0), ("cache", True, 60.0))
+
+
+def populate(session: Session, per_day: int, first: datetime) -> int:
+    org_id = session.execute(insert(Organization).values(name="Bench Org").returning(Organization.id)).scalar_one()
+    resource_id = session.execute(
+        insert(Resource).values(organization_id=org_id, name="Studio").returning(Resource.id)
+    ).scalar_one()
+    length = timedelta(days=1) / per_day / 2
+    session.execute(
+        insert(Reservation),
+        [
+            {"resource_id": resource_id, "start_time": start, "end_time": start + length}
+            for day in range(DAYS)
+            for start in (first + timedelta(days=day) + 2 * length * i for i in range(per_day))
+        ],
+    )
+    session.execute(
+        insert(RecurringReservation).values(
+            resource_id=resource_id,
+            start_time=first + timedelta(hours=23, minutes=30),
+            end_time=first + timedelta(hours=23, minutes=45),
+            freq="weekly",
+            interval=1,
+        )
+    )
+    session.commit()
+    return resource_id
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--per-day", default="8,48")
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    first = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    probe_start = first + timedelta(days=DAYS // 2, minutes=5)
+    probe = (probe_start, probe_start + timedelta(minutes=20))
+    day = (first + timedelta(days=DAYS // 2), first + timedelta(days=DAYS // 2 + 1))
+    for per_day in (int(n) for n in args.per_day.split(",")):
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = sqlite_engine(Path(tmp) / "bench.db")
+            install_schedule_versions(engine)
+            with Session(engine) as session:
+                resource_id = populate(session, per_day, first)
+                for mode, enabled, revalidate in MODES:
+                    schedules.enabled, schedules.revalidate_seconds = enabled, revalidate
+                    schedules.clear()
+                    record = {"bench": "schedule_cache", "per_day": per_day, "mode": mode}
+                    stats = measure(lambda: reservation_service.has_conflict(session, resource_id, *probe), args.repeat)
+                    emit({**record, "op": "has_conflict", **stats})
+                    stats = measure(lambda: availability_service.free_intervals(session, resource_id, *day), args.repeat)
+                    emit({**record, "op": "free_intervals_day", **stats})
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
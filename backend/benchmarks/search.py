@@ -0,0 +1,88 @@
+"""Reservation search: LIKE scans vs the FTS5 trigram index, and the index's write cost.
+
+On a ``datagen`` dataset whose reservations are given notes and guest contacts, times
+``search_service.search_reservations`` for common and rare words, contact fragments and
+last name prefixes (first page of 50, sorted by start time), first with the LIKE fallback
+and then with the FTS5 index installed. Also times note edits with and without the index
+triggers.
+
+    python -m benchmarks.search --reservations 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+from pathlib import Path
+
+from app.db.search import install_search_index, remove_search_index
+from app.models.reservation import Reservation
+from app.schemas.reservation import ReservationUpdate
+from app.services import reservation_service, search_service
+from sqlalchemy import bindparam, update
+from sqlalchemy.orm import Session
+
+from benchmarks.common import emit, measure, sqlite_engine
+from benchmarks.datagen import DatasetSpec, generate
+
+WORDS = (
+    "window", "terrace", "quiet", "birthday", "anniversary", "highchair", "wheelchair", "vegan",
+    "gluten", "allergy", "late", "arrival", "corner", "booth", "business", "dinner", "lunch",
+)
+RARE_WORD = "saxophone"
+CASES = {
+    "common_word": {"q": "window"},
+    "two_words": {"q": "quiet corner"},
+    "rare_word": {"q": RARE_WORD},
+    "contact_fragment": {"q": "4217"},
+    "name_prefix": {"name": "kowal"},
+    "name_prefix_and_word": {"name": "smith", "q": "vegan"},
+}
+
+
+def add_text(engine, dataset, rng: random.Random) -> None:
+    # Notes on about half the rows, a phone number or email on every row
+    rows = []
+    for reservation_id in dataset.reservation_ids:
+        notes = " ".join(rng.sample(WORDS, 3)) if rng.random() < 0.5 else None
+        if rng.random() < 0.0005:
+            notes = f"{notes or ''} bring the {RARE_WORD}".strip()
+        contact = f"+1 555 {rng.randrange(10_000):04d}" if rng.random() < 0.6 else f"guest{reservation_id}@example.test"
+        rows.append({"row_id": reservation_id, "notes": notes, "guest_contact": contact})
+    stmt = update(Reservation.__table__).where(Reservation.__table__.c.id == bindparam("row_id"))
+    with engine.begin() as conn:
+        conn.execute(stmt, rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reservations", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = sqlite_engine(Path(tmp) / "bench.db")
+        dataset = generate(engine, DatasetSpec(reservations=args.reservations))
+        add_text(engine, dataset, random.Random(7))
+        with Session(engine, expire_on_commit=False) as session:
+            ids = iter(dataset.reservation_ids)
+
+            def write() -> None:
+                reservation_service.update_reservation_by_id(session, next(ids), ReservationUpdate(notes="late arrival"))
+
+            for backend in ("like", "fts5"):
+                if backend == "fts5":
+                    install_search_index(engine)
+                for case, params in CASES.items():
+                    found = len(search_service.search_reservations(session, **params, limit=50))
+                    stats = measure(lambda: search_service.search_reservations(session, **params, limit=50), repeat=args.repeat, warmup=1)
+                    emit({"bench": "search", "backend": backend, "case": case, "rows": found, **stats})
+                emit({"bench": "search", "backend": backend, "case": "note_edit", **measure(write, repeat=200)})
+            with engine.begin() as conn:
+                remove_search_index(conn)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Admission checks on a shared resource as the bookings overlapping one window grow.
+
+A hall takes ``capacity`` parallel bookings; each window holds that many staggered
+bookings, one place short of full. Compares ``has_conflict`` (peak occupancy as a running
+sum in SQL), the same check with a recurring rule on the resource (sweep in Python over
+the window's rows and occurrences), and counting overlaps pairwise in Python.
+
+    python -m benchmarks.shared_capacity --overlaps 10,100,500,1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from app.models.organization import Organization
+from app.models.recurring_reservation import RecurringReservation
+from app.models.reservation import Reservation
+from app.models.resource import Resource
+from app.services import reservation_service
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from benchmarks.common import emit, measure, sqlite_engine
+
+DAY = datetime(2030, 1, 1, 8, 0)
+LENGTH = timedelta(hours=4)
+
+
+def pairwise_peak(db: Session, resource_id: int, start: datetime, end: datetime) -> int:
+    # Occupancy at each booking's start, counted against every other booking in the window
+    rows = db.execute(
+        select(Reservation.start_time, Reservation.end_time).where(
+            Reservation.resource_id == resource_id,
+            Reservation.start_time < end,
+            Reservation.end_time > start,
+            Reservation.status.is_distinct_from(reservation_service.CANCELLED),
+        )
+    ).all()
+    points = [max(row.start_time, start) for row in rows]
+    return max((sum(1 for other in rows if other.start_time <= at < other.end_time) for at in points), default=0)
+
+
+def populate(session: Session, overlaps: int, days: int) -> int:
+    org_id = session.execute(insert(Organization).values(name="Bench Org").returning(Organization.id)).scalar_one()
+    resource_id = session.execute(
+        insert(Resource).values(organization_id=org_id, name="Hall", capacity=overlaps + 1, shared=True).returning(
+            Resource.id
+        )
+    ).scalar_one()
+    rows = []
+    for day in range(days):
+        for i in range(overlaps):
+            start = DAY + timedelta(days=day, minutes=i % 60)
+            rows.append({"resource_id": resource_id, "start_time": start, "end_time": start + LENGTH})
+    session.execute(insert(Reservation), rows)
+    session.commit()
+    return resource_id
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--overlaps", default="10,100,500,1000")
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    for overlaps in (int(n) for n in args.overlaps.split(",")):
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = sqlite_engine(Path(tmp) / "bench.db")
+            with Session(engine) as session:
+                resource_id = populate(session, overlaps, args.days)
+                start, end = DAY + timedelta(days=args.days // 2, hours=1), DAY + timedelta(days=args.days // 2, hours=3)
+                record = {"bench": "shared_capacity", "overlaps": overlaps, "days": args.days}
+                for impl, fn in (
+                    ("has_conflict_sql", reservation_service.has_conflict),
+                    ("pairwise", pairwise_peak),
+                ):
+                    emit({**record, "impl": impl, **measure(lambda: fn(session, resource_id, start, end), args.repeat)})
+
+                # A rule on the resource moves the check to the Python sweep
+                session.execute(
+                    insert(RecurringReservation).values(
+                        resource_id=resource_id,
+                        start_time=DAY - timedelta(days=7),
+                        end_time=DAY - timedelta(days=7) + timedelta(minutes=30),
+                        freq="weekly",
+                        interval=1,
+                    )
+                )
+                session.commit()
+                stats = measure(lambda: reservation_service.has_conflict(session, resource_id, start, end), args.repeat)
+                emit({**record, "impl": "has_conflict_with_rule", **stats})
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Concurrent read/write throughput of the SQLite profiles (SQLITE_PROFILE).
+
+Reader threads page through reservations while writer threads book new ones, for a fixed
+time, once per profile on a fresh database file.
+
+    python -m benchmarks.sqlite_profiles --readers 8 --writers 4 --seconds 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from app.db.database import SQLITE_PROFILES, Base, sqlite_pragma_listener
+from app.models.organization import Organization
+from app.models.reservation import Reservation
+from app.models.resource import Resource
+from app.schemas.reservation import ReservationCreate
+from app.services import reservation_service
+from sqlalchemy import create_engine, event, exc, insert
+from sqlalchemy.orm import Session
+
+from benchmarks.common import emit
+
+BASE = datetime(2030, 1, 1)
+
+
+def seed(engine, resources: int, per_resource: int) -> list[int]:
+    with Session(engine) as session:
+        org_id = session.execute(insert(Organization).values(name="Bench").returning(Organization.id)).scalar_one()
+        ids = list(
+            session.execute(
+                insert(Resource).returning(Resource.id, sort_by_parameter_order=True),
+                [{"organization_id": org_id, "name": f"R{i}"} for i in range(resources)],
+            ).scalars()
+        )
+        session.execute(
+            insert(Reservation),
+            [
+                {
+                    "resource_id": rid,
+                    "start_time": BASE + timedelta(hours=h),
+                    "end_time": BASE + timedelta(hours=h, minutes=50),
+                    "status": "confirmed",
+                }
+                for rid in ids
+                for h in range(per_resource)
+            ],
+        )
+        session.commit()
+    return ids
+
+
+def run_profile(profile: str, args: argparse.Namespace, tmp: Path) -> None:
+    engine = create_engine(
+        f"sqlite:///{tmp / f'{profile}.db'}",
+        connect_args={"check_same_thread": False},
+        pool_size=args.readers + args.writers,
+    )
+    event.listen(engine, "connect", sqlite_pragma_listener(profile))
+    Base.metadata.create_all(engine)
+    resource_ids = seed(engine, resources=20, per_resource=500)
+
+    stop = threading.Event()
+    slots = itertools.count(1000)  # hours after BASE that nobody has booked yet
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    read_latencies: list[float] = []
+    lock = threading.Lock()
+
+    def reader() -> None:
+        with Session(engine) as session:
+            while not stop.is_set():
+                started = time.perf_counter()
+                try:
+                    reservation_service.list_reservations(session, resource_id=random.choice(resource_ids), limit=100)
+                    session.rollback()
+                except exc.OperationalError:
+                    session.rollback()
+                    with lock:
+                        counts["errors"] += 1
+                    continue
+                with lock:
+                    counts["reads"] += 1
+                    read_latencies.append(time.perf_counter() - started)
+
+    def writer() -> None:
+        with Session(engine) as session:
+            while not stop.is_set():
+                start = BASE + timedelta(hours=next(slots))
+                item = ReservationCreate(
+                    resource_id=random.choice(resource_ids), start_time=start, end_time=start + timedelta(minutes=30)
+                )
+                try:
+                    reservation_service.create_reservation(session, item)
+                except exc.OperationalError:
+                    session.rollback()
+                    with lock:
+                        counts["errors"] += 1
+                    continue
+                with lock:
+                    counts["writes"] += 1
+
+    threads = [threading.Thread(target=reader) for _ in range(args.readers)]
+    threads += [threading.Thread(target=writer) for _ in range(args.writers)]
+    for t in threads:
+        t.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    engine.dispose()
+
+    read_latencies.sort()
+    emit(
+        {
+            "bench": "sqlite_profiles",
+            "profile": profile,
+            "readers": args.readers,
+            "writers": args.writers,
+            "reads_per_s": round(counts["reads"] / args.seconds),
+            "writes_per_s": round(counts["writes"] / args.seconds),
+            "errors": counts["errors"],
+            "read_p99_ms": round(read_latencies[int(len(read_latencies) * 0.99)] * 1000, 2) if read_latencies else None,
+        }
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for profile in SQLITE_PROFILES:
+            run_profile(profile, args, Path(tmp))
+
+
+if __name__ == "__main__":
+    main()
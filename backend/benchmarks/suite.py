@@ -0,0 +1,281 @@
+"""Benchmark suite for the API hot paths, with machine-readable results.
+
+Builds (or reuses) a synthetic dataset from ``benchmarks.datagen``, then runs:
+
+- micro benchmarks of the service layer: ``has_conflict``, ``list_reservations`` (window and
+  keyset page), ``create_reservation`` and ``update_reservation_by_id``;
+- in-process HTTP load scenarios against ``app.main:app`` through httpx's ASGI transport,
+  with ``get_db`` pointed at the dataset.
+
+Results go to stdout as JSON lines and, with ``--out``, to one JSON document with run
+metadata. ``python -m benchmarks.compare`` diffs two such documents.
+
+    python -m benchmarks.suite --reservations 1000000 --db /tmp/bench-1m.db --out before.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import platform
+import random
+import subprocess
+import tempfile
+import time
+from collections import Counter
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import httpx
+import sqlalchemy
+from app.core.metrics import instrument_engine
+from app.db.database import get_db
+from app.models.reservation import Reservation
+from app.models.resource import Resource
+from app.schemas.reservation import ReservationCreate, ReservationUpdate
+from app.services import reservation_service
+from sqlalchemy import func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from benchmarks.common import emit, measure, sqlite_engine
+from benchmarks.datagen import Dataset, DatasetSpec, generate
+
+SCENARIOS = ("micro", "http")
+
+
+def load_dataset(engine: Engine, spec: DatasetSpec) -> Dataset:
+    # Rebuilds the Dataset description of a database generated earlier with `spec`
+    with Session(engine) as session:
+        resource_ids = list(session.execute(select(Resource.id).order_by(Resource.id)).scalars())
+        first_id, last_id, span_end = session.execute(
+            select(
+                func.min(Reservation.id),
+                func.max(Reservation.id),
+                func.max(Reservation.end_time),
+            )
+        ).one()
+    return Dataset(
+        spec=spec,
+        resource_ids=resource_ids,
+        busiest_resource_id=resource_ids[0],
+        reservation_ids=range(first_id, last_id + 1),
+        span_start=spec.start,
+        span_end=span_end,
+    )
+
+
+def micro(engine: Engine, dataset: Dataset, repeat: int) -> list[dict]:
+    rng = random.Random(1)
+    results = []
+    span = (dataset.span_end - dataset.span_start).total_seconds()
+
+    def random_time() -> datetime:
+        return dataset.span_start + timedelta(seconds=rng.uniform(0, span))
+
+    def cycle(values):
+        it = itertools.cycle(values)
+        return lambda: next(it)
+
+    with Session(engine, expire_on_commit=False) as session:
+        starts = [random_time() for _ in range(500)]
+        probes = cycle([(rng.choice(dataset.resource_ids), t, t + timedelta(hours=1)) for t in starts])
+        results.append(
+            {"name": "has_conflict", **measure(lambda: reservation_service.has_conflict(session, *probes()), repeat)}
+        )
+
+        busy = dataset.busiest_resource_id
+        windows = cycle([(t, t + timedelta(days=7)) for t in (random_time() for _ in range(200))])
+        results.append(
+            {
+                "name": "list_reservations_week",
+                **measure(lambda: reservation_service.list_reservations(session, busy, None, *windows()), repeat),
+            }
+        )
+        pages = cycle([(random_time(), rng.choice(dataset.reservation_ids)) for _ in range(200)])
+        results.append(
+            {
+                "name": "list_reservations_page_50",
+                **measure(lambda: reservation_service.list_reservations(session, limit=50, after=pages()), repeat),
+            }
+        )
+
+        # Writes commit every call, so they run fewer times; new bookings go after the dataset
+        slots = itertools.count()
+        future = dataset.span_end + timedelta(days=1)
+        resource_ids = itertools.cycle(dataset.resource_ids)
+
+        def create() -> None:
+            start = future + timedelta(hours=next(slots))
+            data = ReservationCreate(
+                resource_id=next(resource_ids), start_time=start, end_time=start + timedelta(minutes=50)
+            )
+            reservation_service.create_reservation(session, data)
+
+        ids = cycle(rng.sample(dataset.reservation_ids, min(len(dataset.reservation_ids), 1000)))
+        notes = ReservationUpdate(notes="benchmark")
+        write_repeat = max(10, repeat // 4)
+        results.append({"name": "create_reservation", **measure(create, write_repeat, warmup=5)})
+        update = lambda: reservation_service.update_reservation_by_id(session, ids(), notes)  # noqa: E731
+        results.append({"name": "update_reservation_notes", **measure(update, write_repeat, warmup=5)})
+    for result in results:
+        result["kind"] = "micro"
+    return results
+
+
+async def _http_scenario(
+    client: httpx.AsyncClient, name: str, request_factory, total: int, concurrency: int
+) -> dict:
+    latencies: list[float] = []
+    statuses: Counter[int] = Counter()
+    counter = iter(range(total))
+
+    async def worker() -> None:
+        for i in counter:
+            method, url, kwargs = request_factory(i)
+            started = time.perf_counter()
+            resp = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            statuses[resp.status_code] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "name": name,
+        "kind": "http",
+        "requests": total,
+        "concurrency": concurrency,
+        "rps": round(total / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+        "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 2),
+        "errors": sum(n for status, n in statuses.items() if status >= 500),
+        "statuses": {str(k): v for k, v in sorted(statuses.items())},
+    }
+
+
+def http(engine: Engine, dataset: Dataset, total: int, concurrency: int) -> list[dict]:
+    from app.main import app
+
+    instrument_engine(engine)
+    factory = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+    def override_get_db():
+        with factory() as session:
+            yield session
+
+    rng = random.Random(2)
+    span = (dataset.span_end - dataset.span_start).total_seconds()
+    future = dataset.span_end + timedelta(days=400)
+
+    def read_mix(i: int):
+        kind = i % 4
+        if kind == 0:
+            return "GET", f"/api/reservations/{rng.choice(dataset.reservation_ids)}", {}
+        if kind == 1:
+            start = dataset.span_start + timedelta(seconds=rng.uniform(0, span))
+            params = {
+                "resource_id": rng.choice(dataset.resource_ids),
+                "start": start.isoformat(),
+                "end": (start + timedelta(days=7)).isoformat(),
+                "limit": 50,
+            }
+            return "GET", "/api/reservations/", {"params": params}
+        if kind == 2:
+            start = dataset.span_start + timedelta(seconds=rng.uniform(0, span))
+            params = {"start": start.isoformat(), "end": (start + timedelta(days=1)).isoformat()}
+            return "GET", f"/api/resources/{rng.choice(dataset.resource_ids)}/availability", {"params": params}
+        return "GET", f"/api/resources/{rng.choice(dataset.resource_ids)}", {}
+
+    def booking(i: int):
+        # Random slots in one future month: mostly accepted, some conflicts
+        start = future + timedelta(minutes=30 * rng.randrange(30 * 24 * 2))
+        payload = {
+            "resource_id": rng.choice(dataset.resource_ids[:20]),
+            "start_time": start.isoformat(),
+            "end_time": (start + timedelta(hours=1)).isoformat(),
+            "guest_last_name": "Load",
+        }
+        return "POST", "/api/reservations/", {"json": payload}
+
+    async def run() -> list[dict]:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            return [
+                await _http_scenario(client, "http_read_mix", read_mix, total, concurrency),
+                await _http_scenario(client, "http_booking", booking, max(50, total // 5), concurrency),
+            ]
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        return asyncio.run(run())
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+
+
+def run_metadata(spec: DatasetSpec, args: argparse.Namespace) -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "sqlalchemy": sqlalchemy.__version__,
+        "platform": platform.platform(),
+        "dataset": asdict(spec),
+        "repeat": args.repeat,
+        "http_requests": args.http_requests,
+        "concurrency": args.concurrency,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reservations", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=DatasetSpec.seed)
+    parser.add_argument("--db", type=Path, help="dataset file; generated on first use and reused afterwards")
+    parser.add_argument("--only", default=",".join(SCENARIOS), help="comma-separated subset of: micro,http")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--http-requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--out", type=Path, help="write all results as one JSON document")
+    args = parser.parse_args()
+    only = set(args.only.split(","))
+
+    spec = DatasetSpec(reservations=args.reservations, seed=args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        # Write benchmarks change the data, so a reused dataset is copied first
+        path = Path(tmp) / "bench.db"
+        if args.db is not None and not args.db.exists():
+            generate(sqlite_engine(args.db), spec)
+        if args.db is not None:
+            path.write_bytes(args.db.read_bytes())
+            engine = sqlite_engine(path)
+            dataset = load_dataset(engine, spec)
+        else:
+            engine = sqlite_engine(path)
+            dataset = generate(engine, spec)
+
+        results: list[dict] = []
+        if "micro" in only:
+            results += micro(engine, dataset, args.repeat)
+        if "http" in only:
+            results += http(engine, dataset, args.http_requests, args.concurrency)
+        engine.dispose()
+
+    for result in results:
+        emit({"bench": "suite", **result})
+    if args.out:
+        args.out.write_text(json.dumps({"meta": run_metadata(spec, args), "results": results}, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
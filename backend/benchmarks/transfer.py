@@ -0,0 +1,120 @@
+"""Export and import throughput and peak memory of CSV and NDJSON reservation files.
+
+Export streams a populated database through the /export serializers into a file. Import
+feeds that file in 64 KiB chunks to the streaming importer, against parsing the whole
+file and inserting it with one create_reservations_bulk call. Sessions do not expire on
+commit, like the app's.
+
+    python -m benchmarks.transfer --sizes 10000,100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+from app.api.reservations import _csv_lines, _ndjson_lines
+from app.models.organization import Organization
+from app.models.resource import Resource
+from app.schemas.reservation import ReservationCreate
+from app.services import reservation_service, transfer_service
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from benchmarks.common import emit, sqlite_engine
+from benchmarks.list_memory import populate
+
+CHUNK_SIZE = 64 * 1024
+SERIALIZERS = {"csv": _csv_lines, "ndjson": _ndjson_lines}
+
+
+def file_chunks(path: Path) -> Iterator[bytes]:
+    with path.open("rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            yield chunk
+
+
+def streamed(session: Session, path: Path, input_format: str) -> int:
+    return transfer_service.import_reservations(session, file_chunks(path), input_format).accepted
+
+
+def whole_file(session: Session, path: Path, input_format: str) -> int:
+    text = transfer_service.text_stream([path.read_bytes()])
+    records = transfer_service.csv_records(text) if input_format == "csv" else transfer_service.ndjson_records(text)
+    items = [ReservationCreate.model_validate(record) for _, record, _ in records]
+    return sum(1 for r in reservation_service.create_reservations_bulk(session, items) if r.accepted)
+
+
+def traced(fn: Callable[[], int]) -> tuple[int, float, int]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    count = fn()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000")
+    parser.add_argument("--formats", default="csv,ndjson")
+    args = parser.parse_args()
+
+    for size in (int(s) for s in args.sizes.split(",")):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = sqlite_engine(Path(tmp) / "source.db")
+            with Session(source) as session:
+                populate(session, size)
+            for input_format in args.formats.split(","):
+                path = Path(tmp) / f"export.{input_format}"
+
+                def export() -> int:
+                    with Session(source) as session, path.open("wb") as f:
+                        for chunk in SERIALIZERS[input_format](reservation_service.iter_reservations(session)):
+                            f.write(chunk)
+                    return size
+
+                _, elapsed, peak = traced(export)
+                emit(
+                    {
+                        "bench": "transfer",
+                        "op": "export",
+                        "format": input_format,
+                        "rows": size,
+                        "file_mib": round(path.stat().st_size / 2**20, 1),
+                        "peak_mib": round(peak / 2**20, 1),
+                        "rows_per_s": round(size / elapsed),
+                    }
+                )
+                for impl, fn in (("streamed", streamed), ("whole_file", whole_file)):
+                    target = sqlite_engine(Path(tmp) / f"{impl}-{input_format}.db")
+                    with Session(target, expire_on_commit=False) as session:
+                        org_id = session.execute(
+                            insert(Organization).values(name="Bench Org").returning(Organization.id)
+                        ).scalar_one()
+                        session.execute(insert(Resource).values(organization_id=org_id, name="Room"))
+                        session.commit()
+                        accepted, elapsed, peak = traced(lambda: fn(session, path, input_format))
+                    target.dispose()
+                    emit(
+                        {
+                            "bench": "transfer",
+                            "op": "import",
+                            "format": input_format,
+                            "impl": impl,
+                            "rows": size,
+                            "accepted": accepted,
+                            "peak_mib": round(peak / 2**20, 1),
+                            "rows_per_s": round(size / elapsed),
+                        }
+                    )
+            source.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Writes per second of the by-id write paths vs the old load / write / refresh sequence.
+
+    python -m benchmarks.write_paths --rows 2000
+
+``load_refresh`` replays what the routes used to do: ``db.get`` the row, set attributes,
+commit, then ``db.refresh`` it, on a session that expires everything on commit.
+``by_id`` calls the single-statement service functions on an ``expire_on_commit=False``
+session. Both report statements sent to the database per write.
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from app.models.organization import Organization
+from app.models.reservation import Reservation
+from app.models.resource import Resource
+from app.schemas.reservation import ReservationUpdate
+from app.services import reservation_service
+from sqlalchemy import event, insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from benchmarks.common import emit, sqlite_engine
+
+
+def seed(engine: Engine, rows: int) -> list[int]:
+    with Session(engine) as session:
+        org_id = session.execute(
+            insert(Organization).values(name="Bench Org").returning(Organization.id)
+        ).scalar_one()
+        resource_id = session.execute(
+            insert(Resource).values(organization_id=org_id, name="R").returning(Resource.id)
+        ).scalar_one()
+        base = datetime(2030, 1, 1, 8, 0)
+        ids = list(
+            session.execute(
+                insert(Reservation).returning(Reservation.id, sort_by_parameter_order=True),
+                [
+                    {
+                        "resource_id": resource_id,
+                        "start_time": base + timedelta(hours=i),
+                        "end_time": base + timedelta(hours=i, minutes=45),
+                    }
+                    for i in range(rows)
+                ],
+            ).scalars()
+        )
+        session.commit()
+    return ids
+
+
+# Old sequence: one read, the write, and a reload of the written row
+
+
+def legacy_update(db: Session, reservation_id: int) -> None:
+    # Any update of an active reservation used to re-run the locked conflict check
+    obj = db.get(Reservation, reservation_id)
+    reservation_service.lock_resources(db, [obj.resource_id])
+    reservation_service.has_conflict(db, obj.resource_id, obj.start_time, obj.end_time, exclude_id=obj.id)
+    obj.notes = "updated"
+    db.commit()
+    db.refresh(obj)
+
+
+def legacy_cancel(db: Session, reservation_id: int) -> None:
+    obj = db.get(Reservation, reservation_id)
+    obj.status = reservation_service.CANCELLED
+    db.commit()
+    db.refresh(obj)
+
+
+def legacy_delete(db: Session, reservation_id: int) -> None:
+    obj = db.get(Reservation, reservation_id)
+    db.delete(obj)
+    db.commit()
+
+
+IMPLS: dict[str, dict[str, Callable[[Session, int], object]]] = {
+    "load_refresh": {"update": legacy_update, "cancel": legacy_cancel, "delete": legacy_delete},
+    "by_id": {
+        "update": lambda db, rid: reservation_service.update_reservation_by_id(
+            db, rid, ReservationUpdate(notes="updated")
+        ),
+        "cancel": reservation_service.cancel_reservation_by_id,
+        "delete": reservation_service.delete_reservation_by_id,
+    },
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000)
+    args = parser.parse_args()
+
+    for op in ("update", "cancel", "delete"):
+        for impl, fns in IMPLS.items():
+            with tempfile.TemporaryDirectory() as tmp:
+                engine = sqlite_engine(Path(tmp) / "bench.db")
+                ids = seed(engine, args.rows)
+                statements = 0
+
+                def count(*_):
+                    nonlocal statements
+                    statements += 1
+
+                event.listen(engine, "before_cursor_execute", count)
+                fn = fns[op]
+                with Session(engine, expire_on_commit=impl == "load_refresh") as session:
+                    started = time.perf_counter()
+                    for reservation_id in ids:
+                        fn(session, reservation_id)
+                        # A request gets a fresh session; keep the identity map from helping
+                        session.expunge_all()
+                    elapsed = time.perf_counter() - started
+                engine.dispose()
+            emit(
+                {
+                    "bench": "write_paths",
+                    "op": op,
+                    "impl": impl,
+                    "writes": len(ids),
+                    "statements_per_write": round(statements / len(ids), 2),
+                    "writes_per_s": round(len(ids) / elapsed),
+                }
+            )
+
+
+if __name__ == "__main__":
+    main()
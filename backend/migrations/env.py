@@ -0,0 +1,64 @@
+from logging.config import fileConfig
+
+from alembic import context
+from app.core.config import settings
+from app.db.database import Base
+from app.db.migrations import include_object
+from app.models import organization as _org  # noqa: F401
+from app.models import recurring_reservation as _recur  # noqa: F401
+from app.models import reservation as _resv  # noqa: F401
+from app.models import resource as _res  # noqa: F401
+from app.models import resource_daily_usage as _usage  # noqa: F401
+from app.models import user as _user  # noqa: F401
+from sqlalchemy import create_engine, pool
+
+config = context.config
+
+# The app runs migrations with its own logging already set up (see app.db.migrations)
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+
+def configure(**kwargs) -> None:
+    url = kwargs.get("url") or kwargs["connection"].engine.url
+    context.configure(
+        target_metadata=target_metadata,
+        include_object=include_object,
+        compare_type=True,
+        # SQLite cannot ALTER most things in place; batch mode rebuilds the table instead
+        render_as_batch=str(url).startswith("sqlite"),
+        # One transaction per revision, so a revision can step outside it for
+        # CREATE INDEX CONCURRENTLY (create_index_online) without losing the others
+        transaction_per_migration=True,
+        **kwargs,
+    )
+
+
+def run_migrations_offline() -> None:
+    # `alembic upgrade head --sql` renders the DDL for review instead of running it
+    configure(url=config.get_main_option("sqlalchemy.url") or settings.DATABASE_URL, literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        configure(connection=connection)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+    url = config.get_main_option("sqlalchemy.url") or settings.DATABASE_URL
+    connectable = create_engine(url, poolclass=pool.NullPool)
+    with connectable.connect() as connection:
+        configure(connection=connection)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
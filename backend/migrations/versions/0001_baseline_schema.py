@@ -0,0 +1,103 @@
+"""Baseline schema: the tables and indexes of the first release, built by create_all()
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+
+Databases created by create_all() are stamped at this revision on first startup (see
+app.db.migrations.upgrade_database) rather than upgraded through it; 0002 then adds what
+later releases created outside migrations.
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0001"
+down_revision: str | None = None
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def timestamps() -> list[sa.Column]:
+    return [
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    ]
+
+
+def guest_columns() -> list[sa.Column]:
+    return [
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("notes", sa.String(length=500), nullable=True),
+        sa.Column("guest_last_name", sa.String(length=100), nullable=True),
+        sa.Column("guest_first_name", sa.String(length=100), nullable=True),
+        sa.Column("guest_contact", sa.String(length=255), nullable=True),
+    ]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "organizations",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        *timestamps(),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("name"),
+    )
+    op.create_index("ix_organizations_id", "organizations", ["id"])
+
+    op.create_table(
+        "resources",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("organization_id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("type", sa.String(length=100), nullable=True),
+        sa.Column("capacity", sa.Integer(), nullable=True),
+        *timestamps(),
+        sa.ForeignKeyConstraint(["organization_id"], ["organizations.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_resources_id", "resources", ["id"])
+    op.create_index("ix_resources_organization_id", "resources", ["organization_id"])
+
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("email", sa.String(length=255), nullable=False),
+        sa.Column("full_name", sa.String(length=255), nullable=True),
+        sa.Column("hashed_password", sa.String(length=255), nullable=False),
+        sa.Column("role", sa.String(length=50), nullable=False),
+        sa.Column("organization_id", sa.Integer(), nullable=True),
+        *timestamps(),
+        sa.ForeignKeyConstraint(["organization_id"], ["organizations.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+    op.create_index("ix_users_id", "users", ["id"])
+
+    op.create_table(
+        "reservations",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("resource_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.Column("start_time", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("end_time", sa.DateTime(timezone=True), nullable=False),
+        *guest_columns(),
+        *timestamps(),
+        sa.ForeignKeyConstraint(["resource_id"], ["resources.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_reservations_id", "reservations", ["id"])
+    op.create_index("ix_reservations_resource_id", "reservations", ["resource_id"])
+    op.create_index("ix_reservations_user_id", "reservations", ["user_id"])
+    op.create_index("ix_reservations_guest_last_name", "reservations", ["guest_last_name"])
+    op.create_index("ix_reservations_guest_last_name_start", "reservations", ["guest_last_name", "start_time"])
+
+
+def downgrade() -> None:
+    # Dropping a table drops its indexes
+    for table in ("reservations", "users", "resources", "organizations"):
+        op.drop_table(table)
@@ -0,0 +1,105 @@
+"""Tables and indexes added by create_all() and ensure_indexes() before migrations existed
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+
+Recurring reservations and their exceptions, the daily usage rollup, and the reservation
+indexes for conflict probes, keyset pages and case-insensitive name search. A database
+stamped at 0001 may already have any of them, from whichever release built it, so every
+object is created only if missing.
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from app.db.migrations import create_index_online, drop_index_online
+
+revision: str = "0002"
+down_revision: str | None = "0001"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "resource_daily_usage",
+        sa.Column("resource_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("reservations", sa.Integer(), nullable=False),
+        sa.Column("cancelled", sa.Integer(), nullable=False),
+        sa.Column("booked_seconds", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("resource_id", "day"),
+        if_not_exists=True,
+    )
+
+    op.create_table(
+        "recurring_reservations",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("resource_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.Column("start_time", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("end_time", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("freq", sa.String(length=10), nullable=False),
+        sa.Column("interval", sa.Integer(), nullable=False),
+        sa.Column("weekdays", sa.String(length=20), nullable=True),
+        sa.Column("until", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("notes", sa.String(length=500), nullable=True),
+        sa.Column("guest_last_name", sa.String(length=100), nullable=True),
+        sa.Column("guest_first_name", sa.String(length=100), nullable=True),
+        sa.Column("guest_contact", sa.String(length=255), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(["resource_id"], ["resources.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("id"),
+        if_not_exists=True,
+    )
+    for name, columns in (
+        ("ix_recurring_reservations_id", ["id"]),
+        ("ix_recurring_reservations_resource_id", ["resource_id"]),
+        ("ix_recurring_reservations_user_id", ["user_id"]),
+        ("ix_recurring_reservations_guest_last_name", ["guest_last_name"]),
+        ("ix_recurring_reservations_resource_start", ["resource_id", "start_time"]),
+    ):
+        op.create_index(name, "recurring_reservations", columns, if_not_exists=True)
+
+    op.create_table(
+        "recurrence_exceptions",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("rule_id", sa.Integer(), nullable=False),
+        sa.Column("occurrence_start", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["rule_id"], ["recurring_reservations.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_recurrence_exceptions_rule_start",
+        "recurrence_exceptions",
+        ["rule_id", "occurrence_start"],
+        unique=True,
+        if_not_exists=True,
+    )
+
+    # reservations may be large by now
+    create_index_online("ix_reservations_resource_start_end", "reservations", ["resource_id", "start_time", "end_time"])
+    create_index_online("ix_reservations_start_id", "reservations", ["start_time", "id"])
+    create_index_online(
+        "ix_reservations_guest_last_name_lower_start",
+        "reservations",
+        [sa.text("lower(guest_last_name)"), "start_time"],
+    )
+
+
+def downgrade() -> None:
+    for name in (
+        "ix_reservations_guest_last_name_lower_start",
+        "ix_reservations_start_id",
+        "ix_reservations_resource_start_end",
+    ):
+        drop_index_online(name, "reservations")
+    # Dropping a table drops its indexes
+    for table in ("recurrence_exceptions", "recurring_reservations", "resource_daily_usage"):
+        op.drop_table(table)
@@ -0,0 +1,27 @@
+"""Resource schedule versions for the in-process schedule cache
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0004"
+down_revision: str | None = "0003"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # The triggers bumping it are installed by 0006 (app.db.schedule)
+    with op.batch_alter_table("resources") as batch_op:
+        batch_op.add_column(sa.Column("schedule_version", sa.Integer(), server_default="0", nullable=False))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("resources") as batch_op:
+        batch_op.drop_column("schedule_version")
@@ -0,0 +1,49 @@
+"""Archive table for reservations past the retention horizon
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+
+On PostgreSQL the table is range-partitioned by start_time; the yearly partitions are
+created by the archive job as rows arrive (app.db.archive.ensure_archive_partitions).
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0005"
+down_revision: str | None = "0004"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "reservations_archive",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("start_time", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("resource_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.Column("end_time", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("notes", sa.String(length=500), nullable=True),
+        sa.Column("guest_last_name", sa.String(length=100), nullable=True),
+        sa.Column("guest_first_name", sa.String(length=100), nullable=True),
+        sa.Column("guest_contact", sa.String(length=255), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("archived_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(["resource_id"], ["resources.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("id", "start_time"),
+        postgresql_partition_by="RANGE (start_time)",
+    )
+    op.create_index("ix_reservations_archive_resource_start", "reservations_archive", ["resource_id", "start_time"])
+    op.create_index("ix_reservations_archive_start_id", "reservations_archive", ["start_time", "id"])
+    op.create_index("ix_reservations_archive_end_time", "reservations_archive", ["end_time"])
+
+
+def downgrade() -> None:
+    op.drop_table("reservations_archive")
@@ -0,0 +1,37 @@
+"""Triggers bumping resources.schedule_version on every booking change
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+
+Installed whatever SCHEDULE_CACHE says: workers sharing a database may differ in it, and
+one that caches needs every other process's writes to move the version. The cost is one
+UPDATE of the resource row per booking write. Other databases have no schedule cache.
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+from app.db.schedule import drop_schedule_version_ddl, schedule_version_ddl
+
+revision: str = "0006"
+down_revision: str | None = "0005"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    dialect = op.get_context().dialect.name
+    if dialect not in ("sqlite", "postgresql"):
+        return
+    # Replaces any copy installed at startup by earlier releases
+    for ddl in (*drop_schedule_version_ddl(dialect), *schedule_version_ddl(dialect)):
+        op.execute(ddl)
+
+
+def downgrade() -> None:
+    dialect = op.get_context().dialect.name
+    if dialect not in ("sqlite", "postgresql"):
+        return
+    for ddl in drop_schedule_version_ddl(dialect):
+        op.execute(ddl)
@@ -0,0 +1,61 @@
+"""Never reuse reservation ids on SQLite
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17
+
+Without AUTOINCREMENT SQLite gives a new row max(id) + 1, which can be the id of a
+reservation already moved to reservations_archive. The table is rebuilt with it, and the
+id counter starts past every id either table has used. PostgreSQL sequences never go back,
+so nothing changes there.
+
+Rebuilding the table drops its triggers and the expression index SQLite cannot reflect.
+The index and the schedule version triggers are recreated here; the search and rollup
+triggers are built by 0008 and 0009.
+"""
+
+import warnings
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from app.db.schedule import drop_schedule_version_ddl, schedule_version_ddl
+
+revision: str = "0007"
+down_revision: str | None = "0006"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+LOWER_NAME_INDEX = "ix_reservations_guest_last_name_lower_start"
+
+
+def _rebuild(autoincrement: bool) -> None:
+    with warnings.catch_warnings():
+        # Reflection skips the expression index, which is recreated below
+        warnings.filterwarnings("ignore", "Skipped unsupported reflection", sa.exc.SAWarning)
+        with op.batch_alter_table(
+            "reservations", recreate="always", table_kwargs={"sqlite_autoincrement": autoincrement}
+        ):
+            pass
+    op.create_index(
+        LOWER_NAME_INDEX, "reservations", [sa.text("lower(guest_last_name)"), "start_time"], if_not_exists=True
+    )
+    for ddl in (*drop_schedule_version_ddl("sqlite"), *schedule_version_ddl("sqlite")):
+        op.execute(ddl)
+
+
+def upgrade() -> None:
+    if op.get_context().dialect.name != "sqlite":
+        return
+    _rebuild(autoincrement=True)
+    op.execute("DELETE FROM sqlite_sequence WHERE name = 'reservations'")
+    op.execute(
+        "INSERT INTO sqlite_sequence (name, seq) SELECT 'reservations', max("
+        "(SELECT coalesce(max(id), 0) FROM reservations), (SELECT coalesce(max(id), 0) FROM reservations_archive))"
+    )
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name != "sqlite":
+        return
+    _rebuild(autoincrement=False)
@@ -0,0 +1,69 @@
+"""Search index over reservation notes and contacts
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17
+
+An FTS5 trigram table kept current by triggers on SQLite, pg_trgm GIN indexes built
+concurrently on PostgreSQL (see app.db.search). Built whatever SEARCH_INDEX says, so workers
+sharing a database can differ in it. Where FTS5 or the pg_trgm extension is unavailable the
+revision still applies and search scans with LIKE.
+"""
+
+import logging
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from app.db.migrations import create_index_online, drop_index_online
+from app.db.search import POSTGRESQL_INDEXES, SQLITE_FTS_TABLE, SQLITE_TRIGGERS
+from sqlalchemy.exc import DBAPIError
+
+revision: str = "0008"
+down_revision: str | None = "0007"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+logger = logging.getLogger(__name__)
+
+
+def _drop_sqlite() -> None:
+    for name in SQLITE_TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    op.execute("DROP TABLE IF EXISTS reservations_fts")
+
+
+def upgrade() -> None:
+    dialect = op.get_context().dialect.name
+    if dialect == "sqlite":
+        # Replaces any copy built at startup by earlier releases
+        _drop_sqlite()
+        try:
+            op.execute(SQLITE_FTS_TABLE)
+        except DBAPIError as e:
+            logger.warning("SQLite without FTS5 trigram support, search scans with LIKE: %s", e)
+            return
+        for ddl in SQLITE_TRIGGERS.values():
+            op.execute(ddl)
+        op.execute("INSERT INTO reservations_fts (reservations_fts) VALUES ('rebuild')")
+    elif dialect == "postgresql":
+        context = op.get_context()
+        with context.autocommit_block():
+            try:
+                op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            except DBAPIError as e:
+                logger.warning("pg_trgm unavailable, search scans with LIKE: %s", e)
+                return
+        for name, expression in POSTGRESQL_INDEXES.items():
+            create_index_online(
+                name, "reservations", [sa.text(f"{expression} gin_trgm_ops")], postgresql_using="gin"
+            )
+
+
+def downgrade() -> None:
+    dialect = op.get_context().dialect.name
+    if dialect == "sqlite":
+        _drop_sqlite()
+    elif dialect == "postgresql":
+        for name in POSTGRESQL_INDEXES:
+            drop_index_online(name, "reservations")
@@ -0,0 +1,41 @@
+"""Triggers keeping resource_daily_usage current, and its backfill
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17
+
+Installed whatever REPORTS_ROLLUP says: workers sharing a database may differ in it, and
+one serving reports from the rollup needs every other process's writes counted. The table
+is rebuilt from live and archived reservations in one INSERT ... SELECT. Other databases
+have no rollup.
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+from app.db.rollup import drop_usage_rollup_ddl, usage_rollup_ddl, usage_rollup_rebuild
+
+revision: str = "0009"
+down_revision: str | None = "0008"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    dialect = op.get_context().dialect.name
+    if dialect not in ("sqlite", "postgresql"):
+        return
+    # Replaces any copy installed at startup by earlier releases
+    for ddl in (*drop_usage_rollup_ddl(dialect), *usage_rollup_ddl(dialect)):
+        op.execute(ddl)
+    for stmt in usage_rollup_rebuild(dialect):
+        op.execute(stmt)
+
+
+def downgrade() -> None:
+    dialect = op.get_context().dialect.name
+    if dialect not in ("sqlite", "postgresql"):
+        return
+    # The table stays, as 0002 created it
+    for ddl in drop_usage_rollup_ddl(dialect):
+        op.execute(ddl)
@@ -11,7 +11,14 @@ import os  # noqa: E402
 import pytest  # noqa: E402
 from app.db.database import Base, get_db  # noqa: E402
 from app.main import app  # noqa: E402
-from app.models import organization, reservation, resource, user  # noqa: E402
+from app.models import (  # noqa: E402
+    organization,
+    recurring_reservation,
+    reservation,
+    resource,
+    resource_daily_usage,
+    user,
+)
 from sqlalchemy import create_engine  # noqa: E402
 from sqlalchemy.orm import sessionmaker  # noqa: E402
 
@@ -34,7 +41,9 @@ def engine(test_db_url):
 
 @pytest.fixture(scope="session")
 def TestingSessionLocal(engine):
-    return sessionmaker(autocommit=False, autoflush=False, bind=engine, future=True)
+    return sessionmaker(
+        autocommit=False, autoflush=False, expire_on_commit=False, bind=engine, future=True
+    )
 
 @pytest.fixture()
 def db_session(TestingSessionLocal):
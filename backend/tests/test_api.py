@@ -1,5 +1,15 @@
+import csv
+import io
+import json
 from datetime import datetime, timedelta
 
+from app.api.conditional import json_body
+from app.core.config import settings
+from app.schemas.reservation import ReservationOut
+from app.schemas.resource import ResourceOut
+from app.services import reservation_service
+from sqlalchemy import event
+
 
 def test_api_create_and_conflict(client):
     # Create organization
@@ -94,3 +104,376 @@ def test_api_get_update_delete(client):
     # 404 after delete
     not_found = client.get(f"/api/reservations/{rid}")
     assert not_found.status_code == 404
+    assert client.patch(f"/api/reservations/{rid}", json={"notes": "x"}).status_code == 404
+    assert client.post(f"/api/reservations/{rid}/cancel").status_code == 404
+    assert client.delete(f"/api/reservations/{rid}").status_code == 404
+    # Columns that cannot be NULL may be left out of a PATCH, not set to null
+    for field in ("shared", "name"):
+        assert client.patch(f"/api/resources/{res['id']}", json={field: None}).status_code == 422
+    assert client.patch(f"/api/resources/{res['id']}", json={"capacity": None}).json()["capacity"] is None
+    assert client.delete(f"/api/resources/{res['id']}").status_code == 204
+    assert client.delete(f"/api/resources/{res['id']}").status_code == 404
+
+
+def test_api_list_reservations_cursor_pagination_and_ndjson(client):
+    org = client.post("/api/organizations/", json={"name": "Paging Org"}).json()
+    res = client.post("/api/resources/", json={"organization_id": org["id"], "name": "Desk 7"}).json()
+
+    base = datetime(2030, 1, 1, 9, 0)
+    created = []
+    for i in range(5):
+        r = client.post(
+            "/api/reservations/",
+            json={
+                "resource_id": res["id"],
+                "start_time": (base + timedelta(hours=4 - i)).isoformat(),
+                "end_time": (base + timedelta(hours=4 - i, minutes=30)).isoformat(),
+            },
+        )
+        assert r.status_code == 201, r.text
+        created.append(r.json()["id"])
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {"resource_id": res["id"], "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get("/api/reservations/", params=params)
+        assert page.status_code == 200, page.text
+        seen.extend(row["id"] for row in page.json())
+        pages += 1
+        cursor = page.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert pages == 3
+    # Ordered by start_time, so the last-created (earliest) booking comes first
+    assert seen == list(reversed(created))
+
+    stream = client.get("/api/reservations/", params={"resource_id": res["id"], "format": "ndjson"})
+    assert stream.status_code == 200
+    assert stream.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in stream.text.splitlines()]
+    assert [row["id"] for row in lines] == seen
+
+    bad = client.get("/api/reservations/", params={"cursor": "not-a-cursor"})
+    assert bad.status_code == 400
+
+
+def test_api_bulk_create(client):
+    org = client.post("/api/organizations/", json={"name": "Bulk Org"}).json()
+    res = client.post("/api/resources/", json={"organization_id": org["id"], "name": "Hall"}).json()
+    other = client.post("/api/resources/", json={"organization_id": org["id"], "name": "Annex"}).json()
+
+    base = datetime(2031, 3, 1, 8, 0)
+
+    def slot(resource_id, start_h, end_h):
+        return {
+            "resource_id": resource_id,
+            "start_time": (base + timedelta(hours=start_h)).isoformat(),
+            "end_time": (base + timedelta(hours=end_h)).isoformat(),
+        }
+
+    existing = client.post("/api/reservations/", json=slot(res["id"], 2, 4))
+    assert existing.status_code == 201
+
+    items = [
+        slot(res["id"], 0, 1),  # free
+        slot(res["id"], 3, 5),  # overlaps the stored booking
+        slot(res["id"], 5, 7),  # free
+        slot(res["id"], 6, 8),  # overlaps item 2 of this batch
+        slot(res["id"], 9, 8),  # invalid range
+        slot(other["id"], 5, 7),  # same time, different resource
+        slot(999_999, 0, 1),  # unknown resource
+    ]
+    r = client.post("/api/reservations/bulk", json={"items": items})
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert [item["accepted"] for item in body["results"]] == [True, False, True, False, False, True, False]
+    assert body["accepted"] == 3 and body["rejected"] == 4
+    assert all(item["id"] for item in body["results"] if item["accepted"])
+
+    stored = client.get("/api/reservations/", params={"resource_id": res["id"]}).json()
+    assert len(stored) == 3
+
+
+def test_api_export_and_streaming_import(client, monkeypatch):
+    org = client.post("/api/organizations/", json={"name": "Transfer Org"}).json()
+    source = client.post("/api/resources/", json={"organization_id": org["id"], "name": "Old Hall"}).json()
+    target = client.post("/api/resources/", json={"organization_id": org["id"], "name": "New Hall"}).json()
+    base = datetime(2031, 5, 1, 8, 0)
+
+    def slot(resource_id, start_h, end_h, **extra):
+        return {
+            "resource_id": resource_id,
+            "start_time": (base + timedelta(hours=start_h)).isoformat(),
+            "end_time": (base + timedelta(hours=end_h)).isoformat(),
+            **extra,
+        }
+
+    client.post("/api/reservations/", json=slot(source["id"], 0, 1, notes='window, "quiet"\nplease'))
+    dropped = client.post("/api/reservations/", json=slot(source["id"], 2, 3)).json()
+    client.post(f"/api/reservations/{dropped['id']}/cancel")
+    client.post("/api/reservations/", json=slot(source["id"], 4, 5, guest_last_name="Smith"))
+
+    ndjson = client.get("/api/reservations/export", params={"resource_id": source["id"]})
+    assert ndjson.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line)["status"] for line in ndjson.text.splitlines()] == ["confirmed", "cancelled", "confirmed"]
+
+    exported = client.get("/api/reservations/export", params={"resource_id": source["id"], "format": "csv"})
+    assert exported.status_code == 200
+    assert exported.headers["content-disposition"] == 'attachment; filename="reservations.csv"'
+    rows = list(csv.DictReader(io.StringIO(exported.text, newline="")))
+    assert [row["notes"] for row in rows] == ['window, "quiet"\nplease', "", ""]
+
+    # Move the export to another resource, plus a row with a bad range and one overlapping
+    # an imported row; two records per transaction
+    monkeypatch.setattr(settings, "IMPORT_BATCH_SIZE", 2)
+    upload = io.StringIO(newline="")
+    writer = csv.DictWriter(upload, fieldnames=list(rows[0]))
+    writer.writeheader()
+    for row in rows:
+        writer.writerow({**row, "resource_id": target["id"]})
+    writer.writerow({**rows[0], "resource_id": target["id"], "start_time": rows[0]["end_time"]})
+    writer.writerow({**rows[2], "id": "", "resource_id": target["id"]})
+    imported = client.post("/api/reservations/import", params={"format": "csv"}, content=upload.getvalue())
+    assert imported.status_code == 200, imported.text
+    body = imported.json()
+    assert (body["accepted"], body["rejected"], body["skipped"]) == (2, 2, 1)
+    assert [error["line"] for error in body["errors"]] == [7, 8]
+    assert "conflicts" in body["errors"][1]["error"]
+    moved = client.get("/api/reservations/", params={"resource_id": target["id"]}).json()
+    assert [r["notes"] for r in moved] == ['window, "quiet"\nplease', None]
+
+    # NDJSON arrives in arbitrary chunks; bad lines are reported by number
+    lines = [json.dumps(slot(target["id"], 10, 11)), "{not json", json.dumps({"resource_id": target["id"]}), ""]
+    payload = "\n".join(lines).encode()
+    chunks = (payload[i : i + 7] for i in range(0, len(payload), 7))
+    imported = client.post("/api/reservations/import", content=chunks)
+    body = imported.json()
+    assert (body["accepted"], body["rejected"]) == (1, 2)
+    assert [error["line"] for error in body["errors"]] == [2, 3]
+    assert "start_time" in body["errors"][1]["error"]
+
+
+def test_api_availability(client):
+    org = client.post("/api/organizations/", json={"name": "Availability Org"}).json()
+    busy = client.post(
+        "/api/resources/", json={"organization_id": org["id"], "name": "Studio A", "type": "studio"}
+    ).json()
+    idle = client.post(
+        "/api/resources/", json={"organization_id": org["id"], "name": "Studio B", "type": "studio"}
+    ).json()
+    client.post("/api/resources/", json={"organization_id": org["id"], "name": "Desk", "type": "desk"})
+
+    day = datetime(2034, 6, 1)
+
+    def book(resource_id, start_h, end_h):
+        r = client.post(
+            "/api/reservations/",
+            json={
+                "resource_id": resource_id,
+                "start_time": (day + timedelta(hours=start_h)).isoformat(),
+                "end_time": (day + timedelta(hours=end_h)).isoformat(),
+            },
+        )
+        assert r.status_code == 201, r.text
+        return r.json()["id"]
+
+    book(busy["id"], 8, 9.5)  # starts before the window
+    book(busy["id"], 11, 12)
+    client.post(f"/api/reservations/{book(busy['id'], 12.5, 13)}/cancel")  # cancelled: ignored
+
+    window = {"start": (day + timedelta(hours=9)).isoformat(), "end": (day + timedelta(hours=14)).isoformat()}
+    r = client.get(f"/api/resources/{busy['id']}/availability", params={**window, "duration_minutes": 60})
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert [(f["start"][11:16], f["end"][11:16]) for f in body["free"]] == [("09:30", "11:00"), ("12:00", "14:00")]
+    # Hourly grid anchored at 09:00: 10:00-11:00, 12:00-13:00, 13:00-14:00
+    assert [s["start"][11:16] for s in body["slots"]] == ["10:00", "12:00", "13:00"]
+
+    r = client.get(
+        "/api/resources/available",
+        params={"organization_id": org["id"], "type": "studio", **window},
+    )
+    assert r.status_code == 200, r.text
+    assert [res["id"] for res in r.json()] == [idle["id"]]
+
+    assert client.get(f"/api/resources/{busy['id']}/availability", params={**window, "end": window["start"]}).status_code == 400
+    assert client.get("/api/resources/999999/availability", params=window).status_code == 404
+
+
+def test_api_organization_calendar(client, engine):
+    org = client.post("/api/organizations/", json={"name": "Calendar Org"}).json()
+    rooms = [
+        client.post("/api/resources/", json={"organization_id": org["id"], "name": f"Room {i}"}).json()
+        for i in range(3)
+    ]
+    day = datetime(2035, 2, 5, 9, 0)
+
+    def book(resource, offset_h):
+        start = day + timedelta(hours=offset_h)
+        r = client.post(
+            "/api/reservations/",
+            json={
+                "resource_id": resource["id"],
+                "start_time": start.isoformat(),
+                "end_time": (start + timedelta(hours=1)).isoformat(),
+            },
+        )
+        assert r.status_code == 201, r.text
+        return r.json()["id"]
+
+    late = book(rooms[0], 3)
+    early = book(rooms[0], 0)
+    book(rooms[1], 1)
+    book(rooms[1], 48)  # outside the window
+    client.post(
+        "/api/recurring-reservations/",
+        json={
+            "resource_id": rooms[2]["id"],
+            "start_time": (day - timedelta(days=7)).isoformat(),
+            "end_time": (day - timedelta(days=7, hours=-2)).isoformat(),
+            "freq": "weekly",
+        },
+    )
+
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    window = {"start": day.replace(hour=0).isoformat(), "end": (day + timedelta(days=1)).isoformat()}
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        r = client.get(f"/api/organizations/{org['id']}/calendar", params=window)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert r.status_code == 200, r.text
+    # Organization, resources, reservations, recurring rules and their exceptions; none per resource
+    assert len(statements) == 5
+
+    body = r.json()
+    assert body["organization"]["name"] == "Calendar Org"
+    by_id = {res["id"]: res for res in body["resources"]}
+    assert [res["id"] for res in body["resources"]] == [room["id"] for room in rooms]
+    assert [rev["id"] for rev in by_id[rooms[0]["id"]]["reservations"]] == [early, late]
+    assert len(by_id[rooms[1]["id"]]["reservations"]) == 1
+    assert [o["start_time"] for o in by_id[rooms[2]["id"]]["occurrences"]] == [day.isoformat()]
+
+    # Unchanged calendars revalidate to a bodiless 304; any change produces a new ETag
+    etag = r.headers["etag"]
+    again = client.get(f"/api/organizations/{org['id']}/calendar", params=window, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    client.patch(f"/api/reservations/{early}", json={"notes": "moved chairs"})
+    changed = client.get(f"/api/organizations/{org['id']}/calendar", params=window, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+    assert client.get("/api/organizations/999999/calendar", params=window).status_code == 404
+    assert client.get(f"/api/organizations/{org['id']}/calendar", params={**window, "end": window["start"]}).status_code == 400
+
+
+def test_api_conditional_get(client, engine):
+    org = client.post("/api/organizations/", json={"name": "Conditional Org"}).json()
+    res = client.post("/api/resources/", json={"organization_id": org["id"], "name": "Desk"}).json()
+    base = datetime(2036, 4, 7, 9, 0)
+    ids = []
+    for hour in range(3):
+        start = base + timedelta(hours=hour)
+        r = client.post(
+            "/api/reservations/",
+            json={
+                "resource_id": res["id"],
+                "start_time": start.isoformat(),
+                "end_time": (start + timedelta(hours=1)).isoformat(),
+            },
+        )
+        ids.append(r.json()["id"])
+
+    params = {"resource_id": res["id"], "limit": 2}
+    first = client.get("/api/reservations/", params=params)
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "no-cache" and "last-modified" in first.headers
+
+    # A revalidation is answered from one aggregate query, without loading the page
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        again = client.get("/api/reservations/", params=params, headers={"If-None-Match": f"W/{etag}"})
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert again.status_code == 304 and again.content == b""
+    assert again.headers["etag"] == etag
+    assert len(statements) == 1
+
+    since = {"If-Modified-Since": first.headers["last-modified"]}
+    assert client.get("/api/reservations/", params=params, headers=since).status_code == 304
+
+    # Back-to-back edits, including one to the row just past the page, change the ETag
+    client.patch(f"/api/reservations/{ids[1]}", json={"notes": "first"})
+    edited = client.get("/api/reservations/", params=params, headers={"If-None-Match": etag})
+    assert edited.status_code == 200 and edited.headers["etag"] != etag
+    etag = edited.headers["etag"]
+    client.patch(f"/api/reservations/{ids[1]}", json={"notes": "second"})
+    assert client.get("/api/reservations/", params=params, headers={"If-None-Match": etag}).status_code == 200
+
+    # Deletions cannot move Last-Modified, but they change the ETag
+    full = client.get("/api/reservations/", params={"resource_id": res["id"]})
+    client.delete(f"/api/reservations/{ids[0]}")
+    after_delete = client.get(
+        "/api/reservations/", params={"resource_id": res["id"]}, headers={"If-None-Match": full.headers["etag"]}
+    )
+    assert after_delete.status_code == 200 and len(after_delete.json()) == 2
+
+    one = client.get(f"/api/reservations/{ids[1]}")
+    assert client.get(f"/api/reservations/{ids[1]}", headers={"If-None-Match": one.headers["etag"]}).status_code == 304
+    assert client.get(f"/api/reservations/{ids[2]}", headers={"If-None-Match": one.headers["etag"]}).status_code == 200
+
+    # Cached reads hash their payload; an update invalidates the cache and the ETag with it
+    for path in (f"/api/resources/{res['id']}", f"/api/resources/?organization_id={org['id']}", "/api/organizations/"):
+        r = client.get(path)
+        assert r.status_code == 200, r.text
+        assert client.get(path, headers={"If-None-Match": r.headers["etag"]}).status_code == 304
+    desk = client.get(f"/api/resources/{res['id']}")
+    client.patch(f"/api/resources/{res['id']}", json={"name": "Standing desk"})
+    renamed = client.get(f"/api/resources/{res['id']}", headers={"If-None-Match": desk.headers["etag"]})
+    assert renamed.status_code == 200 and renamed.json()["name"] == "Standing desk"
+
+    org_etag = client.get(f"/api/organizations/{org['id']}").headers["etag"]
+    assert client.get(f"/api/organizations/{org['id']}", headers={"If-None-Match": org_etag}).status_code == 304
+
+
+def test_api_list_fast_path_matches_response_model(client, db_session):
+    org = client.post("/api/organizations/", json={"name": "Wire Org"}).json()
+    res = client.post("/api/resources/", json={"organization_id": org["id"], "name": "Salle é", "capacity": 4}).json()
+    start = datetime(2038, 1, 4, 9, 0, 0, 250)
+    for i, notes in enumerate(["naïve ☕", None, 'quote " and \\ backslash']):
+        at = start + timedelta(hours=i)
+        client.post(
+            "/api/reservations/",
+            json={
+                "resource_id": res["id"],
+                "start_time": at.isoformat(),
+                "end_time": (at + timedelta(minutes=45)).isoformat(),
+                "notes": notes,
+                "guest_last_name": "Ünal",
+            },
+        )
+
+    # Byte for byte what FastAPI renders from response_model=list[ReservationOut]
+    listed = client.get("/api/reservations/", params={"resource_id": res["id"]})
+    expected = [
+        ReservationOut.model_validate(r).model_dump(mode="json")
+        for r in reservation_service.list_reservations(db_session, resource_id=res["id"])
+    ]
+    assert listed.content == json_body(expected)
+    page = client.get("/api/reservations/", params={"resource_id": res["id"], "limit": 2})
+    assert page.content == json_body(expected[:2]) and "X-Next-Cursor" in page.headers
+
+    resources = client.get("/api/resources/", params={"organization_id": org["id"]})
+    assert resources.content == json_body([ResourceOut.model_validate(res).model_dump(mode="json")])
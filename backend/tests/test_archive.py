@@ -0,0 +1,87 @@
+from datetime import date, datetime, timedelta
+
+from app.db.archive import archive
+from app.db.rollup import install_usage_rollup, remove_usage_rollup
+from app.models.reservation import ArchivedReservation, Reservation
+from app.services import archive_service, report_service
+from sqlalchemy import event, select
+
+
+def test_archived_reservations_stay_readable(client, db_session, engine, monkeypatch):
+    org = client.post("/api/organizations/", json={"name": "Archive Org"}).json()
+    res = client.post("/api/resources/", json={"organization_id": org["id"], "name": "Old Room"}).json()
+    base = datetime(1999, 6, 1, 9, 0)
+
+    def book(start, hours=1):
+        r = client.post(
+            "/api/reservations/",
+            json={
+                "resource_id": res["id"],
+                "start_time": start.isoformat(),
+                "end_time": (start + timedelta(hours=hours)).isoformat(),
+            },
+        )
+        assert r.status_code == 201, r.text
+        return r.json()["id"]
+
+    old = [book(base + timedelta(days=day)) for day in range(3)]
+    client.post(f"/api/reservations/{old[1]}/cancel")
+    current = book(datetime(2037, 1, 5, 9, 0))
+
+    monkeypatch.setattr(archive, "retention", timedelta(days=365))
+    monkeypatch.setattr(archive, "archived_until", None)
+    install_usage_rollup(engine)
+    try:
+        args = (db_session, date(1999, 6, 1), date(1999, 6, 8), "week", "resource", org["id"])
+        before = report_service.utilization(*args)
+
+        # One row per transaction
+        moved = archive_service.archive_reservations(db_session, datetime(2000, 1, 1), batch_size=1)
+        assert moved == 3
+        assert archive.archived_until == base + timedelta(days=2, hours=1)
+        live = db_session.execute(select(Reservation.id).where(Reservation.resource_id == res["id"])).scalars()
+        assert list(live) == [current]
+        statuses = db_session.execute(
+            select(ArchivedReservation.status).where(ArchivedReservation.id.in_(old)).order_by(ArchivedReservation.id)
+        ).scalars()
+        assert list(statuses) == ["confirmed", "cancelled", "confirmed"]
+
+        # Reports over archived weeks are unchanged, from the rollup and from the rows
+        assert report_service.utilization(*args) == before
+        assert report_service.utilization(*args, use_rollup=True, peak=False)[0].reservations == 3
+    finally:
+        with engine.begin() as conn:
+            remove_usage_rollup(conn)
+
+    # Lists reaching back merge both tables in keyset order, across pages
+    listed = client.get("/api/reservations/", params={"resource_id": res["id"]}).json()
+    assert [r["id"] for r in listed] == [*old, current]
+    first = client.get("/api/reservations/", params={"resource_id": res["id"], "limit": 2})
+    rest = client.get(
+        "/api/reservations/",
+        params={"resource_id": res["id"], "limit": 2, "cursor": first.headers["x-next-cursor"]},
+    )
+    assert [r["id"] for r in first.json() + rest.json()] == [*old, current]
+    streamed = client.get("/api/reservations/", params={"resource_id": res["id"], "format": "ndjson"})
+    assert len(streamed.text.splitlines()) == 4
+    assert client.get(f"/api/reservations/{old[0]}").json()["start_time"] == base.isoformat()
+
+    # Recent windows never touch the archive
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        recent = client.get("/api/reservations/", params={"resource_id": res["id"], "start": "2036-01-01T00:00:00"})
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert [r["id"] for r in recent.json()] == [current]
+    assert not any("reservations_archive" in statement for statement in statements)
+
+    # Ids are never handed out again, even once the newest row is archived or deleted
+    assert client.delete(f"/api/reservations/{current}").status_code == 204
+    latest = book(base + timedelta(days=5))
+    assert archive_service.archive_reservations(db_session, datetime(2000, 1, 1)) == 1
+    assert book(datetime(2037, 1, 6, 9, 0)) > latest > current
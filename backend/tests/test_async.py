@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+
+import pytest
+from app.api.async_routes import async_api_router
+from app.db.async_database import get_async_db
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+
+@pytest.fixture()
+def async_client(test_db_url, engine):
+    from starlette.testclient import TestClient
+
+    # Same database file as the sync fixtures, reached through aiosqlite
+    async_engine = create_async_engine(
+        test_db_url.replace("sqlite://", "sqlite+aiosqlite://", 1), poolclass=NullPool
+    )
+    sessions = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with sessions() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(async_api_router, prefix="/api")
+    app.dependency_overrides[get_async_db] = override_get_async_db
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def test_async_routes_crud_and_conflict(async_client):
+    org = async_client.post("/api/organizations/", json={"name": "Async Org"})
+    assert org.status_code == 201, org.text
+    res = async_client.post("/api/resources/", json={"organization_id": org.json()["id"], "name": "Pod"})
+    assert res.status_code == 201, res.text
+    res_id = res.json()["id"]
+
+    base = datetime(2033, 2, 1, 10, 0)
+    r1 = async_client.post(
+        "/api/reservations/",
+        json={
+            "resource_id": res_id,
+            "start_time": base.isoformat(),
+            "end_time": (base + timedelta(hours=1)).isoformat(),
+            "guest_last_name": "Async",
+        },
+    )
+    assert r1.status_code == 201, r1.text
+    rid = r1.json()["id"]
+
+    clash = async_client.post(
+        "/api/reservations/",
+        json={
+            "resource_id": res_id,
+            "start_time": (base + timedelta(minutes=30)).isoformat(),
+            "end_time": (base + timedelta(hours=2)).isoformat(),
+        },
+    )
+    assert clash.status_code == 400
+
+    listed = async_client.get("/api/reservations/", params={"resource_id": res_id, "limit": 10})
+    assert [row["id"] for row in listed.json()] == [rid]
+    assert "X-Next-Cursor" not in listed.headers
+    etag = listed.headers["etag"]
+    fresh = async_client.get(
+        "/api/reservations/", params={"resource_id": res_id, "limit": 10}, headers={"If-None-Match": etag}
+    )
+    assert fresh.status_code == 304
+    resource = async_client.get(f"/api/resources/{res_id}")
+    assert async_client.get(f"/api/resources/{res_id}", headers={"If-None-Match": resource.headers["etag"]}).status_code == 304
+
+    stream = async_client.get("/api/reservations/", params={"resource_id": res_id, "format": "ndjson"})
+    assert stream.text.count("\n") == 1
+
+    patched = async_client.patch(f"/api/reservations/{rid}", json={"notes": "async"})
+    assert patched.json()["notes"] == "async"
+
+    cancelled = async_client.post(f"/api/reservations/{rid}/cancel", headers={"Idempotency-Key": f"async-{rid}"})
+    assert cancelled.json()["status"] == "cancelled"
+    replayed = async_client.post(f"/api/reservations/{rid}/cancel", headers={"Idempotency-Key": f"async-{rid}"})
+    assert replayed.headers["idempotent-replayed"] == "true" and replayed.json() == cancelled.json()
+
+    assert async_client.delete(f"/api/reservations/{rid}").status_code == 204
+    assert async_client.get(f"/api/reservations/{rid}").status_code == 404
+    assert async_client.delete(f"/api/organizations/{org.json()['id']}").status_code == 204
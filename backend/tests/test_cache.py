@@ -0,0 +1,177 @@
+import pytest
+from app.core.cache import Cache, LocalSharedClient, LRUCache, SharedCache, cache
+from app.schemas.organization import OrganizationCreate, OrganizationUpdate
+from app.schemas.resource import ResourceCreate, ResourceUpdate
+from app.services import organization_service, resource_service
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_cache_ttl_eviction_and_stats():
+    clock = FakeClock()
+    lru = LRUCache(maxsize=2, ttl=10, clock=clock)
+    loads = []
+
+    def loader(value):
+        def load():
+            loads.append(value)
+            return value
+
+        return load
+
+    assert lru.get_or_load("a", loader("A")) == "A"
+    assert lru.get_or_load("a", loader("other")) == "A"
+    lru.get_or_load("b", loader("B"))
+    lru.get_or_load("c", loader("C"))  # evicts "a", the least recently used
+    assert lru.get_or_load("a", loader("A2")) == "A2"
+
+    clock.now = 11  # every entry has expired
+    assert lru.get_or_load("c", loader("C2")) == "C2"
+
+    lru.invalidate("c")
+    assert lru.get_or_load("c", loader("C3")) == "C3"
+    assert loads == ["A", "B", "C", "A2", "C2", "C3"]
+    assert lru.stats.as_dict() == {"hits": 1, "misses": 6, "evictions": 3, "invalidations": 1}
+
+
+def test_cache_skips_values_invalidated_while_loading():
+    lru = LRUCache()
+
+    def stale_load():
+        lru.invalidate("k")  # a write lands while the value is being read
+        return "stale"
+
+    assert lru.get_or_load("k", stale_load) == "stale"
+    assert lru.get_or_load("k", lambda: "fresh") == "fresh"
+
+
+def test_shared_cache_with_local_client():
+    clock = FakeClock()
+    shared = SharedCache(LocalSharedClient(clock=clock), ttl=5)
+    assert shared.get_or_load("org", lambda: [{"id": 1}]) == [{"id": 1}]
+    assert shared.get_or_load("org", lambda: None) == [{"id": 1}]
+    clock.now = 6
+    assert shared.get_or_load("org", lambda: [{"id": 2}]) == [{"id": 2}]
+    assert shared.stats.hits == 1 and shared.stats.misses == 2
+
+
+def test_incomplete_cache_fails_when_built():
+    class NoDelete(Cache):
+        def _get(self, key):
+            return None
+
+        def _set(self, key, value):
+            pass
+
+    with pytest.raises(TypeError, match="_delete"):
+        NoDelete()
+
+
+def test_service_writes_invalidate_cached_reads(db_session):
+    org = organization_service.create_organization(db_session, OrganizationCreate(name="Cached Org"))
+    res = resource_service.create_resource(db_session, ResourceCreate(organization_id=org.id, name="Booth"))
+
+    hits = cache.stats.hits
+    assert resource_service.get_resource_cached(db_session, res.id)["name"] == "Booth"
+    assert resource_service.get_resource_cached(db_session, res.id)["name"] == "Booth"
+    listed = resource_service.list_resources_cached(db_session, organization_id=org.id)
+    assert [r["name"] for r in listed] == ["Booth"]
+    assert cache.stats.hits == hits + 1
+
+    resource_service.update_resource(db_session, res, ResourceUpdate(name="Booth 2"))
+    assert resource_service.get_resource_cached(db_session, res.id)["name"] == "Booth 2"
+    assert [r["name"] for r in resource_service.list_resources_cached(db_session, organization_id=org.id)] == [
+        "Booth 2"
+    ]
+
+    assert "Cached Org" in [o["name"] for o in organization_service.list_organizations_cached(db_session)]
+    organization_service.update_organization(db_session, org, OrganizationUpdate(name="Cached Org 2"))
+    assert "Cached Org 2" in [o["name"] for o in organization_service.list_organizations_cached(db_session)]
+
+    organization_service.delete_organization(db_session, org)
+    assert resource_service.get_resource_cached(db_session, res.id) is None
+    assert resource_service.list_resources_cached(db_session, organization_id=org.id) == []
+
+
+def test_schedule_cache_follows_database_versions(db_session, engine, TestingSessionLocal, monkeypatch):
+    from datetime import datetime, timedelta
+
+    from app.db.schedule import (
+        check_schedule_versions,
+        install_schedule_versions,
+        remove_schedule_versions,
+        schedule_versions_installed,
+    )
+    from app.models.reservation import Reservation
+    from app.models.resource import Resource
+    from app.schemas.reservation import ReservationCreate
+    from app.services import availability_service, reservation_service
+    from app.services.schedule_cache import schedules
+    from sqlalchemy import event, insert, select
+
+    monkeypatch.setattr(schedules, "enabled", True)
+    schedules.clear()
+    with pytest.raises(RuntimeError):
+        check_schedule_versions(engine, True)
+    install_schedule_versions(engine)
+    # A process starting with the cache off leaves them to the workers that have it on
+    check_schedule_versions(engine, False)
+    with engine.connect() as conn:
+        assert schedule_versions_installed(conn)
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    try:
+        org = organization_service.create_organization(db_session, OrganizationCreate(name="Schedule Org"))
+        res = resource_service.create_resource(db_session, ResourceCreate(organization_id=org.id, name="Studio"))
+        day = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=2)
+
+        def at(hours: float) -> datetime:
+            return day + timedelta(hours=hours)
+
+        first = reservation_service.create_reservation(
+            db_session, ReservationCreate(resource_id=res.id, start_time=at(9), end_time=at(10))
+        )
+        # The writer moved its cached copy to the version the triggers left in the database
+        version = db_session.execute(select(Resource.schedule_version).where(Resource.id == res.id)).scalar_one()
+        assert version == 1 and schedules.recent(res.id).version == 1
+
+        event.listen(engine, "before_cursor_execute", record)
+        assert reservation_service.has_conflict(db_session, res.id, at(9.5), at(11))
+        assert not reservation_service.has_conflict(db_session, res.id, at(9.5), at(11), exclude_id=first.id)
+        assert statements == []  # confirmed moments ago, answered from memory
+
+        # Another worker books without touching this process's cache
+        monkeypatch.setattr(schedules, "revalidate_seconds", 0)
+        with TestingSessionLocal() as other:
+            other.execute(insert(Reservation).values(resource_id=res.id, start_time=at(12), end_time=at(13)))
+            other.commit()
+        statements.clear()
+        assert reservation_service.has_conflict(db_session, res.id, at(12), at(12.5))
+        assert len(statements) > 1 and schedules.stats.stale == 1  # version check, then a reload
+
+        statements.clear()
+        cached = availability_service.free_intervals(db_session, res.id, at(8), at(14))
+        assert len(statements) == 1  # the version check only
+        event.remove(engine, "before_cursor_execute", record)
+        monkeypatch.setattr(schedules, "enabled", False)
+        assert cached == availability_service.free_intervals(db_session, res.id, at(8), at(14))
+        assert [(a.hour, b.hour) for a, b in cached] == [(8, 9), (10, 12), (13, 14)]
+
+        # Outside the horizon the database answers
+        monkeypatch.setattr(schedules, "enabled", True)
+        assert reservation_service.cached_schedule(db_session, res.id, at(24 * 90), at(24 * 90 + 1)) is None
+    finally:
+        if event.contains(engine, "before_cursor_execute", record):
+            event.remove(engine, "before_cursor_execute", record)
+        with engine.begin() as conn:
+            remove_schedule_versions(conn)
+        schedules.clear()
@@ -0,0 +1,141 @@
+import asyncio
+import json
+import threading
+from datetime import datetime, timedelta
+
+from app.core.changefeed import ChangeFeed, changes, event_id
+from app.main import app
+
+
+def parse(frame: bytes) -> dict:
+    fields = dict(line.split(": ", 1) for line in frame.decode().strip().split("\n"))
+    return {"id": fields["id"], "event": fields["event"], **json.loads(fields["data"])}
+
+
+async def collect(feed: ChangeFeed, last_event_id: str | None, count: int, **kwargs) -> list[dict]:
+    frames = feed.subscribe(last_event_id, **kwargs)
+    try:
+        return [parse(await asyncio.wait_for(anext(frames), 5)) for _ in range(count)]
+    finally:
+        await frames.aclose()
+
+
+def test_reservation_writes_reach_the_feed_and_resume(client):
+    org = client.post("/api/organizations/", json={"name": "Feed Org"}).json()
+    res = client.post("/api/resources/", json={"organization_id": org["id"], "name": "Lane"}).json()
+    other = client.post("/api/resources/", json={"organization_id": org["id"], "name": "Lane 2"}).json()
+    start = event_id(changes.epoch, changes.seq)
+    base = datetime(2037, 6, 1, 9, 0)
+
+    def slot(resource, hour):
+        at = base + timedelta(hours=hour)
+        return {"resource_id": resource["id"], "start_time": at.isoformat(), "end_time": (at + timedelta(hours=1)).isoformat()}
+
+    rid = client.post("/api/reservations/", json=slot(res, 0)).json()["id"]
+    client.post("/api/reservations/bulk", json={"items": [slot(other, 0), slot(res, 1)]})
+    client.patch(f"/api/reservations/{rid}", json={"notes": "window seat"})
+    client.post(f"/api/reservations/{rid}/cancel")
+    client.delete(f"/api/reservations/{rid}")
+
+    events = asyncio.run(collect(changes, start, 5, resource_id=res["id"]))
+    assert [e["event"] for e in events] == ["created", "created", "updated", "cancelled", "deleted"]
+    assert all(e["resource_id"] == res["id"] for e in events)
+    assert events[2]["data"]["notes"] == "window seat"
+    assert events[4]["data"] == {"id": rid}
+
+    # Resuming from the third event replays only what followed it
+    resumed = asyncio.run(collect(changes, events[2]["id"], 2, resource_id=res["id"]))
+    assert [e["event"] for e in resumed] == ["cancelled", "deleted"]
+
+
+def test_reservations_deleted_with_their_resource_or_organization_reach_the_feed(client):
+    org = client.post("/api/organizations/", json={"name": "Feed Delete Org"}).json()
+    res = client.post("/api/resources/", json={"organization_id": org["id"], "name": "Court"}).json()
+    other = client.post("/api/resources/", json={"organization_id": org["id"], "name": "Court 2"}).json()
+    base = datetime(2037, 7, 1, 9, 0)
+
+    def book(resource, hour):
+        at = base + timedelta(hours=hour)
+        body = {"resource_id": resource["id"], "start_time": at.isoformat(), "end_time": (at + timedelta(hours=1)).isoformat()}
+        return client.post("/api/reservations/", json=body).json()["id"]
+
+    ids = [book(res, 0), book(res, 1)]
+    kept = book(other, 0)
+    start = event_id(changes.epoch, changes.seq)
+    assert client.delete(f"/api/resources/{res['id']}").status_code == 204
+    events = asyncio.run(collect(changes, start, 2))
+    assert [(e["event"], e["resource_id"]) for e in events] == [("deleted", res["id"])] * 2
+    assert sorted(e["data"]["id"] for e in events) == ids
+
+    start = event_id(changes.epoch, changes.seq)
+    assert client.delete(f"/api/organizations/{org['id']}").status_code == 204
+    event, = asyncio.run(collect(changes, start, 1))
+    assert (event["event"], event["resource_id"], event["data"]) == ("deleted", other["id"], {"id": kept})
+
+
+def test_feed_wakes_subscribers_and_resets_lost_positions():
+    feed = ChangeFeed(size=3)
+
+    async def fan_out():
+        # Every subscriber is released by one publish from another thread
+        subscribers = [asyncio.ensure_future(collect(feed, None, 1)) for _ in range(50)]
+        await asyncio.sleep(0.05)
+        threading.Thread(target=feed.publish, args=("created", 1, 10, {"id": 10})).start()
+        return await asyncio.gather(*subscribers)
+
+    received = asyncio.run(fan_out())
+    assert {e["reservation_id"] for events in received for e in events} == {10}
+    assert feed.info()["subscribers"] == 0
+
+    first = event_id(feed.epoch, feed.seq)
+    for n in range(5):
+        feed.publish("updated", 1, 10, {"n": n})
+    # Two of the five events after `first` have left the buffer: reload, then continue
+    reset, = asyncio.run(collect(feed, first, 1))
+    assert reset["event"] == "reset" and reset["id"] == event_id(feed.epoch, 6)
+    assert asyncio.run(collect(feed, "another-process-4", 1))[0]["event"] == "reset"
+    assert feed.info()["resets"] == 2
+
+    feed.publish("deleted", 1, 10, {"id": 10})
+    assert [e["event"] for e in asyncio.run(collect(feed, reset["id"], 1))] == ["deleted"]
+
+
+def test_stream_endpoint_sends_events():
+    async def call() -> bytes:
+        disconnect = asyncio.Event()
+        body = b""
+        requested = False
+
+        async def receive():
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await disconnect.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            nonlocal body
+            if message["type"] == "http.response.start":
+                assert message["status"] == 200
+            elif message["type"] == "http.response.body":
+                body += message.get("body", b"")
+                if body.endswith(b"\n\n"):
+                    disconnect.set()
+
+        scope = {
+            "type": "http",
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": "/api/reservations/stream",
+            "raw_path": b"/api/reservations/stream",
+            "query_string": b"resource_id=424242",
+            "headers": [(b"host", b"test"), (b"last-event-id", b"stale-1")],
+            "client": ("test", 1),
+            "server": ("test", 80),
+        }
+        await asyncio.wait_for(app(scope, receive, send), 5)
+        return body
+
+    assert parse(asyncio.run(call()))["event"] == "reset"
@@ -0,0 +1,219 @@
+from datetime import datetime
+
+import pytest
+from app.core.config import settings
+from app.db.database import sqlite_pragma_listener, sqlite_pragmas
+from app.db.pooling import PoolMetrics, engine_options
+from app.services import reservation_service
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    create_engine,
+    event,
+    exc,
+    func,
+)
+from sqlalchemy.orm import Session
+
+
+def test_pool_settings_and_checkout_metrics(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 1)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 0)
+    monkeypatch.setattr(settings, "DB_POOL_TIMEOUT", 0.05)
+    metrics = PoolMetrics()
+    url = f"sqlite:///{tmp_path / 'pool.db'}"
+    engine = create_engine(url, **engine_options(url, metrics))
+
+    held = engine.connect()
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    stats = metrics.snapshot(engine.pool)
+    assert stats["pool_class"] == "QueuePool"
+    assert stats["size"] == 1 and stats["checked_out"] == 1
+    assert stats["checkouts"] == 1 and stats["timeouts"] == 1
+    assert stats["wait_seconds_max"] >= 0.05
+
+    held.close()
+    engine.dispose()
+
+
+def test_health_db_reports_pool(client):
+    resp = client.get("/health/db")
+    assert resp.status_code == 200
+    assert {"checkouts", "timeouts", "wait_seconds_total"} <= resp.json()["pool"].keys()
+
+
+def test_sqlite_production_profile_pragmas(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'tuned.db'}")
+    event.listen(engine, "connect", sqlite_pragma_listener("production"))
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+        assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == settings.SQLITE_BUSY_TIMEOUT_MS
+        assert conn.exec_driver_sql("PRAGMA temp_store").scalar() == 2  # MEMORY
+        assert conn.exec_driver_sql("PRAGMA foreign_keys").scalar() == 1
+    engine.dispose()
+
+    with pytest.raises(ValueError):
+        sqlite_pragmas("fast")
+
+
+def first_release_schema() -> MetaData:
+    # The tables create_all() built before migrations existed, as the first release's models
+    # declared them
+    metadata = MetaData()
+
+    def timestamps() -> list[Column]:
+        return [
+            Column("created_at", DateTime(timezone=True), server_default=func.now(), nullable=False),
+            Column("updated_at", DateTime(timezone=True), server_default=func.now(), nullable=False),
+        ]
+
+    Table(
+        "organizations",
+        metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("name", String(255), unique=True, nullable=False),
+        *timestamps(),
+    )
+    Table(
+        "resources",
+        metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("organization_id", ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False, index=True),
+        Column("name", String(255), nullable=False),
+        Column("type", String(100)),
+        Column("capacity", Integer),
+        *timestamps(),
+    )
+    Table(
+        "users",
+        metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("email", String(255), unique=True, nullable=False, index=True),
+        Column("full_name", String(255)),
+        Column("hashed_password", String(255), nullable=False),
+        Column("role", String(50), nullable=False),
+        Column("organization_id", ForeignKey("organizations.id", ondelete="SET NULL")),
+        *timestamps(),
+    )
+    Table(
+        "reservations",
+        metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("resource_id", ForeignKey("resources.id", ondelete="CASCADE"), nullable=False, index=True),
+        Column("user_id", ForeignKey("users.id", ondelete="SET NULL"), index=True),
+        Column("start_time", DateTime(timezone=True), nullable=False),
+        Column("end_time", DateTime(timezone=True), nullable=False),
+        Column("status", String(20), nullable=False),
+        Column("notes", String(500)),
+        Column("guest_last_name", String(100), index=True),
+        Column("guest_first_name", String(100)),
+        Column("guest_contact", String(255)),
+        *timestamps(),
+        Index("ix_reservations_guest_last_name_start", "guest_last_name", "start_time"),
+    )
+    return metadata
+
+
+# SQLite cannot reflect expression indexes, so autogenerate skips them with a warning
+@pytest.mark.filterwarnings("ignore::UserWarning", "ignore::sqlalchemy.exc.SAWarning")
+def test_migrations_build_and_stamp_schema(tmp_path):
+    from alembic.autogenerate import compare_metadata
+    from alembic.runtime.migration import MigrationContext
+    from app.db.database import Base
+    from app.db.migrations import (
+        current_revision,
+        head_revision,
+        include_object,
+        upgrade_database,
+    )
+    from app.db.rollup import rollup_installed
+    from app.db.schedule import schedule_versions_installed
+    from app.db.search import FTS5, search_backend
+
+    schema_opts = {"include_object": include_object}
+    fresh = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    upgrade_database(fresh)
+    with fresh.connect() as conn:
+        assert current_revision(conn) == head_revision()
+        # The revisions build what the models describe
+        assert compare_metadata(MigrationContext.configure(conn, opts=schema_opts), Base.metadata) == []
+        # Installed whatever SCHEDULE_CACHE says, so caching workers see every write
+        assert schedule_versions_installed(conn)
+        assert search_backend(conn) == FTS5
+        assert rollup_installed(conn)
+    fresh.dispose()
+
+    # A database from the first release's create_all() is stamped at the baseline, then
+    # upgraded with everything added since
+    legacy = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    first_release_schema().create_all(legacy)
+    with legacy.begin() as conn:
+        conn.exec_driver_sql("INSERT INTO organizations (id, name) VALUES (1, 'Old Org')")
+        conn.exec_driver_sql("INSERT INTO resources (id, organization_id, name) VALUES (1, 1, 'Old Room')")
+        conn.exec_driver_sql(
+            "INSERT INTO reservations (resource_id, start_time, end_time, status)"
+            " VALUES (1, '2020-01-01 09:00:00', '2020-01-01 10:00:00', 'confirmed')"
+        )
+    upgrade_database(legacy)
+    with legacy.connect() as conn:
+        assert current_revision(conn) == head_revision()
+        assert compare_metadata(MigrationContext.configure(conn, opts=schema_opts), Base.metadata) == []
+        indexes = {row[0] for row in conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert {"ix_reservations_resource_start_end", "ix_reservations_guest_last_name_lower_start"} <= indexes
+        table = conn.exec_driver_sql("SELECT sql FROM sqlite_master WHERE name = 'reservations'").scalar()
+        assert "AUTOINCREMENT" in table
+        assert conn.exec_driver_sql("SELECT count(*) FROM reservations").scalar() == 1
+        # The rollup is backfilled with what the old release booked
+        assert conn.exec_driver_sql("SELECT reservations FROM resource_daily_usage").all() == [(1,)]
+    with Session(legacy) as db:
+        assert reservation_service.has_conflict(db, 1, datetime(2020, 1, 1, 9, 30), datetime(2020, 1, 1, 11, 0))
+    legacy.dispose()
+
+
+@pytest.mark.filterwarnings("ignore::UserWarning", "ignore::sqlalchemy.exc.SAWarning")
+def test_startup_only_checks_a_migrated_database(tmp_path, monkeypatch):
+    import asyncio
+
+    from app import main
+    from app.db.archive import archive
+    from app.db.migrations import upgrade_database
+    from sqlalchemy import event
+
+    migrated = create_engine(f"sqlite:///{tmp_path / 'migrated.db'}")
+    upgrade_database(migrated)
+    monkeypatch.setattr(main, "engine", migrated)
+    monkeypatch.setattr(archive, "archived_until", None)
+    for name, value in (
+        ("DB_MIGRATE_ON_STARTUP", False),
+        ("REPORTS_ROLLUP", True),
+        ("SEARCH_INDEX", True),
+        ("SCHEDULE_CACHE", True),
+        ("ARCHIVE_RETENTION_DAYS", 0),
+    ):
+        monkeypatch.setattr(settings, name, value)
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split()[0].upper())
+
+    async def start() -> None:
+        async with main.lifespan(main.app):
+            pass
+
+    event.listen(migrated, "before_cursor_execute", record)
+    try:
+        # Every feature on, and nothing is created, rebuilt or dropped: schema changes are
+        # left to the revisions
+        asyncio.run(start())
+    finally:
+        event.remove(migrated, "before_cursor_execute", record)
+        migrated.dispose()
+    assert statements and set(statements) <= {"SELECT", "PRAGMA"}
@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta
+
+import pytest
+from app.core.cache import LocalSharedClient
+from app.core.idempotency import (
+    IdempotencyKeyInUse,
+    IdempotencyKeyReused,
+    IdempotencyStore,
+    MemoryIdempotencyStore,
+    SharedIdempotencyStore,
+    StoredResponse,
+)
+from sqlalchemy import event
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.parametrize("shared", [False, True])
+def test_idempotency_store_claims_replays_and_expires(shared):
+    clock = FakeClock()
+    if shared:
+        store = SharedIdempotencyStore(LocalSharedClient(clock=clock), ttl=10)
+    else:
+        store = MemoryIdempotencyStore(ttl=10, max_entries=2, clock=clock)
+    created = StoredResponse(201, b'{"id":1}')
+
+    assert store.begin("k", b"request") is None
+    with pytest.raises(IdempotencyKeyInUse):
+        store.begin("k", b"request")
+    store.finish("k", b"request", created)
+    assert store.begin("k", b"request") == created
+    with pytest.raises(IdempotencyKeyReused):
+        store.begin("k", b"other request")
+
+    # A released claim, e.g. after an unexpected error, can be taken again
+    assert store.begin("r", b"request") is None
+    store.release("r")
+    assert store.begin("r", b"request") is None
+
+    clock.now = 11
+    assert store.begin("k", b"request") is None
+    assert store.info()["replays"] == 1 and store.info()["conflicts"] == 2
+    if not shared:
+        store.begin("a", b"request")
+        store.begin("b", b"request")  # over max_entries: drops the oldest key, "k"
+        assert store.begin("k", b"request") is None
+        assert store.info()["entries"] == 2
+
+
+def test_incomplete_store_fails_when_built():
+    class NoRelease(IdempotencyStore):
+        def begin(self, key, fingerprint):
+            return None
+
+        def finish(self, key, fingerprint, response):
+            pass
+
+    # At construction, not on the first request that calls it
+    with pytest.raises(TypeError, match="release"):
+        NoRelease()
+
+
+def test_api_replays_idempotent_writes_without_queries(client, engine):
+    org = client.post("/api/organizations/", json={"name": "Retry Org"}).json()
+    res = client.post("/api/resources/", json={"organization_id": org["id"], "name": "Retry Room"}).json()
+    base = datetime(2034, 3, 1, 9, 0)
+    booking = {
+        "resource_id": res["id"],
+        "start_time": base.isoformat(),
+        "end_time": (base + timedelta(hours=1)).isoformat(),
+    }
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    first = client.post("/api/reservations/", json=booking, headers={"Idempotency-Key": "create-1"})
+    assert first.status_code == 201 and "idempotent-replayed" not in first.headers
+    cancel = f"/api/reservations/{first.json()['id']}/cancel"
+    cancelled = client.post(cancel, headers={"Idempotency-Key": "cancel-1"})
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        retry = client.post("/api/reservations/", json=booking, headers={"Idempotency-Key": "create-1"})
+        cancel_retry = client.post(cancel, headers={"Idempotency-Key": "cancel-1"})
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert statements == []
+    assert (retry.status_code, retry.json()) == (201, first.json())
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert cancel_retry.json() == cancelled.json() and cancelled.json()["status"] == "cancelled"
+
+    # Same key, different request: rejected; other keys are independent
+    moved = {**booking, "end_time": (base + timedelta(hours=2)).isoformat()}
+    reused = client.post("/api/reservations/", json=moved, headers={"Idempotency-Key": "create-1"})
+    assert reused.status_code == 422
+    # create-1's booking was cancelled, so create-2 gets the slot
+    assert client.post("/api/reservations/", json=booking, headers={"Idempotency-Key": "create-2"}).status_code == 201
+
+    # Refusals are kept too: the retry of a clash gets the same 400 without a conflict check
+    clash = client.post("/api/reservations/", json=booking, headers={"Idempotency-Key": "create-3"})
+    assert clash.status_code == 400
+    again = client.post("/api/reservations/", json=booking, headers={"Idempotency-Key": "create-3"})
+    assert (again.status_code, again.json()) == (400, clash.json())
+
+    next_day = base + timedelta(days=1)
+    bulk = {
+        "items": [
+            {**booking, "start_time": next_day.isoformat(), "end_time": (next_day + timedelta(hours=1)).isoformat()}
+        ]
+    }
+    done = client.post("/api/reservations/bulk", json=bulk, headers={"Idempotency-Key": "bulk-1"})
+    assert done.json()["accepted"] == 1
+    assert client.post("/api/reservations/bulk", json=bulk, headers={"Idempotency-Key": "bulk-1"}).json() == done.json()
+    listed = client.get("/api/reservations/", params={"resource_id": res["id"]}).json()
+    assert [r["status"] for r in listed] == ["cancelled", "confirmed", "confirmed"]
@@ -0,0 +1,46 @@
+import logging
+from datetime import datetime, timedelta
+
+from app.core import metrics as metrics_module
+from app.core.metrics import instrument_engine
+
+
+def test_metrics_endpoint_and_slow_request_log(client, engine, monkeypatch, caplog):
+    instrument_engine(engine)  # the test engine stands in for app.db.database.engine
+    org = client.post("/api/organizations/", json={"name": "Metrics Org"}).json()
+    res = client.post("/api/resources/", json={"organization_id": org["id"], "name": "Booth"}).json()
+    client.get("/api/reservations/", params={"resource_id": res["id"]})
+    client.get("/api/reservations/999999")
+
+    body = client.get("/metrics")
+    assert body.status_code == 200
+    assert body.headers["content-type"].startswith("text/plain")
+    text = body.text
+    # Labels use the route template, never the raw path
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/reservations/",status="200"}' in text
+    assert 'route="/api/reservations/{reservation_id}",status="404"' in text
+    assert "/999999" not in text
+    assert 'http_request_sql_statements_bucket{method="GET",route="/api/reservations/",le="+Inf"}' in text
+    assert "db_statements_total" in text
+    assert "db_pool_checkouts_total" in text
+    assert "cache_hits_total" in text
+
+    statements = next(
+        line
+        for line in text.splitlines()
+        if line.startswith('http_request_sql_statements_sum{method="GET",route="/api/reservations/"}')
+    )
+    assert float(statements.split()[-1]) >= 1
+
+    monkeypatch.setattr(metrics_module.settings, "METRICS_MAX_QUERIES", 1)
+    with caplog.at_level(logging.WARNING, logger="app.core.metrics"):
+        start = datetime(2034, 1, 1, 9, 0)
+        client.post(
+            "/api/reservations/",
+            json={
+                "resource_id": res["id"],
+                "start_time": start.isoformat(),
+                "end_time": (start + timedelta(hours=1)).isoformat(),
+            },
+        )
+    assert any("POST /api/reservations/" in r.getMessage() for r in caplog.records)
@@ -0,0 +1,164 @@
+from datetime import datetime, timedelta
+
+import pytest
+from app.schemas.recurring_reservation import MAX_INTERVAL
+from app.services.recurrence import DAILY, WEEKLY, nth_start, occurrences
+
+
+def test_expansion_jumps_to_the_window():
+    start = datetime(2030, 1, 7, 18, 0)  # a Monday
+    end = start + timedelta(hours=2)
+
+    # Mondays and Wednesdays, every other week, queried ten years after the first occurrence
+    window_start = datetime(2040, 3, 1)
+    found = list(occurrences(start, end, WEEKLY, 2, [0, 2], None, window_start, window_start + timedelta(days=28)))
+    assert len(found) == 4
+    assert all(s.weekday() in (0, 2) and s.hour == 18 for s, _ in found)
+    assert all((s - start).days % 14 in (0, 2) for s, _ in found)
+
+    # An occurrence still running at the window start is included; skipped ones are not
+    daily = list(occurrences(start, end, DAILY, 1, (), None, start + timedelta(hours=1), start + timedelta(days=3)))
+    assert [s for s, _ in daily] == [start + timedelta(days=i) for i in range(3)]
+    skipped = list(
+        occurrences(start, end, DAILY, 1, (), None, start, start + timedelta(days=3), {start + timedelta(days=1)})
+    )
+    assert [s for s, _ in skipped] == [start, start + timedelta(days=2)]
+
+    # COUNT becomes the start of the last occurrence, which bounds expansion
+    until = nth_start(start, end, WEEKLY, 1, [0, 2], 3)
+    assert until == start + timedelta(days=7)
+    assert len(list(occurrences(start, end, WEEKLY, 1, [0, 2], until, start, start + timedelta(days=60)))) == 3
+    # ...computed from the pattern, however large the count; past datetime.max it is refused
+    assert nth_start(start + timedelta(days=2), end, WEEKLY, 1, [0, 2], 1001) == start + timedelta(days=2, weeks=500)
+    with pytest.raises(ValueError):
+        nth_start(start, end, DAILY, 1, (), 10**12)
+
+
+def test_api_recurring_reservations(client):
+    org = client.post("/api/organizations/", json={"name": "Recurring Org"}).json()
+    res = client.post("/api/resources/", json={"organization_id": org["id"], "name": "Pitch"}).json()
+    other = client.post("/api/resources/", json={"organization_id": org["id"], "name": "Pitch 2"}).json()
+    first = datetime(2031, 1, 6, 18, 0)  # a Monday
+
+    r = client.post(
+        "/api/recurring-reservations/",
+        json={
+            "resource_id": res["id"],
+            "start_time": first.isoformat(),
+            "end_time": (first + timedelta(hours=2)).isoformat(),
+            "freq": "weekly",
+            "weekdays": [0, 3],
+            "guest_last_name": "League",
+        },
+    )
+    assert r.status_code == 201, r.text
+    rule = r.json()
+    assert rule["weekdays"] == [0, 3]
+    assert rule["exceptions"] == []
+
+    # Single bookings are checked against occurrences far from the first one
+    monday = first + timedelta(weeks=40)
+    clash = {
+        "resource_id": res["id"],
+        "start_time": (monday + timedelta(hours=1)).isoformat(),
+        "end_time": (monday + timedelta(hours=3)).isoformat(),
+    }
+    assert client.post("/api/reservations/", json=clash).status_code == 400
+    tuesday = monday + timedelta(days=1)
+    ok = client.post(
+        "/api/reservations/",
+        json={
+            "resource_id": res["id"],
+            "start_time": tuesday.isoformat(),
+            "end_time": (tuesday + timedelta(hours=2)).isoformat(),
+        },
+    )
+    assert ok.status_code == 201
+    bulk = client.post("/api/reservations/bulk", json={"items": [clash]}).json()
+    assert bulk["rejected"] == 1
+
+    # A new rule is checked against existing single bookings and rules
+    daily = {
+        "resource_id": res["id"],
+        "start_time": (first + timedelta(days=1)).isoformat(),
+        "end_time": (first + timedelta(days=1, hours=1)).isoformat(),
+        "freq": "daily",
+    }
+    assert client.post("/api/recurring-reservations/", json=daily).status_code == 400
+    # Tuesday and Wednesday fit before Thursday's occurrence; a third day does not
+    assert client.post("/api/recurring-reservations/", json={**daily, "count": 3}).status_code == 400
+    # Counts are capped, and a rule reaching past the supported dates is refused
+    assert client.post("/api/recurring-reservations/", json={**daily, "count": 10_000_000}).status_code == 422
+    assert client.post("/api/recurring-reservations/", json={**daily, "count": 9999, "interval": 10**5}).status_code == 400
+    weekly = {**daily, "resource_id": other["id"], "freq": "weekly"}
+    for interval in (10**6, 10**9, 10**12):
+        assert client.post("/api/recurring-reservations/", json={**weekly, "interval": interval}).status_code == 422
+    # The largest interval is accepted, and reads stop at the latest supported date
+    sparse = {**weekly, "interval": MAX_INTERVAL, "start_time": "2090-01-02T09:00:00", "end_time": "2090-01-02T10:00:00"}
+    assert client.post("/api/recurring-reservations/", json=sparse).status_code == 201
+    far = {"start": "2089-01-01T00:00:00", "end": "9999-12-30T00:00:00", "resource_id": other["id"]}
+    assert len(client.get("/api/recurring-reservations/occurrences", params=far).json()) == 1
+    late = {**weekly, "start_time": "9999-12-20T09:00:00", "end_time": "9999-12-20T10:00:00"}
+    assert client.post("/api/recurring-reservations/", json=late).status_code == 400
+    assert client.post("/api/recurring-reservations/", json={**daily, "count": 2}).status_code == 201
+    assert client.post("/api/recurring-reservations/", json={**daily, "resource_id": other["id"]}).status_code == 201
+
+    # Open-ended rules are checked past the horizon: against single bookings, and against
+    # other rules over one period of their joint pattern
+    third = client.post("/api/resources/", json={"organization_id": org["id"], "name": "Pitch 3"}).json()
+    tuesday = datetime(2031, 1, 7, 7)
+
+    def rule_at(start, hours, **extra):
+        slot = {"start_time": start.isoformat(), "end_time": (start + timedelta(hours=hours)).isoformat()}
+        return {"resource_id": third["id"], "freq": "weekly", **slot, **extra}
+
+    far = tuesday + timedelta(days=800, hours=11, minutes=30)
+    single = {"resource_id": third["id"], "start_time": far.isoformat(), "end_time": (far + timedelta(hours=1)).isoformat()}
+    assert client.post("/api/reservations/", json=single).status_code == 201
+    assert client.post("/api/recurring-reservations/", json=rule_at(tuesday + timedelta(hours=11), 1, freq="daily")).status_code == 400
+    late_rule = rule_at(tuesday + timedelta(weeks=61, minutes=30), 1, interval=3)
+    assert client.post("/api/recurring-reservations/", json=late_rule).status_code == 201
+    assert client.post("/api/recurring-reservations/", json=rule_at(tuesday, 1, interval=2)).status_code == 400
+    assert client.post("/api/recurring-reservations/", json=rule_at(tuesday, 1, interval=2, count=29)).status_code == 201
+    wednesday = tuesday + timedelta(days=1, hours=5)
+    assert client.post("/api/recurring-reservations/", json=rule_at(wednesday, 1, interval=53)).status_code == 201
+    r = client.post("/api/recurring-reservations/", json=rule_at(wednesday + timedelta(weeks=1, minutes=30), 1, interval=2))
+    assert r.status_code == 400
+    assert "every 742 days" in r.json()["detail"]
+
+    # Occurrences, availability and free resources all see the rule
+    window = {"start": monday.replace(hour=0).isoformat(), "end": (monday + timedelta(days=4)).isoformat()}
+    occ = client.get("/api/recurring-reservations/occurrences", params={**window, "resource_id": res["id"]})
+    assert [datetime.fromisoformat(o["start_time"]) for o in occ.json()] == [monday, monday + timedelta(days=3)]
+    slot = {"start": monday.isoformat(), "end": (monday + timedelta(hours=1)).isoformat()}
+    free = client.get(f"/api/resources/{res['id']}/availability", params=slot).json()["free"]
+    assert free == []
+    available = client.get("/api/resources/available", params={**slot, "organization_id": org["id"]}).json()
+    assert res["id"] not in [a["id"] for a in available]
+
+    # An exception frees one occurrence
+    bad = client.post(
+        f"/api/recurring-reservations/{rule['id']}/exceptions",
+        json={"occurrence_start": (monday + timedelta(hours=1)).isoformat()},
+    )
+    assert bad.status_code == 400
+    e = client.post(
+        f"/api/recurring-reservations/{rule['id']}/exceptions", json={"occurrence_start": monday.isoformat()}
+    )
+    assert e.status_code == 200
+    assert len(e.json()["exceptions"]) == 1
+    assert client.post("/api/reservations/", json=clash).status_code == 201
+
+    # Cancelling the rule frees the remaining occurrences; deleting it removes it
+    thursday = monday + timedelta(days=3)
+    thursday_booking = {
+        "resource_id": res["id"],
+        "start_time": thursday.isoformat(),
+        "end_time": (thursday + timedelta(hours=1)).isoformat(),
+    }
+    assert client.post("/api/reservations/", json=thursday_booking).status_code == 400
+    c = client.post(f"/api/recurring-reservations/{rule['id']}/cancel")
+    assert c.json()["status"] == "cancelled"
+    assert client.post("/api/reservations/", json=thursday_booking).status_code == 201
+    assert client.delete(f"/api/recurring-reservations/{rule['id']}").status_code == 204
+    assert client.get(f"/api/recurring-reservations/{rule['id']}").status_code == 404
@@ -0,0 +1,130 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from app.db.rollup import check_usage_rollup, install_usage_rollup, remove_usage_rollup
+from app.models.resource_daily_usage import ResourceDailyUsage
+from app.schemas.reservation import ReservationCreate, ReservationUpdate
+from app.services import report_service, reservation_service
+from sqlalchemy import select
+
+
+def test_api_utilization_report(client):
+    org = client.post("/api/organizations/", json={"name": "Report Org"}).json()
+    a = client.post("/api/resources/", json={"organization_id": org["id"], "name": "Court A"}).json()
+    b = client.post("/api/resources/", json={"organization_id": org["id"], "name": "Court B"}).json()
+    day = datetime(2032, 3, 1, 0, 0)  # a Monday
+
+    def book(resource, start_hour, hours, cancel=False):
+        start = day + timedelta(hours=start_hour)
+        r = client.post(
+            "/api/reservations/",
+            json={
+                "resource_id": resource["id"],
+                "start_time": start.isoformat(),
+                "end_time": (start + timedelta(hours=hours)).isoformat(),
+            },
+        )
+        assert r.status_code == 201, r.text
+        if cancel:
+            client.post(f"/api/reservations/{r.json()['id']}/cancel")
+
+    book(a, 9, 2)
+    book(a, 11, 1)  # back to back with the previous one
+    book(b, 10, 3)
+    book(b, 14, 1, cancel=True)
+    book(a, 24 + 10, 6)  # Tuesday
+
+    params = {"start": "2032-03-01", "end": "2032-03-08", "organization_id": org["id"]}
+    r = client.get("/api/reports/utilization", params=params)
+    assert r.status_code == 200, r.text
+    report = r.json()
+    assert report["source"] == "live"
+    by_key = {(row["resource_id"], row["period_start"]): row for row in report["rows"]}
+    monday_a = by_key[(a["id"], "2032-03-01")]
+    assert (monday_a["reservations"], monday_a["booked_hours"], monday_a["peak_concurrency"]) == (2, 3.0, 1)
+    assert monday_a["utilization"] == round(3 / 24, 4)
+    monday_b = by_key[(b["id"], "2032-03-01")]
+    assert (monday_b["reservations"], monday_b["cancelled"], monday_b["cancellation_rate"]) == (2, 1, 0.5)
+    assert monday_b["booked_hours"] == 3.0
+
+    # Per organization and week: the two courts overlap from 10:00 to 12:00
+    weekly = client.get(
+        "/api/reports/utilization", params={**params, "granularity": "week", "group_by": "organization"}
+    ).json()["rows"]
+    assert len(weekly) == 1
+    week = weekly[0]
+    assert week["period_start"] == "2032-03-01" and week["resource_id"] is None
+    assert (week["reservations"], week["cancelled"], week["booked_hours"]) == (5, 1, 12.0)
+    assert week["peak_concurrency"] == 2
+    assert week["utilization"] == round(12 / (2 * 24 * 7), 4)
+
+    no_peak = client.get("/api/reports/utilization", params={**params, "peak": False}).json()["rows"]
+    assert all(row["peak_concurrency"] is None for row in no_peak)
+    assert client.get("/api/reports/utilization", params={**params, "end": "2032-03-01"}).status_code == 400
+
+    # A court booked only by a weekly rule is as busy as its occurrences
+    c = client.post("/api/resources/", json={"organization_id": org["id"], "name": "Court C"}).json()
+    rule = {
+        "resource_id": c["id"],
+        "start_time": (day + timedelta(hours=10)).isoformat(),
+        "end_time": (day + timedelta(hours=12)).isoformat(),
+        "freq": "weekly",
+    }
+    assert client.post("/api/recurring-reservations/", json=rule).status_code == 201
+    rows = client.get("/api/reports/utilization", params={**params, "resource_id": c["id"]}).json()["rows"]
+    assert [(row["period_start"], row["reservations"], row["booked_hours"], row["peak_concurrency"]) for row in rows] == [
+        ("2032-03-01", 1, 2.0, 1)
+    ]
+    week = client.get(
+        "/api/reports/utilization", params={**params, "granularity": "week", "group_by": "organization"}
+    ).json()["rows"][0]
+    assert (week["reservations"], week["booked_hours"], week["peak_concurrency"]) == (6, 14.0, 3)
+    assert week["utilization"] == round(14 / (3 * 24 * 7), 4)
+
+
+def test_daily_rollup_follows_every_write(db_session, engine, client):
+    org = client.post("/api/organizations/", json={"name": "Rollup Org"}).json()
+    res = client.post("/api/resources/", json={"organization_id": org["id"], "name": "Room"}).json()
+    other = client.post("/api/resources/", json={"organization_id": org["id"], "name": "Room 2"}).json()
+    monday = datetime(2033, 5, 2, 9, 0)
+
+    def slot(resource_id, days, hours=1):
+        start = monday + timedelta(days=days)
+        return ReservationCreate(resource_id=resource_id, start_time=start, end_time=start + timedelta(hours=hours))
+
+    reservation_service.create_reservation(db_session, slot(res["id"], 0))
+    with pytest.raises(RuntimeError):
+        check_usage_rollup(engine, True)  # never served without its triggers
+    install_usage_rollup(engine)  # backfills what already exists
+    try:
+        # A process starting with REPORTS_ROLLUP off leaves them to the workers that have it on
+        check_usage_rollup(engine, False)
+        check_usage_rollup(engine, True)
+        moved = reservation_service.create_reservation(db_session, slot(res["id"], 1, 2))
+        cancelled = reservation_service.create_reservation(db_session, slot(res["id"], 2))
+        gone = reservation_service.create_reservation(db_session, slot(other["id"], 0, 3))
+        reservation_service.create_reservations_bulk(db_session, [slot(other["id"], d) for d in (1, 2, 3)])
+        later = monday + timedelta(days=4)
+        move = ReservationUpdate(start_time=later, end_time=later + timedelta(hours=4))
+        reservation_service.update_reservation_by_id(db_session, moved.id, move)
+        reservation_service.update_reservation_by_id(db_session, moved.id, ReservationUpdate(notes="no effect"))
+        reservation_service.cancel_reservation_by_id(db_session, cancelled.id)
+        reservation_service.delete_reservation_by_id(db_session, gone.id)
+
+        for granularity in ("day", "week"):
+            for group_by in ("resource", "organization"):
+                args = (db_session, date(2033, 5, 1), date(2033, 5, 15), granularity, group_by, org["id"])
+                live = report_service.utilization(*args, peak=False)
+                assert live == report_service.utilization(*args, use_rollup=True, peak=False)
+        week = report_service.utilization(
+            db_session, date(2033, 5, 2), date(2033, 5, 9), "week", "organization", org["id"], use_rollup=True
+        )
+        assert (week[0].reservations, week[0].cancelled, week[0].booked_hours) == (6, 1, 8.0)
+
+        # Deleting the resource empties its rollup rows
+        assert client.delete(f"/api/resources/{other['id']}").status_code == 204
+        left = db_session.execute(select(ResourceDailyUsage.resource_id).distinct()).scalars().all()
+        assert other["id"] not in left and res["id"] in left
+    finally:
+        with engine.begin() as conn:
+            remove_usage_rollup(conn)
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+
+from app.db.search import (
+    FTS5,
+    LIKE,
+    check_search_index,
+    install_search_index,
+    remove_search_index,
+    search_backend,
+)
+
+
+def test_api_search_reservations(client, engine):
+    org = client.post("/api/organizations/", json={"name": "Search Org"}).json()
+    res = client.post("/api/resources/", json={"organization_id": org["id"], "name": "Table 7"}).json()
+    base = datetime(2039, 3, 7, 18, 0)
+    guests = [
+        ("Smithers", "allergic to PEANUTS", "waylon@springfield.test"),
+        ("smith", "window table", "+1 555 0100"),
+        ("Smyth", "Birthday, 100% chocolate cake", "smyth@example.test"),
+        ("Jones", "peanut butter dessert", "jones@example.test"),
+        ("Smith", None, None),
+    ]
+    ids = []
+    for i, (last_name, notes, contact) in enumerate(guests):
+        start = base + timedelta(days=i)
+        r = client.post(
+            "/api/reservations/",
+            json={
+                "resource_id": res["id"],
+                "start_time": start.isoformat(),
+                "end_time": (start + timedelta(hours=2)).isoformat(),
+                "guest_last_name": last_name,
+                "notes": notes,
+                "guest_contact": contact,
+            },
+        )
+        ids.append(r.json()["id"])
+    client.post(f"/api/reservations/{ids[4]}/cancel")
+
+    def search(**params):
+        r = client.get("/api/reservations/search", params={"resource_id": res["id"], **params})
+        assert r.status_code == 200, r.text
+        return [row["id"] for row in r.json()]
+
+    def check_all():
+        assert search(name="SMITH") == [ids[0], ids[1], ids[4]]
+        assert search(name="sm") == [ids[0], ids[1], ids[2], ids[4]]
+        assert search(name="smith", status="cancelled") == [ids[4]]
+        assert search(name="smith", status=["confirmed", "pending"]) == [ids[0], ids[1]]
+        assert search(q="peanut") == [ids[0], ids[3]]
+        assert search(q="PEANUT dessert") == [ids[3]]
+        assert search(q="example.test") == [ids[2], ids[3]]
+        assert search(q="55") == [ids[1]]  # shorter than a trigram
+        assert search(q="100%") == [ids[2]]
+        assert search(q="%") == [ids[2]]
+        assert search(q='"window') == []
+
+    install_search_index(engine)
+    try:
+        # A process starting with SEARCH_INDEX off scans with LIKE and leaves the index in place
+        assert check_search_index(engine, False) == LIKE
+        assert check_search_index(engine, True) == FTS5
+        with engine.connect() as conn:
+            assert search_backend(conn) == FTS5
+        check_all()
+        # The index follows edits and deletions made after it was built
+        client.patch(f"/api/reservations/{ids[1]}", json={"notes": "peanut free please"})
+        client.delete(f"/api/reservations/{ids[0]}")
+        assert search(q="peanut") == [ids[1], ids[3]]
+        client.patch(f"/api/reservations/{ids[1]}", json={"notes": "window table"})
+    finally:
+        with engine.begin() as conn:
+            remove_search_index(conn)
+
+    with engine.connect() as conn:
+        assert search_backend(conn) == LIKE
+    assert search(q="peanut") == [ids[3]]
+    assert search(name="smith", status="cancelled") == [ids[4]]
+
+    # Sorted by start time and paginated with the list cursor
+    first = client.get("/api/reservations/search", params={"resource_id": res["id"], "name": "s", "limit": 2})
+    assert [row["id"] for row in first.json()] == [ids[1], ids[2]]
+    rest = client.get(
+        "/api/reservations/search",
+        params={"resource_id": res["id"], "name": "s", "limit": 2, "cursor": first.headers["X-Next-Cursor"]},
+    )
+    assert [row["id"] for row in rest.json()] == [ids[4]]
+    assert "X-Next-Cursor" not in rest.headers
@@ -1,9 +1,13 @@
+import threading
 from datetime import datetime, timedelta
 
+from app.models.reservation import Reservation
 from app.schemas.organization import OrganizationCreate
-from app.schemas.reservation import ReservationCreate
+from app.schemas.reservation import ReservationCreate, ReservationUpdate
 from app.schemas.resource import ResourceCreate, ResourceUpdate
 from app.services import organization_service, reservation_service, resource_service
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session
 
 
 def test_service_crud_and_conflict(db_session):
@@ -55,3 +59,276 @@ def test_service_crud_and_conflict(db_session):
     # Cancel reservation
     cancelled = reservation_service.cancel_reservation(db_session, rev)
     assert cancelled.status == "cancelled"
+
+
+def test_cancelled_reservation_frees_slot(db_session):
+    org = organization_service.create_organization(db_session, OrganizationCreate(name="Cancel Org"))
+    res = resource_service.create_resource(db_session, ResourceCreate(organization_id=org.id, name="Court 1"))
+
+    now = datetime.now()
+    first = reservation_service.create_reservation(
+        db_session,
+        ReservationCreate(resource_id=res.id, start_time=now + timedelta(hours=1), end_time=now + timedelta(hours=2)),
+    )
+    assert reservation_service.has_conflict(db_session, res.id, now + timedelta(hours=1), now + timedelta(hours=3))
+
+    reservation_service.cancel_reservation(db_session, first)
+    assert not reservation_service.has_conflict(db_session, res.id, now + timedelta(hours=1), now + timedelta(hours=3))
+
+    # A long booking that swallows later ones is still found through its neighbour
+    second = reservation_service.create_reservation(
+        db_session,
+        ReservationCreate(resource_id=res.id, start_time=now + timedelta(hours=1), end_time=now + timedelta(hours=5)),
+    )
+    assert reservation_service.has_conflict(db_session, res.id, now + timedelta(hours=4), now + timedelta(hours=6))
+    assert not reservation_service.has_conflict(
+        db_session, res.id, now + timedelta(hours=4), now + timedelta(hours=6), exclude_id=second.id
+    )
+    assert not reservation_service.has_conflict(db_session, res.id, now + timedelta(hours=5), now + timedelta(hours=6))
+
+
+def test_writes_by_id_use_single_statements(db_session, engine):
+    org = organization_service.create_organization(db_session, OrganizationCreate(name="Lean Org"))
+    res = resource_service.create_resource(db_session, ResourceCreate(organization_id=org.id, name="Desk"))
+    start = datetime(2033, 3, 1, 9, 0)
+    rev = reservation_service.create_reservation(
+        db_session, ReservationCreate(resource_id=res.id, start_time=start, end_time=start + timedelta(hours=1))
+    )
+
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split()[0])
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        updated = reservation_service.update_reservation_by_id(db_session, rev.id, ReservationUpdate(notes="n"))
+        assert updated.notes == "n"
+        assert statements == ["UPDATE"]
+
+        statements.clear()
+        cancelled = reservation_service.cancel_reservation_by_id(db_session, rev.id)
+        assert cancelled.status == "cancelled"
+        assert statements == ["UPDATE"]
+
+        statements.clear()
+        assert reservation_service.delete_reservation_by_id(db_session, rev.id)
+        assert statements == ["DELETE"]
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert reservation_service.cancel_reservation_by_id(db_session, rev.id) is None
+    assert reservation_service.update_reservation_by_id(db_session, rev.id, ReservationUpdate(notes="x")) is None
+    assert not reservation_service.delete_reservation_by_id(db_session, rev.id)
+    assert not resource_service.delete_resource_by_id(db_session, 999_999)
+    assert not organization_service.delete_organization_by_id(db_session, 999_999)
+
+    # Deleting the organization removes its resources and their reservations, like the ORM cascade
+    reservation_service.create_reservation(
+        db_session, ReservationCreate(resource_id=res.id, start_time=start, end_time=start + timedelta(hours=1))
+    )
+    assert organization_service.delete_organization_by_id(db_session, org.id)
+    assert resource_service.get_resource(db_session, res.id) is None
+    assert not db_session.execute(select(Reservation.id).where(Reservation.resource_id == res.id)).all()
+
+
+def test_concurrent_overlapping_bookings_exactly_one_wins(test_db_url, TestingSessionLocal):
+    with TestingSessionLocal() as setup:
+        org = organization_service.create_organization(setup, OrganizationCreate(name="Race Org"))
+        res = resource_service.create_resource(setup, ResourceCreate(organization_id=org.id, name="Last seat"))
+        resource_id = res.id
+
+    writers = 16
+    engine = create_engine(
+        test_db_url, future=True, connect_args={"check_same_thread": False}, pool_size=writers
+    )
+    barrier = threading.Barrier(writers)
+    start = datetime(2032, 5, 1, 18, 0)
+    outcomes: list[str] = []
+
+    def book(offset_minutes: int) -> None:
+        with Session(engine) as session:
+            barrier.wait()
+            try:
+                reservation_service.create_reservation(
+                    session,
+                    ReservationCreate(
+                        resource_id=resource_id,
+                        start_time=start + timedelta(minutes=offset_minutes),
+                        end_time=start + timedelta(hours=2, minutes=offset_minutes),
+                    ),
+                )
+                outcomes.append("won")
+            except ValueError:
+                outcomes.append("conflict")
+
+    threads = [threading.Thread(target=book, args=(i,)) for i in range(writers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    engine.dispose()
+
+    assert outcomes.count("won") == 1, outcomes
+    assert outcomes.count("conflict") == writers - 1
+    with TestingSessionLocal() as check:
+        assert len(reservation_service.list_reservations(check, resource_id=resource_id)) == 1
+
+
+def test_concurrent_partial_updates_merge_locked_values(test_db_url, TestingSessionLocal):
+    from sqlalchemy import update
+
+    with TestingSessionLocal() as setup:
+        org = organization_service.create_organization(setup, OrganizationCreate(name="Patch Org"))
+        res = resource_service.create_resource(setup, ResourceCreate(organization_id=org.id, name="Booth"))
+        start = datetime(2032, 6, 1, 9, 0)
+        rev = reservation_service.create_reservation(
+            setup, ReservationCreate(resource_id=res.id, start_time=start, end_time=start + timedelta(hours=1))
+        )
+
+    engine = create_engine(test_db_url, future=True, connect_args={"check_same_thread": False})
+    outcomes: list[str] = []
+
+    def move_end() -> None:
+        # Valid against the slot it started from (9-10), not against the one it waits for
+        with Session(engine) as session:
+            try:
+                reservation_service.update_reservation_by_id(
+                    session, rev.id, ReservationUpdate(end_time=start + timedelta(minutes=90))
+                )
+                outcomes.append("updated")
+            except ValueError:
+                outcomes.append("rejected")
+
+    with Session(engine) as first:
+        # Holds the lock while moving the slot to 11-12
+        reservation_service.lock_resources(first, [res.id])
+        first.execute(
+            update(Reservation)
+            .where(Reservation.id == rev.id)
+            .values(start_time=start + timedelta(hours=2), end_time=start + timedelta(hours=3))
+        )
+        writer = threading.Thread(target=move_end)
+        writer.start()
+        writer.join(timeout=0.5)
+        first.commit()
+    writer.join()
+    engine.dispose()
+
+    assert outcomes == ["rejected"]
+    with TestingSessionLocal() as check:
+        row = reservation_service.get_reservation(check, rev.id)
+        assert (row.start_time, row.end_time) == (start + timedelta(hours=2), start + timedelta(hours=3))
+
+
+def test_shared_resource_admits_bookings_up_to_capacity(db_session):
+    from app.schemas.recurring_reservation import RecurringReservationCreate
+    from app.services import availability_service, recurring_service
+
+    org = organization_service.create_organization(db_session, OrganizationCreate(name="Shared Org"))
+    hall = resource_service.create_resource(
+        db_session, ResourceCreate(organization_id=org.id, name="Hall", capacity=3, shared=True)
+    )
+    day = datetime(2034, 6, 1)
+
+    def book(start_hour: int, end_hour: int) -> None:
+        reservation_service.create_reservation(
+            db_session,
+            ReservationCreate(
+                resource_id=hall.id, start_time=day + timedelta(hours=start_hour), end_time=day + timedelta(hours=end_hour)
+            ),
+        )
+
+    # 9-12 and 10-11 overlap; 11-13 starts as 10-11 ends, so occupancy never passes two
+    book(9, 12)
+    book(10, 11)
+    book(11, 13)
+    assert reservation_service.peak_occupancy(
+        [(day + timedelta(hours=a), day + timedelta(hours=b)) for a, b in ((9, 12), (10, 11), (11, 13))],
+        day,
+        day + timedelta(days=1),
+    ) == 2
+    book(10, 12)  # the third place from 10 to 12
+    assert reservation_service.has_conflict(db_session, hall.id, day + timedelta(hours=11), day + timedelta(hours=14))
+    assert not reservation_service.has_conflict(db_session, hall.id, day + timedelta(hours=12), day + timedelta(hours=14))
+
+    free = availability_service.free_intervals(db_session, hall.id, day + timedelta(hours=8), day + timedelta(hours=14))
+    assert [(a.hour, b.hour) for a, b in free] == [(8, 10), (12, 14)]
+    free_now = availability_service.free_resources(db_session, day + timedelta(hours=10), day + timedelta(hours=11))
+    assert hall.id not in {resource.id for resource in free_now}
+
+    # Within a batch, earlier items take the remaining places
+    results = reservation_service.create_reservations_bulk(
+        db_session,
+        [
+            ReservationCreate(resource_id=hall.id, start_time=day + timedelta(hours=13), end_time=day + timedelta(hours=15))
+            for _ in range(4)
+        ],
+    )
+    assert [result.accepted for result in results] == [True, True, True, False]
+    assert results[3].error == reservation_service.BATCH_CONFLICT_ERROR
+
+    # A daily rule needs a place in every occurrence; 13-15 has none left on the first day
+    rule = dict(resource_id=hall.id, freq="daily", count=3)
+    try:
+        recurring_service.create_recurring_reservation(
+            db_session,
+            RecurringReservationCreate(**rule, start_time=day + timedelta(hours=14), end_time=day + timedelta(hours=15)),
+        )
+        assert False, "Expected conflict ValueError"
+    except ValueError:
+        pass
+    recurring_service.create_recurring_reservation(
+        db_session,
+        RecurringReservationCreate(**rule, start_time=day + timedelta(hours=15), end_time=day + timedelta(hours=16)),
+    )
+    # Occurrences count towards occupancy alongside single bookings
+    next_day = day + timedelta(days=1)
+    assert not reservation_service.has_conflict(db_session, hall.id, next_day + timedelta(hours=15), next_day + timedelta(hours=16))
+    assert reservation_service.has_conflict(db_session, hall.id, day + timedelta(hours=14), day + timedelta(hours=16))
+
+
+def test_resource_limit_cannot_drop_below_overlapping_bookings(db_session):
+    from app.schemas.recurring_reservation import RecurringReservationCreate
+    from app.services import recurring_service
+
+    org = organization_service.create_organization(db_session, OrganizationCreate(name="Shrinking Org"))
+    hall = resource_service.create_resource(
+        db_session, ResourceCreate(organization_id=org.id, name="Hall", capacity=3, shared=True)
+    )
+    day = datetime(2034, 7, 1)
+    _, short = (
+        reservation_service.create_reservation(
+            db_session,
+            ReservationCreate(
+                resource_id=hall.id, start_time=day + timedelta(hours=start_hour), end_time=day + timedelta(hours=end_hour)
+            ),
+        )
+        for start_hour, end_hour in ((10, 14), (11, 12))
+    )
+
+    # Two bookings overlap: a capacity of two is fine, a single place is not
+    assert resource_service.update_resource_by_id(db_session, hall.id, ResourceUpdate(capacity=2)).capacity == 2
+    for update in (ResourceUpdate(shared=False), ResourceUpdate(capacity=1)):
+        try:
+            resource_service.update_resource_by_id(db_session, hall.id, update)
+            assert False, "Expected overbooking ValueError"
+        except ValueError:
+            pass
+    assert resource_service.get_resource(db_session, hall.id).shared is True
+    assert reservation_service.has_conflict(db_session, hall.id, day + timedelta(hours=11), day + timedelta(hours=12))
+
+    # Recurring occurrences count too: with 11-12 cancelled, a daily 13-15 rule overlaps 10-14
+    reservation_service.cancel_reservation_by_id(db_session, short.id)
+    recurring_service.create_recurring_reservation(
+        db_session,
+        RecurringReservationCreate(
+            resource_id=hall.id, freq="daily", count=2, start_time=day + timedelta(hours=13), end_time=day + timedelta(hours=15)
+        ),
+    )
+    try:
+        resource_service.update_resource_by_id(db_session, hall.id, ResourceUpdate(shared=False))
+        assert False, "Expected overbooking ValueError"
+    except ValueError:
+        pass
+    assert resource_service.update_resource_by_id(db_session, hall.id, ResourceUpdate(name="Big hall")).name == "Big hall"
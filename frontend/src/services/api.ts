@@ -1,8 +1,11 @@
 import axios from 'axios';
 import type {
+  Calendar,
   Organization,
   Resource,
   Reservation,
+  ReservationChange,
+  ReservationChangeType,
   CreateReservation,
   UpdateReservation,
 } from '../types/api';
@@ -22,6 +25,9 @@ export const organizationApi = {
   get: (id: number) => api.get<Organization>(`/organizations/${id}`),
   create: (data: { name: string }) => api.post<Organization>('/organizations/', data),
   delete: (id: number) => api.delete(`/organizations/${id}`),
+  // All resources of the organization with their reservations in [start, end), in one request
+  calendar: (id: number, params: { start: string; end: string }) =>
+    api.get<Calendar>(`/organizations/${id}/calendar`, { params }),
 };
 
 // Resources
@@ -49,6 +55,17 @@ export const reservationApi = {
     end?: string;
   }) => api.get<Reservation[]>('/reservations/', { params }),
   
+  // Last name prefix, status and words in notes/contact; pages of `limit`, next page
+  // cursor in the X-Next-Cursor header
+  search: (params: {
+    q?: string;
+    name?: string;
+    status?: string[];
+    resource_id?: number;
+    limit?: number;
+    cursor?: string;
+  }) => api.get<Reservation[]>('/reservations/search', { params, paramsSerializer: { indexes: null } }),
+
   get: (id: number) => api.get<Reservation>(`/reservations/${id}`),
   
   create: (data: CreateReservation) => 
@@ -62,6 +79,23 @@ export const reservationApi = {
   
   delete: (id: number) => 
     api.delete(`/reservations/${id}`),
+
+  // Server-sent reservation changes. The browser reconnects by itself and resumes from the
+  // last event it saw; onReset means events were missed and the list should be refetched.
+  subscribe: (
+    onChange: (change: ReservationChange) => void,
+    onReset: () => void,
+    resourceId?: number,
+  ) => {
+    const query = resourceId ? `?resource_id=${resourceId}` : '';
+    const source = new EventSource(`${API_BASE_URL}/reservations/stream${query}`);
+    const types: ReservationChangeType[] = ['created', 'updated', 'cancelled', 'deleted'];
+    for (const type of types) {
+      source.addEventListener(type, (event) => onChange(JSON.parse((event as MessageEvent).data)));
+    }
+    source.addEventListener('reset', onReset);
+    return source;
+  },
 };
 
 export default api;
@@ -13,6 +13,7 @@ export interface Resource {
   name: string;
   type: string | null;
   capacity: number | null;
+  shared: boolean;
 }
 
 export interface Reservation {
@@ -30,6 +31,35 @@ export interface Reservation {
   updated_at?: string;
 }
 
+export interface Occurrence {
+  rule_id: number;
+  resource_id: number;
+  start_time: string;
+  end_time: string;
+}
+
+export interface CalendarResource extends Resource {
+  reservations: Reservation[];
+  occurrences: Occurrence[];
+}
+
+export interface Calendar {
+  organization: Organization;
+  start: string;
+  end: string;
+  resources: CalendarResource[];
+}
+
+export type ReservationChangeType = 'created' | 'updated' | 'cancelled' | 'deleted';
+
+export interface ReservationChange {
+  type: ReservationChangeType;
+  resource_id: number;
+  reservation_id: number;
+  // The reservation after the write; only { id } for deletions
+  data: Reservation | { id: number };
+}
+
 export interface CreateReservation {
   resource_id: number;
   start_time: string;